@@ -9,8 +9,8 @@ Outputs a JSON payload plus the referenced minimap textures so the static viewer
 from __future__ import annotations
 
 import argparse
-import csv
 import datetime as dt
+import hashlib
 import json
 import math
 import os
@@ -19,17 +19,48 @@ import shutil
 import struct
 import sys
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import IO, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+# shared helpers live one level up in tools/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asset_store import AssetStore, add_asset_store_arguments, asset_store_from_args, get_asset_store  # noqa: E402
+from export_index import add_cache_arguments, export_index_from_args  # noqa: E402
+from file_sync import FileSync, add_sync_arguments, file_sync_from_args  # noqa: E402
+from localization import Localization, localization_from_args  # noqa: E402
+from parse_cache import ParseCache, parse_cache_from_args  # noqa: E402
+from prefilter import Prefilter  # noqa: E402
+from profiling import ReadStats, add_profile_arguments, profiler_from_args, record_index_phases  # noqa: E402
+from streaming import STDOUT_PATH, logs_to_stderr, open_ndjson, write_ndjson_line  # noqa: E402
+from tile_pyramid import DEFAULT_TILE_SIZE, PyramidResult, build_pyramids, pyramid_summary  # noqa: E402
+from transform_solver import normalize_quaternion, world_positions  # noqa: E402
+from unity_yaml import MappedYamlFile, split_lines  # noqa: E402
 
 
 MINIMAP_SETTINGS_GUID = "d551df320acceeb317a9e97502ade12f"
 MINIMAP_SETTINGS_FILE_ID = -1857372209
 SIMPLE_POI_FILE_ID = 1147714721
+MANIFEST_FILE = "manifest.json"
+SHARD_DIR = "shards"
+# bytes of the blake2b content hash in shard file names
+SHARD_HASH_BYTES = 8
+# site-relative folder holding one tile pyramid per minimap texture
+TILE_DIR = os.path.join("assets", "tiles")
+# markers this far outside a map's square are still shown on it (viewer tolerance)
+MARKER_BOUNDS_EPSILON = 1e-3
+TRANSFORM_CLASS_ID = 4
+SPRITE_RENDERER_CLASS_ID = 212
+MONO_BEHAVIOUR_CLASS_ID = 114
+# bump whenever parse_scene's output changes shape or meaning
+SCENE_PARSER_VERSION = "1"
 
 _REF_RE = re.compile(
     r"\{fileID:\s*(-?\d+)(?:,\s*guid:\s*([0-9a-f]{32}))?(?:,\s*type:\s*(\d+))?\}",
     re.IGNORECASE,
 )
+_MINIMAP_SETTINGS_GUID_BYTES = MINIMAP_SETTINGS_GUID.encode("ascii")
+_GAME_OBJECT_KEY = b"m_GameObject:"
+_FILE_ID_BYTES_RE = re.compile(rb"\{fileID:\s*(-?\d+)")
 _VECTOR3_RE = re.compile(
     r"\{x:\s*([-\d.eE]+),\s*y:\s*([-\d.eE]+),\s*z:\s*([-\d.eE]+)\}"
 )
@@ -75,60 +106,41 @@ def parse_args() -> argparse.Namespace:
         default=45.0,
         help="Clockwise rotation (in degrees) to align minimap textures with in-game minimap orientation (default: %(default)s).",
     )
+    parser.add_argument(
+        "--format",
+        choices=("json", "ndjson", "shards"),
+        default="json",
+        help="json: data/maps.json for the viewer; ndjson: stream one map/marker record per line as scenes are parsed; shards: data/manifest.json plus one content-hashed data/shards/<sceneId>.<hash>.json per scene, which the viewer loads on demand (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--out-ndjson",
+        default=None,
+        help="NDJSON path for --format ndjson (default: <out>/data/maps.ndjson; '-' streams to stdout).",
+    )
+    parser.add_argument(
+        "--tiles",
+        action="store_true",
+        help="Also cut each minimap texture into a zoom-level tile pyramid under assets/tiles/ so the viewer only loads the tiles it shows; textures unchanged since the last run are not re-tiled (json and shards formats).",
+    )
+    parser.add_argument(
+        "--tile-size",
+        type=int,
+        default=DEFAULT_TILE_SIZE,
+        help="Tile edge in pixels for --tiles (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=0,
+        help="Worker processes for --tiles and copy threads for the texture sync; 0 = one per CPU (default: %(default)s).",
+    )
+    add_sync_arguments(parser)
+    add_cache_arguments(parser)
+    add_asset_store_arguments(parser)
+    add_profile_arguments(parser)
     return parser.parse_args()
 
 
-def parse_localization(
-    export_root: str, languages: Iterable[str]
-) -> Dict[str, Dict[str, str]]:
-    loc_dir = os.path.join(export_root, "Assets", "StreamingAssets", "Localization")
-    result: Dict[str, Dict[str, str]] = {}
-    for lang in languages:
-        fname = {
-            "en": "English.csv",
-            "zh": "ChineseSimplified.csv",
-        }.get(lang, f"{lang}.csv")
-        path = os.path.join(loc_dir, fname)
-        mapping: Dict[str, str] = {}
-        if os.path.isfile(path):
-            try:
-                with open(path, "r", encoding="utf-8", errors="ignore") as fh:
-                    reader = csv.reader(fh)
-                    for row in reader:
-                        if not row or len(row) < 2:
-                            continue
-                        key = row[0].strip()
-                        text = row[1].strip()
-                        if key:
-                            mapping[key] = text
-            except Exception:
-                pass
-        result[lang] = mapping
-    return result
-
-
-def build_guid_map(export_root: str) -> Dict[str, str]:
-    mapping: Dict[str, str] = {}
-    assets_root = os.path.join(export_root, "Assets")
-    for dirpath, _, filenames in os.walk(assets_root):
-        for fname in filenames:
-            if not fname.endswith(".meta"):
-                continue
-            meta_path = os.path.join(dirpath, fname)
-            try:
-                with open(meta_path, "r", encoding="utf-8", errors="ignore") as fh:
-                    for i, line in enumerate(fh):
-                        if line.startswith("guid: "):
-                            guid = line.split(":", 1)[1].strip()
-                            mapping[guid] = meta_path[:-5]  # strip .meta
-                            break
-                        if i > 8:
-                            break
-            except Exception:
-                continue
-    return mapping
-
-
 def parse_reference(value: str) -> Dict[str, Optional[str]]:
     match = _REF_RE.search(value)
     if not match:
@@ -163,247 +175,116 @@ def parse_color(value: str) -> Tuple[float, float, float, float]:
     return tuple(float(part) for part in match.groups())  # type: ignore[return-value]
 
 
-def normalize_quaternion(
-    q: Tuple[float, float, float, float],
-) -> Tuple[float, float, float, float]:
-    x, y, z, w = q
-    mag_sq = x * x + y * y + z * z + w * w
-    if mag_sq <= 1e-12:
-        return (0.0, 0.0, 0.0, 1.0)
-    inv_mag = 1.0 / math.sqrt(mag_sq)
-    return (x * inv_mag, y * inv_mag, z * inv_mag, w * inv_mag)
-
-
-def quaternion_multiply(
-    q1: Tuple[float, float, float, float],
-    q2: Tuple[float, float, float, float],
-) -> Tuple[float, float, float, float]:
-    x1, y1, z1, w1 = q1
-    x2, y2, z2, w2 = q2
-    x = w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2
-    y = w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2
-    z = w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2
-    w = w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2
-    return normalize_quaternion((x, y, z, w))
+def parse_file_id(value: str) -> Optional[int]:
+    match = _REF_RE.search(value)
+    if not match:
+        return None
+    return int(match.group(1))
 
 
-def cross(
-    a: Tuple[float, float, float], b: Tuple[float, float, float]
-) -> Tuple[float, float, float]:
-    ax, ay, az = a
-    bx, by, bz = b
-    return (
-        ay * bz - az * by,
-        az * bx - ax * bz,
-        ax * by - ay * bx,
+def parse_transform_block(file_id: int, block: List[str]) -> TransformData:
+    game_object_id: Optional[int] = None
+    parent_id: Optional[int] = None
+    local_position = (0.0, 0.0, 0.0)
+    local_rotation = (0.0, 0.0, 0.0, 1.0)
+    local_scale = (1.0, 1.0, 1.0)
+    for line in block:
+        stripped = line.strip()
+        if stripped.startswith("m_GameObject:"):
+            game_object_id = parse_file_id(stripped)
+        elif stripped.startswith("m_Father:"):
+            parent_id = parse_file_id(stripped)
+        elif stripped.startswith("m_LocalPosition:"):
+            local_position = parse_vector3(stripped.split(":", 1)[1])
+        elif stripped.startswith("m_LocalRotation:"):
+            local_rotation = parse_quaternion(stripped.split(":", 1)[1])
+        elif stripped.startswith("m_LocalScale:"):
+            local_scale = parse_vector3(stripped.split(":", 1)[1])
+    return TransformData(
+        transform_id=file_id,
+        game_object_id=game_object_id,
+        parent_transform_id=parent_id if parent_id and parent_id != 0 else None,
+        local_position=local_position,
+        local_rotation=local_rotation,
+        local_scale=local_scale,
     )
 
 
-def rotate_vector(
-    q: Tuple[float, float, float, float], v: Tuple[float, float, float]
-) -> Tuple[float, float, float]:
-    q = normalize_quaternion(q)
-    x, y, z, w = q
-    u = (x, y, z)
-    uv = cross(u, v)
-    uuv = cross(u, uv)
-    uv = tuple(component * (2.0 * w) for component in uv)
-    uuv = tuple(component * 2.0 for component in uuv)
-    return (
-        v[0] + uv[0] + uuv[0],
-        v[1] + uv[1] + uuv[1],
-        v[2] + uv[2] + uuv[2],
-    )
+def _game_object_of(buf, start: int, end: int) -> Optional[int]:
+    """`m_GameObject` fileID of the document at buf[start:end], read without decoding it."""
+    pos = buf.find(_GAME_OBJECT_KEY, start, end)
+    if pos < 0:
+        return None
+    line_end = buf.find(b"\n", pos, end)
+    match = _FILE_ID_BYTES_RE.search(buf[pos:line_end if line_end >= 0 else end])
+    return int(match.group(1)) if match else None
 
 
-def parse_file_id(value: str) -> Optional[int]:
-    match = _REF_RE.search(value)
-    if not match:
-        return None
-    return int(match.group(1))
+class LazyTransforms(Mapping[int, TransformData]):
+    """Transform fileID -> `TransformData`, parsed from the scene buffer on first access.
 
+    Only the byte range of each Transform document is known up front; the ones the
+    world-position math actually visits (POIs, their ancestors, offset targets) are
+    decoded and parsed.
+    """
 
-def get_block(lines: List[str], start: int) -> Tuple[List[str], int]:
-    block: List[str] = []
-    idx = start
-    block.append(lines[idx])
-    idx += 1
-    while idx < len(lines) and not lines[idx].startswith("--- !u!"):
-        block.append(lines[idx])
-        idx += 1
-    return block, idx
-
-
-def parse_block_header(line: str) -> Tuple[int, int]:
-    line = line.strip()
-    parts = line.split()
-    if len(parts) < 3:
-        return (0, 0)
-    class_part = parts[1]
-    id_part = parts[2]
-    class_id = int(class_part[3:])  # skip "!u!"
-    file_id = int(id_part[1:])  # skip '&'
-    return class_id, file_id
-
-
-def collect_transforms_and_components(
-    lines: List[str],
-) -> Tuple[Dict[int, TransformData], Dict[int, int], Dict[int, int]]:
-    transforms: Dict[int, TransformData] = {}
-    gameobject_to_transform: Dict[int, int] = {}
-    component_to_gameobject: Dict[int, int] = {}
-
-    idx = 0
-    while idx < len(lines):
-        if not lines[idx].startswith("--- !u!"):
-            idx += 1
-            continue
-        block, idx = get_block(lines, idx)
-        class_id, file_id = parse_block_header(block[0])
-
-        if class_id == 4:  # Transform
-            game_object_id: Optional[int] = None
-            parent_id: Optional[int] = None
-            local_position = (0.0, 0.0, 0.0)
-            local_rotation = (0.0, 0.0, 0.0, 1.0)
-            local_scale = (1.0, 1.0, 1.0)
-            for line in block:
-                stripped = line.strip()
-                if stripped.startswith("m_GameObject:"):
-                    game_object_id = parse_file_id(stripped)
-                elif stripped.startswith("m_Father:"):
-                    parent_id = parse_file_id(stripped)
-                elif stripped.startswith("m_LocalPosition:"):
-                    local_position = parse_vector3(stripped.split(":", 1)[1])
-                elif stripped.startswith("m_LocalRotation:"):
-                    local_rotation = parse_quaternion(stripped.split(":", 1)[1])
-                elif stripped.startswith("m_LocalScale:"):
-                    local_scale = parse_vector3(stripped.split(":", 1)[1])
-            transforms[file_id] = TransformData(
-                transform_id=file_id,
-                game_object_id=game_object_id,
-                parent_transform_id=parent_id if parent_id and parent_id != 0 else None,
-                local_position=local_position,
-                local_rotation=local_rotation,
-                local_scale=local_scale,
-            )
-            if game_object_id is not None:
-                gameobject_to_transform[game_object_id] = file_id
-        elif class_id == 212:  # SpriteRenderer component
-            game_object_id = None
-            for line in block:
-                stripped = line.strip()
-                if stripped.startswith("m_GameObject:"):
-                    game_object_id = parse_file_id(stripped)
-                    break
-            if game_object_id is not None:
-                component_to_gameobject[file_id] = game_object_id
-    return transforms, gameobject_to_transform, component_to_gameobject
-
-
-def compute_world_transform(
-    transform_id: int,
-    transforms: Dict[int, TransformData],
-    cache: Dict[
-        int,
-        Tuple[
-            Tuple[float, float, float],
-            Tuple[float, float, float, float],
-            Tuple[float, float, float],
-        ],
-    ],
-) -> Tuple[
-    Tuple[float, float, float],
-    Tuple[float, float, float, float],
-    Tuple[float, float, float],
-]:
-    if transform_id in cache:
-        return cache[transform_id]
-
-    data = transforms.get(transform_id)
-    if data is None:
-        result = ((0.0, 0.0, 0.0), (0.0, 0.0, 0.0, 1.0), (1.0, 1.0, 1.0))
-        cache[transform_id] = result
-        return result
-
-    if data.parent_transform_id is None:
-        result = (
-            data.local_position,
-            data.local_rotation,
-            data.local_scale,
-        )
-        cache[transform_id] = result
-        return result
+    def __init__(self, buf, spans: Dict[int, Tuple[int, int]]) -> None:
+        self._buf = buf
+        self._spans = spans
+        self._parsed: Dict[int, TransformData] = {}
 
-    parent_pos, parent_rot, parent_scale = compute_world_transform(
-        data.parent_transform_id, transforms, cache
-    )
+    def __getitem__(self, transform_id: int) -> TransformData:
+        data = self._parsed.get(transform_id)
+        if data is None:
+            start, end = self._spans[transform_id]
+            text = self._buf[start:end].decode("utf-8", errors="ignore")
+            data = self._parsed[transform_id] = parse_transform_block(transform_id, split_lines(text))
+        return data
 
-    scaled_local = (
-        parent_scale[0] * data.local_position[0],
-        parent_scale[1] * data.local_position[1],
-        parent_scale[2] * data.local_position[2],
-    )
-    rotated = rotate_vector(parent_rot, scaled_local)
-    world_pos = (
-        parent_pos[0] + rotated[0],
-        parent_pos[1] + rotated[1],
-        parent_pos[2] + rotated[2],
-    )
-    world_rot = quaternion_multiply(parent_rot, data.local_rotation)
-    world_scale = (
-        parent_scale[0] * data.local_scale[0],
-        parent_scale[1] * data.local_scale[1],
-        parent_scale[2] * data.local_scale[2],
-    )
-    result = (world_pos, world_rot, world_scale)
-    cache[transform_id] = result
-    return result
-
-
-def compute_world_position(
-    transform_id: int,
-    transforms: Dict[int, TransformData],
-    cache: Dict[
-        int,
-        Tuple[
-            Tuple[float, float, float],
-            Tuple[float, float, float, float],
-            Tuple[float, float, float],
-        ],
-    ],
-) -> Optional[Tuple[float, float, float]]:
-    if transform_id not in transforms:
-        return None
-    world_pos, _, _ = compute_world_transform(transform_id, transforms, cache)
-    return world_pos
+    def get(self, transform_id: int, default: Optional[TransformData] = None) -> Optional[TransformData]:
+        if transform_id not in self._spans:
+            return default
+        return self[transform_id]
+
+    def __contains__(self, transform_id: object) -> bool:
+        return transform_id in self._spans
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._spans)
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    @property
+    def parsed(self) -> int:
+        return len(self._parsed)
 
 
 def read_sprite_metadata(
     sprite_guid: str,
     guid_map: Dict[str, str],
+    assets: Optional[AssetStore] = None,
 ) -> Optional[Dict[str, Optional[str]]]:
-    asset_path = guid_map.get(sprite_guid)
-    if not asset_path or not os.path.isfile(asset_path):
+    """Path, name and texture reference of a sprite asset, loaded through `assets`."""
+    if assets is None:
+        assets = get_asset_store(guid_map)
+    asset = assets.get(sprite_guid)
+    if asset is None:
         return None
 
     sprite_name: Optional[str] = None
     texture_ref: Optional[Dict[str, Optional[str]]] = None
 
-    try:
-        with open(asset_path, "r", encoding="utf-8", errors="ignore") as fh:
-            for line in fh:
-                stripped = line.strip()
-                if stripped.startswith("m_Name:"):
-                    sprite_name = stripped.split(":", 1)[1].strip()
-                elif stripped.startswith("texture:"):
-                    texture_ref = parse_reference(stripped.split(":", 1)[1])
-                    break
-    except Exception:
-        pass
+    for line in asset.lines:
+        stripped = line.strip()
+        if stripped.startswith("m_Name:"):
+            sprite_name = stripped.split(":", 1)[1].strip()
+        elif stripped.startswith("texture:"):
+            texture_ref = parse_reference(stripped.split(":", 1)[1])
+            break
 
     return {
-        "path": asset_path,
+        "path": asset.path,
         "name": sprite_name,
         "texture": texture_ref,
     }
@@ -550,60 +431,122 @@ def parse_simple_poi_block(block: List[str]) -> Dict[str, object]:
     return data
 
 
-def collect_scene_data(
+class SceneStats:
+    """Document counts over the scenes parsed in one run."""
+
+    def __init__(self) -> None:
+        self.scenes = 0
+        self.transforms = 0
+        self.transforms_parsed = 0
+        self.behaviours = 0
+        self.behaviours_decoded = 0
+
+    def summary(self) -> str:
+        return (
+            f"[scenes] {self.scenes} parsed in one pass each: {self.transforms_parsed} of "
+            f"{self.transforms} Transforms and {self.behaviours_decoded} of {self.behaviours} "
+            "MonoBehaviours decoded"
+        )
+
+
+def parse_scene(
     scene_path: str,
-    lines: List[str],
-    transforms: Dict[int, TransformData],
-    go_to_transform: Dict[int, int],
-    component_to_gameobject: Dict[int, int],
+    stats: Optional[SceneStats] = None,
+    reads: Optional[ReadStats] = None,
 ) -> Tuple[List[Dict[str, object]], List[Dict[str, object]]]:
+    """Minimap settings blocks and POI entries (with world positions) of one scene.
+
+    A single walk over the scene's document index records what each later step
+    needs: byte ranges of Transforms and SpriteRenderers, each Transform's
+    GameObject (read straight from the bytes), and the parsed MiniMap/POI
+    MonoBehaviours. Transforms are only parsed when a POI or an `offsetReference`
+    needs them.
+    """
     map_settings_blocks: List[Dict[str, object]] = []
     poi_entries: List[Dict[str, object]] = []
-    transform_cache: Dict[
-        int,
-        Tuple[
-            Tuple[float, float, float],
-            Tuple[float, float, float, float],
-            Tuple[float, float, float],
-        ],
-    ] = {}
-
-    idx = 0
-    while idx < len(lines):
-        if not lines[idx].startswith("--- !u!"):
-            idx += 1
-            continue
-        block, idx = get_block(lines, idx)
-        class_id, _ = parse_block_header(block[0])
-        if class_id != 114:
-            continue
-
-        script_guid = None
-        script_file_id = None
-        for line in block:
-            stripped = line.strip()
-            if stripped.startswith("m_Script:"):
-                ref = parse_reference(stripped.split(":", 1)[1])
-                script_guid = ref.get("guid")
-                script_file_id = ref.get("fileID")
-                break
-
-        if script_guid != MINIMAP_SETTINGS_GUID or script_file_id is None:
-            continue
+    transform_spans: Dict[int, Tuple[int, int]] = {}
+    go_to_transform: Dict[int, int] = {}
+    renderer_spans: Dict[int, Tuple[int, int]] = {}
+    behaviours = behaviours_decoded = 0
+
+    with MappedYamlFile(scene_path) as scene:
+        buf = scene.buf
+        if reads is not None:
+            reads.add(len(buf), len(scene))
+        for class_id, file_id, start, end in zip(scene.class_ids, scene.file_ids, scene.starts, scene.ends):
+            if class_id == TRANSFORM_CLASS_ID:
+                transform_spans[file_id] = (start, end)
+                go_id = _game_object_of(buf, start, end)
+                if go_id is not None:
+                    go_to_transform[go_id] = file_id
+            elif class_id == SPRITE_RENDERER_CLASS_ID:
+                renderer_spans[file_id] = (start, end)
+            elif class_id == MONO_BEHAVIOUR_CLASS_ID:
+                behaviours += 1
+                # other scripts cannot reference the MiniMap GUID; skip them undecoded
+                if buf.find(_MINIMAP_SETTINGS_GUID_BYTES, start, end) < 0:
+                    continue
+                behaviours_decoded += 1
+                block = split_lines(buf[start:end].decode("utf-8", errors="ignore"))
+                script_ref = None
+                for line in block:
+                    stripped = line.strip()
+                    if stripped.startswith("m_Script:"):
+                        script_ref = parse_reference(stripped.split(":", 1)[1])
+                        break
+                if script_ref is None or script_ref.get("guid") != MINIMAP_SETTINGS_GUID:
+                    continue
+                if script_ref.get("fileID") == MINIMAP_SETTINGS_FILE_ID:
+                    map_settings_blocks.append(parse_minimap_settings_block(block))
+                elif script_ref.get("fileID") == SIMPLE_POI_FILE_ID:
+                    poi_entries.append(parse_simple_poi_block(block))
 
-        if script_file_id == MINIMAP_SETTINGS_FILE_ID:
-            map_settings_blocks.append(parse_minimap_settings_block(block))
-        elif script_file_id == SIMPLE_POI_FILE_ID:
-            entry = parse_simple_poi_block(block)
+        transforms = LazyTransforms(buf, transform_spans)
+        poi_transforms: List[Tuple[Dict[str, object], int]] = []
+        for entry in poi_entries:
             go_id = entry.get("gameObjectId")
             if isinstance(go_id, int):
                 transform_id = go_to_transform.get(go_id)
                 if transform_id is not None:
-                    world = compute_world_position(
-                        transform_id, transforms, transform_cache
+                    poi_transforms.append((entry, transform_id))
+        # all POIs of the scene share one solve over their ancestors
+        positions = world_positions(transforms, [transform_id for _, transform_id in poi_transforms])
+        for entry, transform_id in poi_transforms:
+            entry["worldPosition"] = positions[transform_id]
+
+        # resolve offset references for maps
+        for settings in map_settings_blocks:
+            for entry in settings.get("maps", []):
+                if not isinstance(entry, dict):
+                    continue
+                offset_ref = entry.get("offsetReference")
+                if not isinstance(offset_ref, dict):
+                    continue
+                offset_component_id = offset_ref.get("fileID")
+                if not isinstance(offset_component_id, int):
+                    continue
+                span = renderer_spans.get(offset_component_id)
+                if span is None:
+                    continue
+                go_id = _game_object_of(buf, *span)
+                if go_id is None:
+                    continue
+                transform_id = go_to_transform.get(go_id)
+                if transform_id is None:
+                    continue
+                transform_data = transforms.get(transform_id)
+                if transform_data:
+                    entry["offset"] = (
+                        transform_data.local_position[0],
+                        transform_data.local_position[1],
                     )
-                    entry["worldPosition"] = world
-            poi_entries.append(entry)
+
+        if stats is not None:
+            stats.scenes += 1
+            stats.transforms += len(transform_spans)
+            stats.transforms_parsed += transforms.parsed
+            stats.behaviours += behaviours
+            stats.behaviours_decoded += behaviours_decoded
 
     # enrich POIs with fallback scene IDs from map settings
     scene_ids: List[str] = []
@@ -627,36 +570,12 @@ def collect_scene_data(
             scene_targets.append(scene_name)
         entry["sceneIds"] = sorted(set(scene_targets))
 
-    # resolve offset references for maps
-    for settings in map_settings_blocks:
-        for entry in settings.get("maps", []):
-            if not isinstance(entry, dict):
-                continue
-            offset_ref = entry.get("offsetReference")
-            if not isinstance(offset_ref, dict):
-                continue
-            offset_component_id = offset_ref.get("fileID")
-            if not isinstance(offset_component_id, int):
-                continue
-            go_id = component_to_gameobject.get(offset_component_id)
-            if go_id is None:
-                continue
-            transform_id = go_to_transform.get(go_id)
-            if transform_id is None:
-                continue
-            transform_data = transforms.get(transform_id)
-            if transform_data:
-                entry["offset"] = (
-                    transform_data.local_position[0],
-                    transform_data.local_position[1],
-                )
-
     return map_settings_blocks, poi_entries
 
 
 def localize_text(
     key: str,
-    localization: Dict[str, Dict[str, str]],
+    localization: Localization,
     preferred_lang: str,
 ) -> str:
     if not key:
@@ -686,50 +605,63 @@ def sanitize_filename(name: str) -> str:
     return safe or "unnamed"
 
 
-def main() -> None:
-    args = parse_args()
-    export_root = os.path.abspath(args.export_root)
-    if not os.path.isdir(os.path.join(export_root, "Assets")):
-        print(
-            f"[ERR] {export_root} does not look like an AssetRipper ExportedProject.",
-            file=sys.stderr,
-        )
-        sys.exit(1)
-
-    out_root = os.path.abspath(args.out)
-    data_dir = os.path.join(out_root, "data")
-    maps_asset_dir = os.path.join(out_root, "assets", "maps")
-
-    ensure_directory(out_root)
-    ensure_directory(data_dir)
-    remove_directory(maps_asset_dir)
-    ensure_directory(maps_asset_dir)
-
-    localization = parse_localization(export_root, languages=[args.lang, "en"])
-    guid_map = build_guid_map(export_root)
-
-    maps_output: List[Dict[str, object]] = []
-    markers_output: List[Dict[str, object]] = []
-    texture_destinations: Dict[str, str] = {}
+SceneData = Tuple[str, List[Dict[str, object]], List[Dict[str, object]]]
 
-    scenes_root = os.path.join(export_root, "Assets", "Scenes")
-    scene_file_paths: List[str] = []
-    for dirpath, _, filenames in os.walk(scenes_root):
-        for fname in filenames:
-            if fname.endswith(".unity"):
-                scene_file_paths.append(os.path.join(dirpath, fname))
-    scene_file_paths.sort()
-
-    for scene_path in scene_file_paths:
-        with open(scene_path, "r", encoding="utf-8", errors="ignore") as fh:
-            lines = fh.readlines()
-        transforms, go_to_transform, component_to_go = (
-            collect_transforms_and_components(lines)
-        )
-        map_blocks, poi_entries = collect_scene_data(
-            scene_path, lines, transforms, go_to_transform, component_to_go
-        )
 
+def iter_scenes(
+    scene_paths: Iterable[str],
+    cache: ParseCache,
+    reads: Optional[ReadStats] = None,
+) -> Iterator[SceneData]:
+    """(scene path, minimap settings blocks, POI entries) for each scene, cached per file."""
+    # scenes without MiniMap/POI scripts produce no output; skip them undecoded
+    prefilter = Prefilter("scenes", (MINIMAP_SETTINGS_GUID,), reads=reads)
+    stats = SceneStats()
+    for scene_path in scene_paths:
+        hit, cached = cache.get(scene_path)
+        if hit:
+            map_blocks, poi_entries = cached
+        else:
+            if prefilter.matches(scene_path):
+                map_blocks, poi_entries = parse_scene(scene_path, stats, reads)
+            else:
+                map_blocks, poi_entries = [], []
+            cache.put(scene_path, (map_blocks, poi_entries))
+        yield scene_path, map_blocks, poi_entries
+    print(prefilter.summary())
+    print(stats.summary())
+    # every scene was looked up, so entries for any other path are stale
+    cache.prune()
+    print(cache.summary())
+
+
+def parse_scenes(
+    scene_paths: List[str],
+    cache: ParseCache,
+    reads: Optional[ReadStats] = None,
+) -> List[SceneData]:
+    return list(iter_scenes(scene_paths, cache, reads))
+
+
+def iter_map_records(
+    export_root: str,
+    scenes: Iterable[SceneData],
+    guid_map: Dict[str, str],
+    localization: Localization,
+    lang: str,
+    rotation_cw: float,
+    texture_destinations: Dict[str, str],
+    assets: Optional[AssetStore] = None,
+) -> Iterator[Tuple[str, Dict[str, object]]]:
+    """("map" | "marker", record) per scene, in output order.
+
+    Textures the maps need are added to `texture_destinations` (source -> site path)
+    as their records are produced. Sprite assets are read through `assets`, so a
+    sprite shared by several scenes is only loaded once.
+    """
+    if assets is None:
+        assets = get_asset_store(guid_map)
+    for scene_path, map_blocks, poi_entries in scenes:
         scene_rel_path = normalize_scene_path(export_root, scene_path)
 
         for settings in map_blocks:
@@ -742,7 +674,7 @@ def main() -> None:
                 sprite_guid = sprite_ref.get("guid")
                 if not sprite_guid:
                     continue
-                sprite_meta = read_sprite_metadata(sprite_guid, guid_map)
+                sprite_meta = read_sprite_metadata(sprite_guid, guid_map, assets)
                 if not sprite_meta:
                     continue
                 texture_ref = sprite_meta.get("texture")
@@ -769,7 +701,7 @@ def main() -> None:
                 image_world_size = entry.get("imageWorldSize")
                 if isinstance(image_world_size, (int, float)) and texture_width:
                     pixel_size = float(image_world_size) / float(texture_width)
-                maps_output.append(
+                yield "map", (
                     {
                         "sceneId": entry.get("sceneID"),
                         "sourceScene": scene_rel_path,
@@ -778,7 +710,7 @@ def main() -> None:
                         "mapWorldCenter": entry.get("mapWorldCenter"),
                         "hide": entry.get("hide", False),
                         "noSignal": entry.get("noSignal", False),
-                        "rotationCW": args.rotation_cw,
+                        "rotationCW": rotation_cw,
                         "pixelSize": pixel_size,
                         "sprite": {
                             "guid": sprite_guid,
@@ -806,9 +738,9 @@ def main() -> None:
 
         for entry in poi_entries:
             name_key = entry.get("displayName", "")
-            localized = localize_text(name_key, localization, args.lang)
+            localized = localize_text(name_key, localization, lang)
             marker_world = entry.get("worldPosition")
-            markers_output.append(
+            yield "marker", (
                 {
                     "name": name_key,
                     "nameLocalized": localized,
@@ -828,25 +760,496 @@ def main() -> None:
                 }
             )
 
-    # Copy required textures.
+
+def _is_number(value: object) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_finite(value: object) -> bool:
+    return _is_number(value) and math.isfinite(value)  # type: ignore[arg-type]
+
+
+def marker_on_map(map_record: Dict[str, object], marker: Dict[str, object]) -> bool:
+    """Whether the viewer lists `marker` for `map_record` (scene, source folder, style, bounds)."""
+    source_dir = str(map_record.get("sourceSceneDir") or "").lower()
+    source_scene = marker.get("sourceScene")
+    if source_dir and isinstance(source_scene, str) and not source_scene.lower().startswith(source_dir):
+        return False
+    if marker.get("hideIcon"):
+        return False
+    color = marker.get("color")
+    if isinstance(color, (list, tuple)) and len(color) >= 4 and _is_number(color[3]) and color[3] <= 0:
+        return False
+    world = marker.get("worldPosition")
+    if not isinstance(world, (list, tuple)):
+        return False
+    image_world_size = map_record.get("imageWorldSize")
+    if not _is_number(image_world_size) or image_world_size <= 0:  # type: ignore[operator]
+        return True
+    center = map_record.get("mapWorldCenter")
+    if not isinstance(center, (list, tuple)) or len(center) < 3 or len(world) < 3:
+        return True
+    wx, wz, cx, cz = world[0], world[2], center[0], center[2]
+    if not all(_is_finite(value) for value in (wx, wz, cx, cz)):
+        return True
+    half_span = image_world_size / 2 + MARKER_BOUNDS_EPSILON  # type: ignore[operator]
+    return abs(wx - cx) <= half_span and abs(wz - cz) <= half_span
+
+
+def project_world_to_map(
+    world: object, map_record: Dict[str, object]
+) -> Optional[Tuple[float, float]]:
+    """Texture pixel (x right, y down) of a world position, or None off the texture."""
+    texture = map_record.get("texture")
+    center = map_record.get("mapWorldCenter")
+    pixel_size = map_record.get("pixelSize")
+    if not isinstance(texture, dict) or not isinstance(center, (list, tuple)):
+        return None
+    if not isinstance(world, (list, tuple)) or not _is_number(pixel_size) or not pixel_size:
+        return None
+    width = texture.get("width")
+    height = texture.get("height")
+    if not width or not height:
+        return None
+    x = width / 2 + (world[0] - center[0]) / pixel_size
+    y = height / 2 - (world[2] - center[2]) / pixel_size
+    if not (0 <= x <= width and 0 <= y <= height):
+        return None
+    return x, y
+
+
+def assign_visible_markers(
+    maps: List[Dict[str, object]], markers: List[Dict[str, object]]
+) -> None:
+    """Add `visibleMarkers` to each map: indices into `markers` the viewer lists for it,
+    in marker order, each with its pixel `x`/`y` (None when it falls off the texture)."""
+    by_scene: Dict[str, List[int]] = {}
+    for index, marker in enumerate(markers):
+        scene_ids = marker.get("sceneIds")
+        if isinstance(scene_ids, (list, tuple)):
+            for scene_id in dict.fromkeys(scene_ids):
+                by_scene.setdefault(scene_id, []).append(index)
+    for map_record in maps:
+        scene_id = map_record.get("sceneId")
+        # a map without a sceneId shows markers of every scene (and unscoped ones)
+        candidates = by_scene.get(scene_id, []) if scene_id else range(len(markers))
+        visible = []
+        for index in candidates:
+            marker = markers[index]
+            if not marker_on_map(map_record, marker):
+                continue
+            pixel = project_world_to_map(marker.get("worldPosition"), map_record)
+            visible.append(
+                {
+                    "index": index,
+                    "x": round(pixel[0], 2) if pixel else None,
+                    "y": round(pixel[1], 2) if pixel else None,
+                }
+            )
+        map_record["visibleMarkers"] = visible
+
+
+def build_map_payload(
+    export_root: str,
+    scenes: List[SceneData],
+    guid_map: Dict[str, str],
+    localization: Localization,
+    lang: str,
+    rotation_cw: float,
+    assets: Optional[AssetStore] = None,
+) -> Tuple[List[Dict[str, object]], List[Dict[str, object]], Dict[str, str]]:
+    """Viewer map and marker records plus the textures (source -> site path) they need."""
+    outputs: Dict[str, List[Dict[str, object]]] = {"map": [], "marker": []}
+    texture_destinations: Dict[str, str] = {}
+    for kind, record in iter_map_records(
+        export_root, scenes, guid_map, localization, lang, rotation_cw, texture_destinations, assets
+    ):
+        outputs[kind].append(record)
+    assign_visible_markers(outputs["map"], outputs["marker"])
+    return outputs["map"], outputs["marker"], texture_destinations
+
+
+def prepare_site(out_root: str) -> None:
+    """Create the output dirs; copied textures are kept for `copy_textures` to sync."""
+    ensure_directory(out_root)
+    ensure_directory(os.path.join(out_root, "data"))
+    ensure_directory(os.path.join(out_root, "assets", "maps"))
+
+
+def copy_textures(
+    out_root: str,
+    texture_destinations: Dict[str, str],
+    texture_sync: Optional[FileSync] = None,
+) -> FileSync:
+    """Mirror the textures into assets/maps: only new or changed files are copied,
+    files no map uses any more are deleted. Returns the sync, for its counters."""
+    if texture_sync is None:
+        texture_sync = FileSync(os.path.join(out_root, "assets", "maps"))
+    files: Dict[str, str] = {}
     for src_path, dest_rel in texture_destinations.items():
         dest_path = os.path.join(out_root, dest_rel)
-        ensure_directory(os.path.dirname(dest_path))
-        shutil.copy2(src_path, dest_path)
+        files[os.path.relpath(dest_path, texture_sync.root)] = src_path
+    texture_sync.sync(files)
+    return texture_sync
+
+
+def tile_textures(
+    out_root: str,
+    texture_destinations: Dict[str, str],
+    tile_size: int,
+    jobs: int,
+) -> Tuple[Dict[str, Dict[str, object]], List[PyramidResult]]:
+    """Build (or keep) one tile pyramid per texture and drop pyramids nothing uses.
+
+    Returns the `texture.tiles` entry for each texture's site path, plus the build
+    results. Textures that cannot be tiled get no entry and are shown whole.
+    """
+    tiles_root = os.path.join(out_root, TILE_DIR)
+    ensure_directory(tiles_root)
+    targets: Dict[str, str] = {}
+    for dest_rel in texture_destinations.values():
+        targets[dest_rel] = os.path.splitext(os.path.basename(dest_rel))[0]
+    tasks = [
+        (src_path, os.path.join(tiles_root, targets[dest_rel]))
+        for src_path, dest_rel in texture_destinations.items()
+    ]
+    results = build_pyramids(tasks, tile_size, jobs)
+    keep = set(targets.values())
+    for name in os.listdir(tiles_root):
+        if name not in keep:
+            path = os.path.join(tiles_root, name)
+            if os.path.isdir(path):
+                remove_directory(path)
+            else:
+                os.remove(path)
+
+    tiles_by_texture: Dict[str, Dict[str, object]] = {}
+    for dest_rel, result in zip(texture_destinations.values(), results):
+        if result.error:
+            print(f"[WARN] Could not tile {result.source}: {result.error}", file=sys.stderr)
+        if result.manifest is None:
+            continue
+        tiles_by_texture[dest_rel] = {
+            "path": os.path.join(TILE_DIR, targets[dest_rel]),
+            "tileSize": result.manifest["tileSize"],
+            "levels": result.manifest["levels"],
+        }
+    return tiles_by_texture, results
+
+
+def attach_tiles(
+    maps_output: List[Dict[str, object]],
+    tiles_by_texture: Dict[str, Dict[str, object]],
+) -> None:
+    """Set `texture.tiles` on every map whose texture has a pyramid."""
+    for map_record in maps_output:
+        texture = map_record.get("texture")
+        if not isinstance(texture, dict):
+            continue
+        tiles = tiles_by_texture.get(texture.get("relativePath"))
+        if tiles:
+            texture["tiles"] = tiles
+
 
-    payload = {
+def payload_header(export_root: str) -> Dict[str, object]:
+    return {
         "generatedAt": dt.datetime.utcnow().isoformat(timespec="seconds") + "Z",
         "exportRoot": export_root,
-        "maps": maps_output,
-        "markers": markers_output,
     }
-    json_path = os.path.join(data_dir, "maps.json")
+
+
+def write_site(
+    out_root: str,
+    export_root: str,
+    maps_output: List[Dict[str, object]],
+    markers_output: List[Dict[str, object]],
+    texture_destinations: Dict[str, str],
+    texture_sync: Optional[FileSync] = None,
+) -> str:
+    """Sync minimap textures and write data/maps.json; returns the JSON path."""
+    prepare_site(out_root)
+    copy_textures(out_root, texture_destinations, texture_sync)
+    # the viewer prefers a manifest, so drop one left by an earlier --format shards run
+    remove_sharded_data(out_root)
+
+    payload = payload_header(export_root)
+    payload["maps"] = maps_output
+    payload["markers"] = markers_output
+    json_path = os.path.join(out_root, "data", "maps.json")
     with open(json_path, "w", encoding="utf-8") as fh:
         json.dump(payload, fh, indent=2)
-    print(f"[OK] Wrote {json_path}")
+    return json_path
+
+
+def shard_key(map_record: Dict[str, object]) -> str:
+    """File-name stem of the shard holding a map: its sceneId (or texture GUID)."""
+    texture = map_record.get("texture")
+    texture_guid = texture.get("guid") if isinstance(texture, dict) else None
+    return sanitize_filename(str(map_record.get("sceneId") or texture_guid or "unscoped"))
+
+
+def build_shards(
+    maps_output: List[Dict[str, object]],
+    markers_output: List[Dict[str, object]],
+) -> Dict[str, Dict[str, object]]:
+    """shard key -> {"key", "maps", "markers"}, maps grouped by `shard_key`.
+
+    Each shard carries only the markers its maps list, and `visibleMarkers`
+    indices are renumbered into the shard's own `markers` array.
+    """
+    shards: Dict[str, Dict[str, object]] = {}
+    local_indices: Dict[str, Dict[int, int]] = {}
+    for map_record in maps_output:
+        key = shard_key(map_record)
+        shard = shards.get(key)
+        if shard is None:
+            shard = shards[key] = {"key": key, "maps": [], "markers": []}
+            local_indices[key] = {}
+        local = local_indices[key]
+        shard_markers: List[Dict[str, object]] = shard["markers"]  # type: ignore[assignment]
+        entries = []
+        for entry in map_record.get("visibleMarkers") or []:
+            index = entry["index"]
+            local_index = local.get(index)
+            if local_index is None:
+                local_index = local[index] = len(shard_markers)
+                shard_markers.append(markers_output[index])
+            entries.append(dict(entry, index=local_index))
+        shard["maps"].append(dict(map_record, visibleMarkers=entries))  # type: ignore[union-attr]
+    return shards
+
+
+def remove_sharded_data(out_root: str) -> None:
+    data_dir = os.path.join(out_root, "data")
+    manifest_path = os.path.join(data_dir, MANIFEST_FILE)
+    if os.path.isfile(manifest_path):
+        os.remove(manifest_path)
+    remove_directory(os.path.join(data_dir, SHARD_DIR))
+
+
+def write_sharded_site(
+    out_root: str,
+    export_root: str,
+    maps_output: List[Dict[str, object]],
+    markers_output: List[Dict[str, object]],
+    texture_destinations: Dict[str, str],
+    texture_sync: Optional[FileSync] = None,
+) -> Tuple[str, List[str], int]:
+    """Sync minimap textures, write one content-hashed shard per scene and the manifest.
+
+    Shards whose content is unchanged keep their file (same name, same bytes), so
+    browsers can cache them indefinitely; shards no longer referenced are deleted.
+    Returns (manifest path, shard paths, number of shards actually written).
+    """
+    prepare_site(out_root)
+    copy_textures(out_root, texture_destinations, texture_sync)
+    data_dir = os.path.join(out_root, "data")
+    shard_dir = os.path.join(data_dir, SHARD_DIR)
+    ensure_directory(shard_dir)
+
+    shard_refs: Dict[str, str] = {}
+    shard_paths: List[str] = []
+    written = 0
+    for key, shard in build_shards(maps_output, markers_output).items():
+        body = json.dumps(shard, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.blake2b(body, digest_size=SHARD_HASH_BYTES).hexdigest()
+        filename = f"{key}.{digest}.json"
+        path = os.path.join(shard_dir, filename)
+        if not os.path.isfile(path):
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as fh:
+                fh.write(body)
+            os.replace(tmp_path, path)
+            written += 1
+        shard_refs[key] = f"{SHARD_DIR}/{filename}"
+        shard_paths.append(path)
+
+    referenced = {os.path.basename(path) for path in shard_paths}
+    for name in os.listdir(shard_dir):
+        if name not in referenced:
+            os.remove(os.path.join(shard_dir, name))
+    json_path = os.path.join(data_dir, "maps.json")
+    if os.path.isfile(json_path):
+        os.remove(json_path)
+
+    manifest = payload_header(export_root)
+    manifest_maps = []
+    positions: Dict[str, int] = {}
+    for map_record in maps_output:
+        key = shard_key(map_record)
+        position = positions.get(key, 0)
+        positions[key] = position + 1
+        summary = {name: value for name, value in map_record.items() if name != "visibleMarkers"}
+        summary["shard"] = {"path": shard_refs[key], "map": position}
+        manifest_maps.append(summary)
+    manifest["maps"] = manifest_maps
+    manifest["shards"] = shard_refs
+    manifest_path = os.path.join(data_dir, MANIFEST_FILE)
+    with open(manifest_path, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+    return manifest_path, shard_paths, written
+
+
+def stream_site(
+    out_root: str,
+    export_root: str,
+    records: Iterable[Tuple[str, Dict[str, object]]],
+    texture_destinations: Dict[str, str],
+    out: IO[str],
+    texture_sync: Optional[FileSync] = None,
+) -> Dict[str, int]:
+    """Write a header line then one `{"kind": ..., **record}` line per record as it is
+    produced; textures collected along the way are synced once the records are done.
+    Returns the number of records written per kind."""
+    prepare_site(out_root)
+    # the viewer prefers a manifest, so drop one left by an earlier --format shards run
+    remove_sharded_data(out_root)
+    header = {"kind": "header"}
+    header.update(payload_header(export_root))
+    write_ndjson_line(out, header)
+    counts = {"map": 0, "marker": 0}
+    for kind, record in records:
+        line = {"kind": kind}
+        line.update(record)
+        write_ndjson_line(out, line)
+        counts[kind] += 1
+    copy_textures(out_root, texture_destinations, texture_sync)
+    return counts
+
+
+def run(args: argparse.Namespace, export_root: str, ndjson_out: Optional[IO[str]] = None) -> None:
+    out_root = os.path.abspath(args.out)
+    maps_asset_dir = os.path.join(out_root, "assets", "maps")
+
+    profiler = profiler_from_args(args, "extract_map_data")
+    localization = localization_from_args(args)
+    index = export_index_from_args(args)
+    record_index_phases(profiler, index)
+    guid_map = index.absolute_guid_map()
+    assets = asset_store_from_args(args, guid_map)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    texture_sync = file_sync_from_args(args, maps_asset_dir, jobs)
+
+    scenes_root = os.path.join(export_root, "Assets", "Scenes")
+    scene_file_paths = sorted(index.files((".unity",), under=scenes_root))
+    scene_cache = parse_cache_from_args(args, "scenes", SCENE_PARSER_VERSION)
+    reads = profiler.read_stats()
+    if ndjson_out is not None:
+        texture_destinations: Dict[str, str] = {}
+        # each scene's records are written before the next scene is parsed
+        try:
+            with profiler.phase("stream"):
+                records = iter_map_records(
+                    export_root,
+                    iter_scenes(scene_file_paths, scene_cache, reads),
+                    guid_map,
+                    localization,
+                    args.lang,
+                    args.rotation_cw,
+                    texture_destinations,
+                    assets,
+                )
+                counts = stream_site(
+                    out_root, export_root, records, texture_destinations, ndjson_out, texture_sync
+                )
+        finally:
+            scene_cache.close()
+        print(localization.summary())
+        print(assets.summary())
+        print(texture_sync.summary())
+        print(f"[OK] Wrote {counts['map']} maps and {counts['marker']} markers to {args.out_ndjson}")
+        print(
+            f"[OK] Synced {len(texture_destinations)} minimap textures into {maps_asset_dir}"
+        )
+        if profiler.enabled:
+            profiler.count_reads("stream", reads)
+            profiler.count("stream", records=counts["map"] + counts["marker"])
+            profiler.write(args.profile)
+        return
+
+    try:
+        with profiler.phase("parse"):
+            scenes = parse_scenes(scene_file_paths, scene_cache, reads)
+    finally:
+        scene_cache.close()
+
+    with profiler.phase("enrich"):
+        maps_output, markers_output, texture_destinations = build_map_payload(
+            export_root, scenes, guid_map, localization, args.lang, args.rotation_cw, assets
+        )
+    print(localization.summary())
+    print(assets.summary())
+
+    tile_results: List[PyramidResult] = []
+    if args.tiles:
+        with profiler.phase("tiles"):
+            tiles_by_texture, tile_results = tile_textures(
+                out_root, texture_destinations, args.tile_size, jobs
+            )
+            attach_tiles(maps_output, tiles_by_texture)
+        print(pyramid_summary(tile_results))
+    else:
+        # maps without `texture.tiles` never look at old pyramids
+        remove_directory(os.path.join(out_root, TILE_DIR))
+
+    with profiler.phase("write"):
+        if args.format == "shards":
+            json_path, shard_paths, written = write_sharded_site(
+                out_root, export_root, maps_output, markers_output, texture_destinations, texture_sync
+            )
+        else:
+            json_path = write_site(
+                out_root, export_root, maps_output, markers_output, texture_destinations, texture_sync
+            )
+            shard_paths = []
+    print(texture_sync.summary())
+    if args.format == "shards":
+        print(
+            f"[OK] Wrote {json_path} and {len(shard_paths)} shards "
+            f"({written} new, {len(shard_paths) - written} unchanged)"
+        )
+    else:
+        print(f"[OK] Wrote {json_path}")
     print(
-        f"[OK] Copied {len(texture_destinations)} minimap textures into {maps_asset_dir}"
+        f"[OK] Synced {len(texture_destinations)} minimap textures into {maps_asset_dir}"
     )
+    if profiler.enabled:
+        records = len(maps_output) + len(markers_output)
+        profiler.count_reads("parse", reads)
+        profiler.count("parse", records=sum(len(s[1]) + len(s[2]) for s in scenes))
+        profiler.count("enrich", records=records)
+        profiler.count_files("write", [json_path, *shard_paths, *texture_destinations])
+        profiler.count("write", records=records)
+        if tile_results:
+            profiler.count(
+                "tiles",
+                records=sum(result.tiles for result in tile_results if result.built),
+            )
+        profiler.write(args.profile)
+
+
+def main() -> None:
+    args = parse_args()
+    export_root = os.path.abspath(args.export_root)
+    if not os.path.isdir(os.path.join(export_root, "Assets")):
+        print(
+            f"[ERR] {export_root} does not look like an AssetRipper ExportedProject.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    # the index, scene filter and texture paths all have to agree on the same root
+    args.export_root = export_root
+
+    if args.format == "ndjson":
+        if args.tiles:
+            print("[ERR] --tiles needs --format json or shards.", file=sys.stderr)
+            sys.exit(1)
+        if args.out_ndjson is None:
+            args.out_ndjson = os.path.join(os.path.abspath(args.out), "data", "maps.ndjson")
+        with open_ndjson(args.out_ndjson) as out, logs_to_stderr(args.out_ndjson == STDOUT_PATH):
+            run(args, export_root, out)
+    else:
+        run(args, export_root)
 
 
 if __name__ == "__main__":
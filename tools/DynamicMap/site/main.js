@@ -6,25 +6,55 @@ const state = {
   mapIndex: new Map(),
   currentMap: null,
   currentMarkers: [],
+  currentPixels: null,
+  shards: new Map(),
+  selectToken: 0,
   markerElements: [],
   mapRotation: 0,
+  tileLevel: null,
+  tileObserver: null,
 };
 
 const mapSelect = document.querySelector("#map-select");
 const mapImage = document.querySelector("#map-image");
+const tileLayer = document.querySelector("#tile-layer");
 const markerLayer = document.querySelector("#marker-layer");
 const markerListEl = document.querySelector("#marker-list");
 const mapMetaEl = document.querySelector("#map-meta");
 const generatedMetaEl = document.querySelector("#generated-meta");
 const mapRotator = document.querySelector("#map-rotator");
 
+// data/manifest.json (--format shards) when present, else data/maps.json
+async function loadPayload() {
+  const manifest = await fetch("data/manifest.json", { cache: "no-store" });
+  if (manifest.ok) {
+    return manifest.json();
+  }
+  const response = await fetch("data/maps.json", { cache: "no-store" });
+  if (!response.ok) {
+    throw new Error(`Failed to load maps.json (${response.status})`);
+  }
+  return response.json();
+}
+
+// shard files are named by content hash, so the normal HTTP cache can keep them
+function loadShard(path) {
+  if (!state.shards.has(path)) {
+    const pending = fetch(`data/${path}`).then((response) => {
+      if (!response.ok) {
+        throw new Error(`Failed to load ${path} (${response.status})`);
+      }
+      return response.json();
+    });
+    pending.catch(() => state.shards.delete(path));
+    state.shards.set(path, pending);
+  }
+  return state.shards.get(path);
+}
+
 async function bootstrap() {
   try {
-    const response = await fetch("data/maps.json", { cache: "no-store" });
-    if (!response.ok) {
-      throw new Error(`Failed to load maps.json (${response.status})`);
-    }
-    const payload = await response.json();
+    const payload = await loadPayload();
     state.data = payload;
     generatedMetaEl.textContent = `Generated at ${payload.generatedAt || "unknown time"}`;
     setupMaps(payload.maps || []);
@@ -86,13 +116,35 @@ function setupMarkers(markers) {
   state.markers = Array.isArray(markers) ? markers : [];
 }
 
-function selectMap(mapId) {
+async function selectMap(mapId) {
   const map = state.mapIndex.get(mapId);
   if (!map) {
     return;
   }
+  const token = ++state.selectToken;
+  if (map.shard && !Array.isArray(map.visibleMarkers)) {
+    try {
+      const shard = await loadShard(map.shard.path);
+      const shardMap = (shard.maps || [])[map.shard.map] || {};
+      map.visibleMarkers = shardMap.visibleMarkers || [];
+      map.shardMarkers = shard.markers || [];
+    } catch (err) {
+      console.error(err);
+      if (token === state.selectToken) {
+        mapMetaEl.textContent =
+          "Unable to load map data. Check the console for details.";
+      }
+      return;
+    }
+    if (token !== state.selectToken) {
+      // another map was picked while this shard loaded
+      return;
+    }
+  }
   state.currentMap = map;
-  state.currentMarkers = markersForMap(map);
+  const visible = markersForMap(map);
+  state.currentMarkers = visible.markers;
+  state.currentPixels = visible.pixels;
   state.mapRotation = typeof map.rotationCW === "number" ? map.rotationCW : 0;
   if (mapRotator) {
     if (state.mapRotation) {
@@ -105,12 +157,18 @@ function selectMap(mapId) {
   renderMarkerList(state.currentMarkers);
 
   mapImage.dataset.mapId = map.id;
-  const texturePath =
-    map.texture?.relativePath || map.texture?.sourcePath || "";
+  clearTiles();
+  // a tiled map shows its one-tile top level at once and adds detail tiles over it
+  const tiles = tiledTexture(map);
+  sizeMapBox(map, tiles);
+  const texturePath = tiles
+    ? tileUrl(tiles, tiles.levels.length - 1, 0, 0)
+    : map.texture?.relativePath || map.texture?.sourcePath || "";
   if (texturePath) {
     mapImage.src = texturePath;
     if (mapImage.complete && mapImage.naturalWidth) {
-      renderMarkers(map, state.currentMarkers);
+      renderMarkers(map, state.currentMarkers, state.currentPixels);
+      renderTiles(map);
     } else {
       clearMarkers();
     }
@@ -120,9 +178,143 @@ function selectMap(mapId) {
   }
 }
 
+// texture.tiles (extract_map_data.py --tiles): level 0 is full resolution and
+// each further level is half the size of the one before, down to a single tile
+function tiledTexture(map) {
+  const tiles = map.texture?.tiles;
+  return tiles && Array.isArray(tiles.levels) && tiles.levels.length > 0
+    ? tiles
+    : null;
+}
+
+// the base image of a tiled map is a single small tile, so the map box takes the
+// full texture size instead of the image's natural size; it then fills the
+// container like an untiled texture and pickTileLevel sees the real display width
+function sizeMapBox(map, tiles) {
+  const width = tiles ? map.texture?.width || tiles.levels[0].width : 0;
+  const height = tiles ? map.texture?.height || tiles.levels[0].height : 0;
+  if (width && height) {
+    mapImage.width = width;
+    mapImage.height = height;
+    if (mapRotator) {
+      mapRotator.style.width = `${width}px`;
+    }
+  } else {
+    mapImage.removeAttribute("width");
+    mapImage.removeAttribute("height");
+    if (mapRotator) {
+      mapRotator.style.width = "";
+    }
+  }
+}
+
+function tileUrl(tiles, z, column, row) {
+  return `${tiles.path}/${z}/${column}_${row}.png`;
+}
+
+// the smallest level that still has a texel for every device pixel shown
+function pickTileLevel(tiles, displayWidth) {
+  const needed = displayWidth * (window.devicePixelRatio || 1);
+  let z = 0;
+  tiles.levels.forEach((level, index) => {
+    if (level.width >= needed) {
+      z = index;
+    }
+  });
+  return z;
+}
+
+function renderTiles(map) {
+  const tiles = tiledTexture(map);
+  const displayWidth = mapImage.clientWidth;
+  if (!tileLayer || !tiles || !displayWidth) {
+    return;
+  }
+  const z = pickTileLevel(tiles, displayWidth);
+  if (tileLayer.dataset.mapId === map.id && state.tileLevel === z) {
+    return;
+  }
+  clearTiles();
+  tileLayer.dataset.mapId = map.id;
+  state.tileLevel = z;
+  if (z === tiles.levels.length - 1) {
+    // the base image already is this level
+    return;
+  }
+  const level = tiles.levels[z];
+  const size = tiles.tileSize;
+  // tiles are fetched only once they come near the viewport
+  const observer =
+    "IntersectionObserver" in window
+      ? new IntersectionObserver(loadVisibleTiles, { rootMargin: "256px" })
+      : null;
+  state.tileObserver = observer;
+  for (let row = 0; row < level.rows; row += 1) {
+    for (let column = 0; column < level.columns; column += 1) {
+      const x = column * size;
+      const y = row * size;
+      const el = document.createElement("img");
+      el.className = "tile";
+      el.alt = "";
+      el.style.left = `${(x / level.width) * 100}%`;
+      el.style.top = `${(y / level.height) * 100}%`;
+      el.style.width = `${(Math.min(size, level.width - x) / level.width) * 100}%`;
+      el.style.height = `${(Math.min(size, level.height - y) / level.height) * 100}%`;
+      el.dataset.src = tileUrl(tiles, z, column, row);
+      tileLayer.appendChild(el);
+      if (observer) {
+        observer.observe(el);
+      } else {
+        el.src = el.dataset.src;
+      }
+    }
+  }
+}
+
+function loadVisibleTiles(entries, observer) {
+  entries.forEach((entry) => {
+    if (!entry.isIntersecting) {
+      return;
+    }
+    entry.target.src = entry.target.dataset.src;
+    observer.unobserve(entry.target);
+  });
+}
+
+function clearTiles() {
+  if (state.tileObserver) {
+    state.tileObserver.disconnect();
+    state.tileObserver = null;
+  }
+  if (tileLayer) {
+    tileLayer.innerHTML = "";
+    delete tileLayer.dataset.mapId;
+  }
+  state.tileLevel = null;
+}
+
+// { markers, pixels }: the markers listed for a map and, when the data file has
+// them precomputed, their texture pixel positions (null entries are off-texture)
 function markersForMap(map) {
+  // sharded data indexes into the shard's own markers
+  const markers = map.shardMarkers || state.markers || [];
+  if (Array.isArray(map.visibleMarkers)) {
+    const entries = map.visibleMarkers.filter((entry) => markers[entry.index]);
+    return {
+      markers: entries.map((entry) => markers[entry.index]),
+      pixels: entries.map((entry) =>
+        typeof entry.x === "number" && typeof entry.y === "number"
+          ? { x: entry.x, y: entry.y }
+          : null,
+      ),
+    };
+  }
+  return { markers: filterMarkersForMap(map, markers), pixels: null };
+}
+
+// fallback for maps.json files generated before visibleMarkers existed
+function filterMarkersForMap(map, markers) {
   const mapSceneId = map.sceneId;
-  const markers = state.markers || [];
   const sourceDir = (map.sourceSceneDir || "").toLowerCase();
   const halfSpan =
     typeof map.imageWorldSize === "number" && map.imageWorldSize > 0
@@ -175,7 +367,7 @@ function markersForMap(map) {
     });
 }
 
-function renderMarkers(map, markers) {
+function renderMarkers(map, markers, pixels) {
   clearMarkers();
   const width = map.texture?.width;
   const height = map.texture?.height;
@@ -187,8 +379,10 @@ function renderMarkers(map, markers) {
   ) {
     return;
   }
-  markers.forEach((marker) => {
-    const position = projectWorldToMap(marker.worldPosition, map);
+  markers.forEach((marker, index) => {
+    const position = pixels
+      ? pixels[index]
+      : projectWorldToMap(marker.worldPosition, map);
     if (!position) {
       return;
     }
@@ -253,11 +447,13 @@ function updateMarkerPositions() {
   if (!state.markerElements.length) {
     return;
   }
-  const naturalWidth = mapImage.naturalWidth;
-  const naturalHeight = mapImage.naturalHeight;
-  if (!naturalWidth || !naturalHeight) {
+  if (!mapImage.naturalWidth || !mapImage.naturalHeight) {
     return;
   }
+  // marker pixels are in full-texture space; a tiled map's base image is smaller
+  const naturalWidth = state.currentMap?.texture?.width || mapImage.naturalWidth;
+  const naturalHeight =
+    state.currentMap?.texture?.height || mapImage.naturalHeight;
   const scaleX = mapImage.clientWidth / naturalWidth;
   const scaleY = mapImage.clientHeight / naturalHeight;
   state.markerElements.forEach((el) => {
@@ -369,8 +565,14 @@ mapImage.addEventListener("load", () => {
   if (mapImage.dataset.mapId !== state.currentMap.id) {
     return;
   }
-  renderMarkers(state.currentMap, state.currentMarkers);
+  renderMarkers(state.currentMap, state.currentMarkers, state.currentPixels);
+  renderTiles(state.currentMap);
 });
 
-window.addEventListener("resize", updateMarkerPositions);
+window.addEventListener("resize", () => {
+  updateMarkerPositions();
+  if (state.currentMap) {
+    renderTiles(state.currentMap);
+  }
+});
 document.addEventListener("DOMContentLoaded", bootstrap);
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+GUID-addressed loading of referenced assets, memoized under a bounded LRU.
+
+Scenes, presets and prefabs refer to other assets by GUID. `AssetStore` resolves a
+GUID through the export's guid map, reads the file once and keeps it split into its
+`--- !u!` documents, so following the same reference again (the same minimap sprite
+from several scenes, the loot box prefab shared by a whole preset group) is a
+dictionary hit instead of another open-and-scan. The cache is bounded by entry
+count and/or total file bytes; least recently used assets are evicted first.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from collections import OrderedDict
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from unity_yaml import UnityDocument, iter_documents, split_lines
+
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_MB = 256
+
+_MISSING = object()
+
+
+class LoadedAsset:
+    """One asset file: its path, raw bytes and documents (decoded on first access)."""
+
+    __slots__ = ("guid", "path", "data", "_documents", "_lines")
+
+    def __init__(self, guid: str, path: str, data: bytes) -> None:
+        self.guid = guid
+        self.path = path
+        self.data = data
+        self._documents: Optional[List[UnityDocument]] = None
+        self._lines: Optional[List[str]] = None
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    @property
+    def documents(self) -> List[UnityDocument]:
+        if self._documents is None:
+            self._documents = list(iter_documents(self.data))
+        return self._documents
+
+    @property
+    def lines(self) -> List[str]:
+        """The whole file as text lines, like a text-mode `readlines()`."""
+        if self._lines is None:
+            self._lines = split_lines(self.data.decode("utf-8", errors="ignore"))
+        return self._lines
+
+    def documents_of(self, class_id: int) -> List[UnityDocument]:
+        return [doc for doc in self.documents if doc.class_id == class_id]
+
+    def document(self, file_id: int) -> Optional[UnityDocument]:
+        for doc in self.documents:
+            if doc.file_id == file_id:
+                return doc
+        return None
+
+
+class AssetStore:
+    """GUID -> `LoadedAsset`, read on demand and kept in an LRU.
+
+    `guid_map` values may be relative to `root` (ExportIndex.guid_map) or absolute
+    (ExportIndex.absolute_guid_map()). `max_entries` / `max_bytes` of None or 0 lift
+    that bound. GUIDs that do not resolve to a readable file are remembered too, as
+    zero-byte entries, so repeated lookups of a dangling reference stay cheap.
+    """
+
+    def __init__(
+        self,
+        guid_map: Mapping[str, str],
+        root: Optional[str] = None,
+        max_entries: Optional[int] = DEFAULT_MAX_ENTRIES,
+        max_bytes: Optional[int] = DEFAULT_MAX_MB << 20,
+    ) -> None:
+        self._guid_map = guid_map
+        self.root = root
+        self.max_entries = max_entries or None
+        self.max_bytes = max_bytes or None
+        self._entries: "OrderedDict[str, Optional[LoadedAsset]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path(self, guid: str) -> str:
+        """The guid map's path for `guid` ("" if unknown), without reading anything."""
+        return self._guid_map.get(guid, "")
+
+    def _file_path(self, guid: str) -> str:
+        path = self._guid_map.get(guid, "")
+        if path and self.root and not os.path.isabs(path):
+            path = os.path.join(self.root, path)
+        return path
+
+    def _read(self, guid: str) -> Optional[LoadedAsset]:
+        path = self._file_path(guid)
+        if not path:
+            return None
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+        except OSError:
+            return None
+        return LoadedAsset(guid, path, data)
+
+    def get(self, guid: str) -> Optional[LoadedAsset]:
+        """The asset for `guid`, or None when it is unknown or unreadable."""
+        asset = self._entries.get(guid, _MISSING)
+        if asset is not _MISSING:
+            self.hits += 1
+            self._entries.move_to_end(guid)
+            return asset
+        self.misses += 1
+        asset = self._read(guid)
+        self._entries[guid] = asset
+        if asset is not None:
+            self.bytes += asset.size
+        self._evict()
+        return asset
+
+    def _evict(self) -> None:
+        # the newest entry always stays, even if it alone exceeds max_bytes
+        while len(self._entries) > 1 and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self.bytes > self.max_bytes)
+        ):
+            _, asset = self._entries.popitem(last=False)
+            if asset is not None:
+                self.bytes -= asset.size
+            self.evictions += 1
+
+    def __contains__(self, guid: object) -> bool:
+        return guid in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def summary(self) -> str:
+        lookups = self.hits + self.misses
+        rate = f"{100.0 * self.hits / lookups:.1f}%" if lookups else "n/a"
+        return (
+            f"[assets] {lookups} lookups, {self.hits} hits ({rate}), {self.misses} loads, "
+            f"{self.evictions} evicted; {len(self._entries)} cached ({self.bytes / (1 << 20):.1f} MB)"
+        )
+
+
+_STORES: Dict[Tuple[int, Optional[str]], AssetStore] = {}
+
+
+def get_asset_store(guid_map: Mapping[str, str], root: Optional[str] = None) -> AssetStore:
+    """One default-sized store per (guid map, root) for the whole process."""
+    # the store keeps the map alive, so its id cannot be reused meanwhile
+    key = (id(guid_map), root)
+    store = _STORES.get(key)
+    if store is None:
+        store = _STORES[key] = AssetStore(guid_map, root)
+    return store
+
+
+def add_asset_store_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--asset-cache-entries",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help=f"Referenced assets kept in memory at most; 0 = unbounded (default: {DEFAULT_MAX_ENTRIES}).",
+    )
+    parser.add_argument(
+        "--asset-cache-mb",
+        type=int,
+        default=DEFAULT_MAX_MB,
+        help=f"Total size of referenced assets kept in memory, in MB; 0 = unbounded (default: {DEFAULT_MAX_MB}).",
+    )
+
+
+def asset_store_from_args(
+    args: argparse.Namespace,
+    guid_map: Mapping[str, str],
+    root: Optional[str] = None,
+) -> AssetStore:
+    return AssetStore(
+        guid_map,
+        root,
+        max_entries=args.asset_cache_entries,
+        max_bytes=args.asset_cache_mb << 20,
+    )
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: regex-per-line item parsing versus the key-dispatch parser.
+
+Builds a synthetic corpus of item MonoBehaviour blocks in memory, checks that both
+parsers agree on every block, then reports lines per second for each.
+
+Usage:
+  python3 tools/bench/bench_item_parser.py [--blocks 2000] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from list_items_from_ripper import NestedAttributeScanner, parse_item_from_block  # noqa: E402
+
+
+# --- reference implementation kept verbatim from before the dispatch parser ---
+
+def legacy_parse_item_from_block(block_lines: List[str]) -> Dict:
+    item = {}
+    pat_map = {
+        "typeID": re.compile(r"^\s*typeID\s*:\s*(\d+)\s*$"),
+        "displayName": re.compile(r"^\s*displayName\s*:\s*(.*)$"),
+        "maxStackCount": re.compile(r"^\s*maxStackCount\s*:\s*(\d+)\s*$"),
+        "value": re.compile(r"^\s*value\s*:\s*(\d+)\s*$"),
+        "quality": re.compile(r"^\s*quality\s*:\s*(\d+)\s*$"),
+        "displayQuality": re.compile(r"^\s*displayQuality\s*:\s*(\d+)\s*$"),
+        "weight": re.compile(r"^\s*weight\s*:\s*([0-9.]+)\s*$"),
+        "order": re.compile(r"^\s*order\s*:\s*(\d+)\s*$"),
+        "soundKey": re.compile(r"^\s*soundKey\s*:\s*(.*)$"),
+    }
+    icon_guid = None
+    for line in block_lines:
+        for k, pat in pat_map.items():
+            m = pat.match(line)
+            if m:
+                item[k] = m.group(1).strip()
+        if icon_guid is None and "icon:" in line and "guid:" in line:
+            mg = re.search(r"guid:\s*([0-9a-f]+)", line)
+            if mg:
+                icon_guid = mg.group(1)
+    if icon_guid:
+        item["iconGUID"] = icon_guid
+    if "typeID" in item and "displayName" in item:
+        return item
+    return {}
+
+
+def legacy_scan_nested(lines: List[str]) -> Dict:
+    stats: Dict[str, float] = {}
+    key_pat = re.compile(r"^\s*key\s*:\s*(.*)$")
+    base_pat = re.compile(r"^\s*baseValue\s*:\s*([0-9.]+)\s*$")
+    cur_key = None
+    tag_guids: List[str] = []
+    counts = {"variables": 0, "constants": 0, "agents": 0, "effects": 0}
+    reading_tags = False
+    reading_which = None
+
+    def is_new_prop(s: str) -> bool:
+        return bool(re.match(r"^\s{2,}[a-zA-Z_][a-zA-Z0-9_]*\s*:\s*", s)) and not s.strip().startswith('-')
+
+    for line in lines:
+        km = key_pat.match(line)
+        if km:
+            cur_key = km.group(1).strip()
+        bm = base_pat.match(line)
+        if bm and cur_key:
+            try:
+                stats[cur_key] = float(bm.group(1))
+            except Exception:
+                pass
+            cur_key = None
+        if not reading_tags and line.strip().startswith("tags:"):
+            reading_tags = True
+            continue
+        if reading_tags:
+            if "guid:" in line and "-" in line:
+                mg = re.search(r"guid:\s*([0-9a-f]+)", line)
+                if mg:
+                    tag_guids.append(mg.group(1))
+            elif is_new_prop(line):
+                prop = line.strip().split(':', 1)[0]
+                if prop not in ("list", "entries"):
+                    reading_tags = False
+        if reading_which is None:
+            for name in counts:
+                if line.strip().startswith(name + ":"):
+                    reading_which = name
+                    break
+        else:
+            if line.strip().startswith("- "):
+                counts[reading_which] += 1
+            elif is_new_prop(line):
+                reading_which = None
+    return {"stats": stats, "tags": tag_guids, "counts": counts}
+
+
+def scan_nested(lines: List[str]) -> Dict:
+    scanner = NestedAttributeScanner()
+    scanner.feed(lines)
+    return {"stats": scanner.stats, "tags": scanner.tag_guids, "counts": scanner.counts}
+
+
+# --- synthetic corpus ---
+
+def make_block(rnd: random.Random, n: int) -> List[str]:
+    guid = "%032x" % rnd.getrandbits(128)
+    lines = [
+        f"--- !u!114 &{1000 + n}\n",
+        "MonoBehaviour:\n",
+        "  m_ObjectHideFlags: 0\n",
+        f"  m_GameObject: {{fileID: {2000 + n}}}\n",
+        "  m_Enabled: 1\n",
+        f"  m_Script: {{fileID: 11500000, guid: {guid}, type: 3}}\n",
+        f"  typeID: {n}\n",
+        f"  order: {rnd.randrange(100)}\n",
+        f"  displayName: Item_Food_{n}\n",
+        f"  icon: {{fileID: 21300000, guid: {guid}, type: 3}}\n",
+        f"  maxStackCount: {rnd.randrange(1, 100)}\n",
+        f"  value: {rnd.randrange(10000)}\n",
+        f"  quality: {rnd.randrange(6)}\n",
+        f"  displayQuality: {rnd.randrange(6)}\n",
+        f"  weight: {rnd.random() * 5:.3f}\n",
+        f"  soundKey: sound_{n % 7}\n",
+        "  tags:\n",
+        "    list:\n",
+    ]
+    for _ in range(rnd.randrange(1, 4)):
+        lines.append(f"    - {{fileID: 11400000, guid: {'%032x' % rnd.getrandbits(128)}, type: 2}}\n")
+    lines.append("  constants:\n")
+    lines.append("    entries:\n")
+    for i in range(rnd.randrange(0, 4)):
+        lines.append(f"    - key: C{i}\n")
+        lines.append(f"      value: {i}\n")
+    lines.append("  stats:\n")
+    lines.append("    list:\n")
+    for i in range(rnd.randrange(0, 4)):
+        lines.append(f"    - rid: {i}\n")
+        lines.append(f"      key: Stat{i}\n")
+        lines.append(f"      baseValue: {rnd.random() * 10:.2f}\n")
+    lines.append("  effects:\n")
+    for i in range(rnd.randrange(0, 3)):
+        lines.append(f"  - {{fileID: {i + 1}}}\n")
+    # unrelated serialized fields, the bulk of a real item prefab
+    for i in range(rnd.randrange(20, 60)):
+        lines.append(f"  m_Field{i}: {{x: {i}, y: 0, z: 1}}\n")
+    return lines
+
+
+def time_lines_per_second(func: Callable[[List[str]], Dict], blocks: List[List[str]], repeat: int) -> float:
+    total_lines = sum(len(b) for b in blocks)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for block in blocks:
+            func(block)
+        best = min(best, time.perf_counter() - start)
+    return total_lines / best if best > 0 else float("inf")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark item MonoBehaviour field parsing.")
+    ap.add_argument("--blocks", type=int, default=2000, help="Synthetic MonoBehaviour blocks (default: %(default)s)")
+    ap.add_argument("--repeat", type=int, default=5, help="Timing repetitions; best is reported (default: %(default)s)")
+    ap.add_argument("--seed", type=int, default=1, help="Corpus RNG seed (default: %(default)s)")
+    args = ap.parse_args()
+
+    rnd = random.Random(args.seed)
+    blocks = [make_block(rnd, n) for n in range(args.blocks)]
+    for block in blocks:
+        if legacy_parse_item_from_block(block) != parse_item_from_block(block):
+            raise SystemExit("[ERR] parse_item_from_block disagrees with the legacy parser")
+        if legacy_scan_nested(block) != scan_nested(block):
+            raise SystemExit("[ERR] NestedAttributeScanner disagrees with the legacy loop")
+
+    total_lines = sum(len(b) for b in blocks)
+    print(f"corpus: {len(blocks)} blocks, {total_lines} lines")
+    for label, before, after in (
+        ("item fields", legacy_parse_item_from_block, parse_item_from_block),
+        ("stats/tags", legacy_scan_nested, scan_nested),
+    ):
+        old = time_lines_per_second(before, blocks, args.repeat)
+        new = time_lines_per_second(after, blocks, args.repeat)
+        print(f"{label:12s} before {old:12,.0f} lines/s   after {new:12,.0f} lines/s   x{new / old:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark: time every extractor's phases on synthetic exports of several sizes.
+
+For each size a synthetic `ExportedProject` is generated (see synthetic_export.py),
+then each tool runs in-process with on-disk caches disabled and these phases timed
+separately: walk (directory scan), guid_map (.meta reads), parse, enrich and write.
+The best of `--repeat` runs per phase is stored in a JSON report for comparing
+scaling curves between commits.
+
+Usage:
+  python3 tools/bench/bench_pipeline.py [--sizes 500,2000,8000] [--out bench_pipeline.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime as dt
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+from typing import Callable, Dict
+
+TOOLS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOLS_DIR)
+sys.path.insert(0, os.path.join(TOOLS_DIR, "DynamicMap"))
+
+import extract_map_data  # noqa: E402
+import fish_special_pairs  # noqa: E402
+import list_characters_from_ripper  # noqa: E402
+import list_items_from_ripper  # noqa: E402
+from export_index import ExportIndex  # noqa: E402
+from localization import Localization  # noqa: E402
+from parse_cache import disabled_cache  # noqa: E402
+from profiling import Profiler, record_index_phases  # noqa: E402
+from synthetic_export import ExportShape, generate_export  # noqa: E402
+
+PHASES = ("walk", "guid_map", "parse", "enrich", "write")
+
+
+def shape_for_size(items: int) -> ExportShape:
+    """Scale every asset kind with the item count, roughly in the real game's proportions."""
+    return ExportShape(
+        items=items,
+        filler_prefabs=items,
+        characters=max(1, items // 5),
+        other_assets=max(1, items // 5),
+        scenes=max(2, items // 500),
+        transforms=400,
+        pois=40,
+        spawner_prefabs=max(1, items // 100),
+        loose_assets=items,
+    )
+
+
+def _index(root: str, profiler: Profiler) -> ExportIndex:
+    index = ExportIndex(root)
+    record_index_phases(profiler, index)
+    return index
+
+
+def run_items(root: str, out_dir: str, profiler: Profiler, jobs: int) -> int:
+    index = _index(root, profiler)
+    with profiler.phase("parse"):
+        items = list_items_from_ripper.list_items(root, index, jobs=jobs, cache=disabled_cache(root, "items"))
+    with profiler.phase("enrich"):
+        list_items_from_ripper.enrich_items(items, Localization(root), index.guid_map)
+    with profiler.phase("write"):
+        list_items_from_ripper.write_items(items, os.path.join(out_dir, "items.csv"), os.path.join(out_dir, "items.json"))
+    return len(items)
+
+
+def run_characters(root: str, out_dir: str, profiler: Profiler, jobs: int) -> int:
+    module = list_characters_from_ripper
+    index = _index(root, profiler)
+    with profiler.phase("parse"):
+        parsed = module.parse_characters(root, index, disabled_cache(root, "characters"))
+    with profiler.phase("enrich"):
+        entries = module.enrich_characters(parsed, index.guid_map, Localization(root), root)
+    with profiler.phase("write"):
+        module.write_characters(entries, os.path.join(out_dir, "characters.csv"), os.path.join(out_dir, "characters.json"))
+    return len(entries)
+
+
+def run_fish(root: str, out_dir: str, profiler: Profiler, jobs: int) -> int:
+    module = fish_special_pairs
+    index = _index(root, profiler)
+    with profiler.phase("parse"):
+        items = module.build_item_index(root, index)
+        pairs = module.find_special_pairs(root, index, disabled_cache(root, "special_pairs"))
+    with profiler.phase("enrich"):
+        rows = module.build_fish_rows(root, index, items, pairs, Localization(root))
+    with profiler.phase("write"):
+        module.write_fish_rows(rows, os.path.join(out_dir, "fish_special_pairs.csv"))
+    return len(rows) - 1
+
+
+def run_map(root: str, out_dir: str, profiler: Profiler, jobs: int) -> int:
+    module = extract_map_data
+    index = _index(root, profiler)
+    scenes_root = os.path.join(root, "Assets", "Scenes")
+    with profiler.phase("parse"):
+        scene_paths = sorted(index.files((".unity",), under=scenes_root))
+        scenes = module.parse_scenes(scene_paths, disabled_cache(root, "scenes"))
+    with profiler.phase("enrich"):
+        maps_output, markers_output, textures = module.build_map_payload(
+            root, scenes, index.absolute_guid_map(), Localization(root), "en", 45.0
+        )
+    with profiler.phase("write"):
+        module.write_site(os.path.join(out_dir, "site"), root, maps_output, markers_output, textures)
+    return len(markers_output)
+
+
+TOOLS: Dict[str, Callable[[str, str, Profiler, int], int]] = {
+    "items": run_items,
+    "characters": run_characters,
+    "fish": run_fish,
+    "map": run_map,
+}
+
+
+def bench_tool(run: Callable[[str, str, Profiler, int], int], root: str, out_dir: str, repeat: int, jobs: int) -> Dict:
+    best: Dict[str, float] = {}
+    records = 0
+    for _ in range(repeat):
+        profiler = Profiler("bench", enabled=True)
+        # the tools report prefilter/cache stats on stdout; keep the table readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            records = run(root, out_dir, profiler, jobs)
+        for name, stats in profiler.phases.items():
+            best[name] = min(best.get(name, stats.seconds), stats.seconds)
+    result = {name: round(best.get(name, 0.0), 6) for name in PHASES}
+    result["total"] = round(sum(result.values()), 6)
+    result["records"] = records
+    return result
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Time each extractor's phases on synthetic exports of several sizes.")
+    ap.add_argument("--sizes", default="500,2000,8000", help="Comma-separated item counts; other asset kinds scale with them (default: %(default)s)")
+    ap.add_argument("--tools", default=",".join(TOOLS), help="Comma-separated subset of: %(default)s")
+    ap.add_argument("--repeat", type=int, default=3, help="Runs per tool and size; the best time per phase is kept (default: %(default)s)")
+    ap.add_argument("--jobs", type=int, default=1, help="--jobs passed to list_items (default: %(default)s)")
+    ap.add_argument("--workdir", default=None, help="Keep generated exports here instead of a temporary directory")
+    ap.add_argument("--out", default="bench_pipeline.json", help="JSON report path (default: %(default)s)")
+    args = ap.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    tools = [t.strip() for t in args.tools.split(",") if t.strip()]
+    unknown = [t for t in tools if t not in TOOLS]
+    if unknown:
+        raise SystemExit(f"[ERR] unknown tools: {', '.join(unknown)}")
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="ripper_bench_")
+    report = {
+        "generatedAt": dt.datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "jobs": args.jobs,
+        "phases": list(PHASES),
+        "results": [],
+    }
+    try:
+        for size in sizes:
+            root = os.path.join(workdir, f"export_{size}")
+            out_dir = os.path.join(workdir, f"out_{size}")
+            if os.path.isdir(root):
+                shutil.rmtree(root)
+            os.makedirs(out_dir, exist_ok=True)
+            counts = generate_export(root, shape_for_size(size))
+            entry = {"size": size, "counts": counts, "tools": {}}
+            print(f"size {size}: {counts['files']} files, {counts['bytes'] / 1e6:.1f} MB")
+            for name in tools:
+                result = bench_tool(TOOLS[name], root, out_dir, args.repeat, args.jobs)
+                entry["tools"][name] = result
+                phases = "  ".join(f"{p} {result[p] * 1000:8.1f}ms" for p in PHASES)
+                print(f"  {name:10s} {phases}  total {result['total'] * 1000:8.1f}ms  ({result['records']} records)")
+            report["results"].append(entry)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
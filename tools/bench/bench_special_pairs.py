@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: the old multiline specialPairs regexes versus the line scanner.
+
+Builds a corpus of spawner-like files with LF and CRLF line ends, blank lines,
+trailing spaces, truncated entries, inline `specialPairs: []` and junk after a chance
+value, checks that `scan_special_pairs` finds exactly the triples the old regexes
+find, then reports MB/s for both. The regexes run on the text exactly as the old
+scan read it (text mode, universal newlines). The state machine itself is not faster
+than the regexes on files that hold a list; the scanner's gain on a real export
+comes from skipping files without the marker undecoded and from `--jobs`.
+
+Usage:
+  python3 tools/bench/bench_special_pairs.py [--files 2000] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import random
+import re
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from special_pairs import SpecialPair, scan_special_pairs  # noqa: E402
+
+
+# --- reference: the regexes fish_special_pairs used before the line scanner ---
+
+LEGACY_BLOCK_RE = re.compile(
+    r"specialPairs:\s*(?:\n\s*-\s*baitID:\s*\d+\s*\n\s*fishID:\s*\d+\s*\n\s*chance:\s*[0-9.]+)+", re.M
+)
+LEGACY_ENTRY_RE = re.compile(r"-\s*baitID:\s*(\d+)\s*\n\s*fishID:\s*(\d+)\s*\n\s*chance:\s*([0-9.]+)")
+
+
+def legacy_text(data: bytes) -> str:
+    return io.StringIO(data.decode("utf-8", errors="ignore"), newline=None).read()
+
+
+def legacy_scan(text: str) -> List[SpecialPair]:
+    return [
+        (int(em.group(1)), int(em.group(2)), float(em.group(3)))
+        for blk in LEGACY_BLOCK_RE.finditer(text)
+        for em in LEGACY_ENTRY_RE.finditer(blk.group(0))
+    ]
+
+
+# (input, expected triples) the scanner must get right whatever the corpus holds
+FIXED_CASES = (
+    # a CRLF list yields every entry, not just the first one
+    (
+        b"  specialPairs:\r\n  - baitID: 1\r\n    fishID: 2\r\n    chance: 0.5\r\n"
+        b"  - baitID: 3\r\n    fishID: 4\r\n    chance: 0.25\r\n  other: 0\r\n",
+        [(1, 2, 0.5), (3, 4, 0.25)],
+    ),
+    # a trailing space after a chance ends the list, as it did for the regex
+    (
+        b"  specialPairs:\n  - baitID: 1\n    fishID: 2\n    chance: 0.5 \n"
+        b"  - baitID: 3\n    fishID: 4\n    chance: 0.25\n",
+        [(1, 2, 0.5)],
+    ),
+    # a chance that is not a number ends the list; earlier entries are kept
+    (
+        b"  specialPairs:\n  - baitID: 1\n    fishID: 2\n    chance: 0.5\n"
+        b"  - baitID: 3\n    fishID: 4\n    chance: 1.2.3\n",
+        [(1, 2, 0.5)],
+    ),
+)
+
+
+def make_file(rnd: random.Random) -> bytes:
+    lines: List[str] = ["%YAML 1.1", "--- !u!114 &11400000", "MonoBehaviour:"]
+    for block in range(rnd.randrange(1, 4)):
+        lines.append(f"  m_Field{block}: {rnd.randrange(100)}")
+        if rnd.random() < 0.15:
+            lines.append("  specialPairs: []")
+            continue
+        lines.append("  specialPairs:")
+        for _ in range(rnd.randrange(0, 6)):
+            entry = [
+                f"  - baitID: {rnd.randrange(1, 2000)}",
+                f"    fishID: {rnd.randrange(1, 2000)}",
+                f"    chance: {rnd.choice(('0.5', '1', '0.125', '.25', '3.0'))}",
+            ]
+            if rnd.random() < 0.05:
+                entry = entry[: rnd.randrange(1, 3)]
+            if rnd.random() < 0.05:
+                entry[-1] += rnd.choice((" # note", "x"))
+            for line in entry:
+                if rnd.random() < 0.1:
+                    lines.append(" " * rnd.randrange(0, 3))
+                lines.append(line + " " * rnd.choice((0, 0, 0, 1, 2)))
+        lines.append("  m_Enabled: 1")
+    eol = rnd.choice(("\n", "\r\n"))
+    return (eol.join(lines) + eol).encode("utf-8")
+
+
+def time_mb_per_second(func: Callable, inputs: List, size: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for data in inputs:
+            func(data)
+        best = min(best, time.perf_counter() - start)
+    return size / best / 1e6 if best > 0 else float("inf")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark the specialPairs scanner.")
+    ap.add_argument("--files", type=int, default=2000, help="Synthetic spawner files (default: %(default)s)")
+    ap.add_argument("--repeat", type=int, default=5, help="Timing repetitions; best is reported (default: %(default)s)")
+    ap.add_argument("--seed", type=int, default=1, help="Corpus RNG seed (default: %(default)s)")
+    args = ap.parse_args()
+
+    for data, expected in FIXED_CASES:
+        if scan_special_pairs(data) != expected:
+            raise SystemExit(f"[ERR] scan_special_pairs gives {scan_special_pairs(data)} instead of {expected} on {data!r}")
+    rnd = random.Random(args.seed)
+    corpus = [make_file(rnd) for _ in range(args.files)]
+    texts = [legacy_text(data) for data in corpus]
+    for data, text in zip(corpus, texts):
+        if scan_special_pairs(data) != legacy_scan(text):
+            raise SystemExit("[ERR] scan_special_pairs disagrees with the legacy regexes")
+
+    size = sum(len(data) for data in corpus)
+    print(f"corpus: {len(corpus)} files, {size / 1e6:.1f} MB")
+    old = time_mb_per_second(legacy_scan, texts, size, args.repeat)
+    new = time_mb_per_second(scan_special_pairs, corpus, size, args.repeat)
+    print(f"specialPairs before {old:8.1f} MB/s   after {new:8.1f} MB/s   x{new / old:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: recursive world-transform composition versus the level solver.
+
+Builds a bushy random hierarchy and one deep chain, checks that the recursive
+reference, the pure-Python level solver and (when installed) the NumPy solver agree
+exactly on every world transform, then reports transforms per second for each. The
+recursive reference is skipped where the chain is deeper than the recursion limit.
+
+Usage:
+  python3 tools/bench/bench_transform_solver.py [--transforms 50000] [--depth 20000] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Callable, Dict, NamedTuple, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transform_solver  # noqa: E402
+from transform_solver import (  # noqa: E402
+    IDENTITY,
+    WorldTransform,
+    compose,
+    normalize_quaternion,
+    solve_world_transforms,
+)
+
+
+class Node(NamedTuple):
+    parent_transform_id: Optional[int]
+    local_position: tuple
+    local_rotation: tuple
+    local_scale: tuple
+
+
+# --- reference: the per-ancestor recursion extract_map_data used before the solver ---
+
+def legacy_world_transform(transform_id: int, transforms: Dict[int, Node], cache: Dict[int, WorldTransform]) -> WorldTransform:
+    if transform_id in cache:
+        return cache[transform_id]
+    data = transforms.get(transform_id)
+    if data is None:
+        result = IDENTITY
+    elif data.parent_transform_id is None:
+        result = (data.local_position, data.local_rotation, data.local_scale)
+    else:
+        result = compose(legacy_world_transform(data.parent_transform_id, transforms, cache), data)
+    cache[transform_id] = result
+    return result
+
+
+def legacy_all(nodes: Dict[int, Node]) -> Dict[int, WorldTransform]:
+    # leaves first, like POIs: every miss recurses up to the nearest cached ancestor
+    cache: Dict[int, WorldTransform] = {}
+    solved = {i: legacy_world_transform(i, nodes, cache) for i in reversed(list(nodes))}
+    return {i: solved[i] for i in nodes}
+
+
+def random_node(rnd: random.Random, parent: Optional[int]) -> Node:
+    return Node(
+        parent,
+        tuple(rnd.uniform(-100.0, 100.0) for _ in range(3)),
+        normalize_quaternion(tuple(rnd.uniform(-1.0, 1.0) for _ in range(4))),
+        tuple(rnd.choice((1.0, 1.0, 0.5, 2.0, -1.0)) for _ in range(3)),
+    )
+
+
+def bushy_hierarchy(count: int, rnd: random.Random) -> Dict[int, Node]:
+    # parents are drawn from a trailing window, giving scene-like depth (tens of levels)
+    nodes: Dict[int, Node] = {}
+    for transform_id in range(1, count + 1):
+        parent = None if transform_id <= 16 else rnd.randint(max(1, transform_id - 2000), transform_id - 1)
+        nodes[transform_id] = random_node(rnd, parent)
+    return nodes
+
+
+def chain_hierarchy(depth: int, rnd: random.Random) -> Dict[int, Node]:
+    return {i: random_node(rnd, i - 1 if i > 1 else None) for i in range(1, depth + 1)}
+
+
+def best_of(repeat: int, func: Callable[[], Dict[int, WorldTransform]]) -> tuple:
+    best = float("inf")
+    result: Dict[int, WorldTransform] = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_case(name: str, nodes: Dict[int, Node], repeat: int) -> None:
+    print(f"{name}: {len(nodes)} transforms")
+    variants = [
+        ("python levels", lambda: solve_world_transforms(nodes, use_numpy=False)),
+    ]
+    if transform_solver.np is not None:
+        variants.append(("numpy levels", lambda: solve_world_transforms(nodes, use_numpy=True)))
+    try:
+        legacy_all(nodes)
+        variants.insert(0, ("recursive", lambda: legacy_all(nodes)))
+    except RecursionError:
+        print("  recursive: skipped (deeper than the recursion limit)")
+    reference = None
+    for label, func in variants:
+        elapsed, result = best_of(repeat, func)
+        if reference is None:
+            reference = result
+        elif result != reference:
+            raise SystemExit(f"{label} disagrees with the first variant on {name}")
+        print(f"  {label:14s} {elapsed * 1000:9.1f} ms  {len(nodes) / elapsed:12,.0f} transforms/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transforms", type=int, default=50000, help="size of the bushy hierarchy")
+    parser.add_argument("--depth", type=int, default=20000, help="length of the chain hierarchy")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if transform_solver.np is None:
+        print("NumPy not installed; timing the pure-Python solver only")
+    rnd = random.Random(args.seed)
+    run_case("bushy", bushy_hierarchy(args.transforms, rnd), args.repeat)
+    run_case("chain", chain_hierarchy(args.depth, rnd), args.repeat)
+    print("all variants agree")
+
+
+if __name__ == "__main__":
+    main()
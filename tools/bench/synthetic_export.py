@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Write a synthetic AssetRipper `ExportedProject` for profiling the extractors.
+
+The files use the same YAML shapes the tools parse: item prefabs (GameObject plus an
+item MonoBehaviour with tags/stats/effects), Tag assets, character presets, fishing
+`specialPairs` spawners, scenes with Transform hierarchies, a MiniMap settings block
+with SpriteRenderer offset references and SimplePointOfInterest markers, sprites,
+PNG textures, `.meta` files and localization CSVs. Output is deterministic per seed.
+
+Usage:
+  python3 tools/bench/synthetic_export.py OUT_DIR [--items 2000] [--scenes 4] ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import random
+import struct
+import zlib
+from dataclasses import asdict, dataclass
+from typing import Dict, List
+
+
+# script GUID shared by CharacterRandomPreset, MiniMapSettings and SimplePointOfInterest
+GAME_SCRIPT_GUID = "d551df320acceeb317a9e97502ade12f"
+CHARACTER_SCRIPT_FILE_ID = 70297966
+MINIMAP_SETTINGS_FILE_ID = -1857372209
+SIMPLE_POI_FILE_ID = 1147714721
+
+TAG_NAMES = (
+    "Fish_OnlyDay",
+    "Fish_OnlyNight",
+    "Fish_OnlyStorm",
+    "Fish_OnlySunDay",
+    "Fish_OnlyRainDay",
+    "Food",
+    "Weapon",
+    "Medic",
+    "Bullet",
+    "Luxury",
+)
+ITEM_CATEGORIES = ("Food", "Weapon", "Medic", "Ammo", "Material", "Tool")
+
+
+@dataclass
+class ExportShape:
+    """How much of each asset kind to generate."""
+
+    items: int = 2000
+    filler_prefabs: int = 2000
+    characters: int = 400
+    other_assets: int = 400
+    scenes: int = 4
+    transforms: int = 400  # per scene
+    pois: int = 40  # per scene
+    spawner_prefabs: int = 20
+    loose_assets: int = 0  # extra .meta-only padding for the GUID map
+    seed: int = 1
+
+
+def make_guid(name: str) -> str:
+    return hashlib.md5(name.encode("utf-8")).hexdigest()
+
+
+def make_png(width: int, height: int) -> bytes:
+    raw = b"".join(b"\x00" + bytes((x * 7 + y) % 256 for x in range(width * 3)) for y in range(height))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+
+class _Writer:
+    def __init__(self, root: str) -> None:
+        self.assets = os.path.join(root, "Assets")
+        self.files = 0
+        self.metas = 0
+        self.bytes = 0
+
+    def asset(self, rel: str, content, guid: str = "") -> str:
+        """Write Assets/<rel> plus its .meta; returns the asset GUID."""
+        guid = guid or make_guid(rel)
+        path = os.path.join(self.assets, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = content if isinstance(content, bytes) else content.encode("utf-8")
+        with open(path, "wb") as fh:
+            fh.write(data)
+        meta = f"fileFormatVersion: 2\nguid: {guid}\nNativeFormatImporter:\n  mainObjectFileID: 0\n"
+        with open(path + ".meta", "w", encoding="utf-8") as fh:
+            fh.write(meta)
+        self.files += 2
+        self.metas += 1
+        self.bytes += len(data) + len(meta)
+        return guid
+
+
+def _item_prefab(i: int, name: str, key: str, type_id: int, icon_guid: str, tag_guids: List[str], rnd: random.Random) -> str:
+    tags = "".join(f"    - {{fileID: 11400000, guid: {g}, type: 2}}\n" for g in tag_guids)
+    stats = "".join(
+        f"    - rid: {n}\n      key: Stat{n}\n      baseValue: {rnd.random() * 10:.2f}\n" for n in range(rnd.randrange(1, 5))
+    )
+    filler = "".join(f"  m_Field{n}: {{x: {n}, y: 0, z: 1}}\n" for n in range(rnd.randrange(10, 40)))
+    return f"""%YAML 1.1
+%TAG !u! tag:unity3d.com,2011:
+--- !u!1 &1{i:08d}
+GameObject:
+  m_ObjectHideFlags: 0
+  m_Component:
+  - component: {{fileID: 2{i:08d}}}
+  - component: {{fileID: 3{i:08d}}}
+  m_Layer: 0
+  m_Name: {name}
+--- !u!4 &2{i:08d}
+Transform:
+  m_ObjectHideFlags: 0
+  m_GameObject: {{fileID: 1{i:08d}}}
+  m_LocalRotation: {{x: 0, y: 0, z: 0, w: 1}}
+  m_LocalPosition: {{x: 0, y: 0, z: 0}}
+  m_LocalScale: {{x: 1, y: 1, z: 1}}
+  m_Children: []
+  m_Father: {{fileID: 0}}
+--- !u!114 &3{i:08d}
+MonoBehaviour:
+  m_ObjectHideFlags: 0
+  m_GameObject: {{fileID: 1{i:08d}}}
+  m_Enabled: 1
+  m_Script: {{fileID: 11500000, guid: {make_guid('ItemScript')}, type: 3}}
+  typeID: {type_id}
+  order: {i}
+  displayName: {key}
+  icon: {{fileID: 21300000, guid: {icon_guid}, type: 3}}
+  maxStackCount: {rnd.choice((1, 1, 10, 30, 99))}
+  value: {rnd.randrange(10000)}
+  quality: {rnd.randrange(6)}
+  displayQuality: {rnd.randrange(6)}
+  weight: {rnd.random() * 5:.3f}
+  soundKey: sound_{i % 7}
+  tags:
+    list:
+{tags}  variables:
+  - key: Durability
+    value: 1
+  constants:
+  - key: Cooldown
+    value: 2
+  stats:
+    list:
+{stats}  effects:
+  - {{fileID: 4{i:08d}}}
+  agents: []
+  inventory: {{fileID: 0}}
+{filler}--- !u!114 &4{i:08d}
+MonoBehaviour:
+  m_ObjectHideFlags: 0
+  m_GameObject: {{fileID: 1{i:08d}}}
+  m_Script: {{fileID: 11500000, guid: {make_guid('EffectScript')}, type: 3}}
+  display: 1
+  description: effect {i}
+"""
+
+
+def _character_asset(i: int, matching: bool, model_guid: str, rnd: random.Random) -> str:
+    group = f"Grp{i % 12}"
+    kind = "Boss" if i % 25 == 0 else "Mob"
+    return f"""%YAML 1.1
+%TAG !u! tag:unity3d.com,2011:
+--- !u!114 &11400000
+MonoBehaviour:
+  m_ObjectHideFlags: 0
+  m_CorrespondingSourceObject: {{fileID: 0}}
+  m_GameObject: {{fileID: 0}}
+  m_Enabled: 1
+  m_EditorHideFlags: 0
+  m_Script: {{fileID: {CHARACTER_SCRIPT_FILE_ID if matching else 11500000}, guid: {GAME_SCRIPT_GUID}, type: 3}}
+  m_Name: EnemyPreset_{group}_{kind}{i}
+  m_EditorClassIdentifier:
+  nameKey: Character_{i}
+  team: {i % 4}
+  characterIconType: {i % 3}
+  health: {100 + rnd.randrange(900)}
+  hasSoul: {i % 2}
+  showHealthBar: 1
+  showName: {(i + 1) % 2}
+  exp: {rnd.randrange(500)}
+  moveSpeedFactor: {0.5 + rnd.random():.3f}
+  hasCashChance: {rnd.random():.3f}
+  itemSkillChance: {rnd.random():.3f}
+  damageMultiplier: {0.5 + rnd.random():.3f}
+  hasSkill: {i % 3 == 0:d}
+  characterModel: {{fileID: 100100000, guid: {model_guid}, type: 3}}
+  lootBoxPrefab: {{fileID: 0}}
+  facePreset: {{fileID: 11400000, guid: {make_guid(f'face{i % 8}')}, type: 2}}
+  aiController: {{fileID: 0}}
+  skillPfb: {{fileID: 0}}
+"""
+
+
+def _special_pairs(pairs: List[tuple]) -> str:
+    return "  specialPairs:\n" + "".join(
+        f"  - baitID: {bait}\n    fishID: {fish}\n    chance: {chance}\n" for bait, fish, chance in pairs
+    )
+
+
+def _scene(
+    scene_id: str,
+    transforms: int,
+    pois: int,
+    sprite_guid: str,
+    fish_pairs: List[tuple],
+    rnd: random.Random,
+) -> str:
+    parts = ["%YAML 1.1\n%TAG !u! tag:unity3d.com,2011:\n"]
+    go_base, tr_base = 1000000, 2000000
+    for t in range(transforms):
+        # parents always come earlier, giving a random forest of moderate depth
+        parent = 0 if t == 0 or rnd.random() < 0.05 else tr_base + rnd.randrange(max(0, t - 50), t)
+        parts.append(
+            f"""--- !u!1 &{go_base + t}
+GameObject:
+  m_ObjectHideFlags: 0
+  m_Component:
+  - component: {{fileID: {tr_base + t}}}
+  m_Layer: 0
+  m_Name: Node{t}
+  m_IsActive: 1
+--- !u!4 &{tr_base + t}
+Transform:
+  m_ObjectHideFlags: 0
+  m_GameObject: {{fileID: {go_base + t}}}
+  m_LocalRotation: {{x: 0, y: {rnd.uniform(-0.7, 0.7):.4f}, z: 0, w: {rnd.uniform(0.7, 1):.4f}}}
+  m_LocalPosition: {{x: {rnd.uniform(-50, 50):.3f}, y: {rnd.uniform(-2, 2):.3f}, z: {rnd.uniform(-50, 50):.3f}}}
+  m_LocalScale: {{x: 1, y: 1, z: {rnd.choice((1, 1, 2))}}}
+  m_Children: []
+  m_Father: {{fileID: {parent}}}
+  m_RootOrder: 0
+"""
+        )
+    renderer_go = go_base + transforms // 2
+    parts.append(
+        f"""--- !u!212 &3000000
+SpriteRenderer:
+  m_ObjectHideFlags: 0
+  m_GameObject: {{fileID: {renderer_go}}}
+  m_Enabled: 1
+  m_Sprite: {{fileID: 21300000, guid: {sprite_guid}, type: 3}}
+--- !u!114 &3000001
+MonoBehaviour:
+  m_ObjectHideFlags: 0
+  m_GameObject: {{fileID: {go_base}}}
+  m_Enabled: 1
+  m_Script: {{fileID: {MINIMAP_SETTINGS_FILE_ID}, guid: {GAME_SCRIPT_GUID}, type: 3}}
+  maps:
+  - imageWorldSize: {rnd.choice((256, 384, 512))}
+    sceneID: {scene_id}
+    sprite: {{fileID: 21300000, guid: {sprite_guid}, type: 3}}
+    offsetReference: {{fileID: 3000000}}
+    mapWorldCenter: {{x: {rnd.uniform(-20, 20):.2f}, y: 0, z: {rnd.uniform(-20, 20):.2f}}}
+    hide: 0
+    noSignal: 0
+  combinedCenter: {{x: 0, y: 0, z: 0}}
+  combinedSize: 1024
+  combinedSprite: {{fileID: 0}}
+"""
+    )
+    for p in range(pois):
+        parts.append(
+            f"""--- !u!114 &{4000000 + p}
+MonoBehaviour:
+  m_ObjectHideFlags: 0
+  m_GameObject: {{fileID: {go_base + rnd.randrange(transforms)}}}
+  m_Enabled: 1
+  m_Script: {{fileID: {SIMPLE_POI_FILE_ID}, guid: {GAME_SCRIPT_GUID}, type: 3}}
+  icon: {{fileID: 21300000, guid: {make_guid('poi_icon')}, type: 3}}
+  color: {{r: 1, g: {rnd.random():.2f}, b: 0, a: 1}}
+  shadowColor: {{r: 0, g: 0, b: 0, a: 1}}
+  shadowDistance: 1
+  displayName: POI_{scene_id}_{p}
+  followActiveScene: 0
+  overrideSceneID: {scene_id if p % 4 == 0 else ''}
+  isArea: {p % 5 == 0:d}
+  areaRadius: {rnd.uniform(1, 20):.2f}
+  scaleFactor: 1
+  hideIcon: {p % 17 == 16:d}
+"""
+        )
+    if fish_pairs:
+        parts.append(
+            f"""--- !u!114 &5000000
+MonoBehaviour:
+  m_ObjectHideFlags: 0
+  m_GameObject: {{fileID: {go_base + 1}}}
+  m_Script: {{fileID: 11500000, guid: {make_guid('FishingSpawner')}, type: 3}}
+{_special_pairs(fish_pairs)}  spawnRadius: 3
+"""
+        )
+    return "".join(parts)
+
+
+def generate_export(root: str, shape: ExportShape) -> Dict[str, int]:
+    """Write `root/Assets/...` for `shape`; returns counts of what was written."""
+    rnd = random.Random(shape.seed)
+    out = _Writer(root)
+    en = ["Key,English,Comment"]
+    zh = ["Key,ChineseSimplified,Comment"]
+
+    tag_guids = {}
+    for tag in TAG_NAMES:
+        tag_guids[tag] = out.asset(f"MonoBehaviour/Tag/{tag}.asset", f"%YAML 1.1\n--- !u!114 &11400000\nMonoBehaviour:\n  m_Name: {tag}\n")
+        en.append(f"Tag_{tag},{tag} tag,")
+        zh.append(f"Tag_{tag},{tag} 标签,")
+
+    icon_png = make_png(8, 8)
+    fish_ids: List[int] = []
+    bait_ids: List[int] = []
+    for i in range(shape.items):
+        fish = i % 10 == 0
+        type_id = 1 + i
+        if fish:
+            name, key = f"Fish_{i}", f"Item_Fish_{i}"
+            fish_ids.append(type_id)
+            tags = [tag_guids[rnd.choice(TAG_NAMES[:5])]]
+        else:
+            category = ITEM_CATEGORIES[i % len(ITEM_CATEGORIES)]
+            name, key = f"Item_{category}_{i}", f"Item_{category}_{i}"
+            if i % 10 == 1:
+                bait_ids.append(type_id)
+            tags = [tag_guids[t] for t in rnd.sample(TAG_NAMES[5:], 2)]
+        texture_guid = out.asset(f"Texture2D/Icon_{i}.png", icon_png)
+        icon_guid = out.asset(
+            f"Sprite/Icon_{i}.asset",
+            f"%YAML 1.1\n--- !u!213 &21300000\nSprite:\n  m_Name: Icon_{i}\n  texture: {{fileID: 2800000, guid: {texture_guid}, type: 3}}\n",
+        )
+        folder = "Prefab/Fish" if fish else "Prefab/Items"
+        out.asset(f"{folder}/{name}.prefab", _item_prefab(i, name, key, type_id, icon_guid, tags, rnd))
+        en.append(f'{key},Name {i},')
+        en.append(f'{key}_Desc,"Description of {i}, with a comma",')
+        zh.append(f"{key},名称 {i},")
+
+    for i in range(shape.filler_prefabs):
+        body = "".join(f"  m_Prop{n}: {{fileID: {n}}}\n" for n in range(rnd.randrange(20, 120)))
+        out.asset(
+            f"Prefab/Env/Env_{i}.prefab",
+            f"%YAML 1.1\n--- !u!1 &1\nGameObject:\n  m_Name: Env_{i}\n--- !u!4 &2\nTransform:\n{body}",
+        )
+
+    model_guid = make_guid("Prefab/Env/Env_0.prefab")
+    for i in range(shape.characters):
+        out.asset(f"MonoBehaviour/EnemyPreset_{i}.asset", _character_asset(i, i % 8 != 7, model_guid, rnd))
+        en.append(f"Character_{i},Character {i},")
+        zh.append(f"Character_{i},角色 {i},")
+    for i in range(shape.other_assets):
+        out.asset(
+            f"MonoBehaviour/Config_{i}.asset",
+            f"%YAML 1.1\n--- !u!114 &11400000\nMonoBehaviour:\n  m_Script: {{fileID: 11500000, guid: {make_guid('cfg')}, type: 3}}\n  m_Name: Config_{i}\n  value: {i}\n",
+        )
+
+    def random_pairs(n: int) -> List[tuple]:
+        if not fish_ids or not bait_ids:
+            return []
+        return [(rnd.choice(bait_ids), rnd.choice(fish_ids), rnd.choice((0.05, 0.1, 0.25, 0.5))) for _ in range(n)]
+
+    for s in range(shape.spawner_prefabs):
+        pairs = random_pairs(rnd.randrange(1, 4))
+        pairs += pairs[:1]  # identical entries aggregate into occurrences
+        out.asset(
+            f"Prefab/Spawners/FishSpawner_{s}.prefab",
+            f"%YAML 1.1\n--- !u!114 &1\nMonoBehaviour:\n  m_Name: FishSpawner_{s}\n{_special_pairs(pairs)}",
+        )
+
+    minimap_png = make_png(64, 64)
+    for s in range(shape.scenes):
+        scene_id = f"Level_Zone{s}"
+        texture_guid = out.asset(f"Texture2D/MiniMap_{scene_id}.png", minimap_png)
+        sprite_guid = out.asset(
+            f"Sprite/MiniMap_{scene_id}.asset",
+            f"%YAML 1.1\n--- !u!213 &21300000\nSprite:\n  m_Name: MiniMap_{scene_id}\n  m_Rect:\n    x: 0\n  texture: {{fileID: 2800000, guid: {texture_guid}, type: 3}}\n",
+        )
+        out.asset(
+            f"Scenes/{scene_id}/{scene_id}.unity",
+            _scene(scene_id, max(1, shape.transforms), shape.pois, sprite_guid, random_pairs(4), rnd),
+        )
+        en.append(f"{scene_id},Zone {s},")
+        for p in range(shape.pois):
+            en.append(f"POI_{scene_id}_{p},Point {p} of zone {s},")
+
+    for i in range(shape.loose_assets):
+        out.asset(f"Misc/Loose_{i // 1000}/Loose_{i}.asset", f"%YAML 1.1\n--- !u!114 &11400000\nMonoBehaviour:\n  m_Name: Loose_{i}\n")
+
+    loc_dir = os.path.join(out.assets, "StreamingAssets", "Localization")
+    os.makedirs(loc_dir, exist_ok=True)
+    for fname, rows in (("English.csv", en), ("ChineseSimplified.csv", zh)):
+        with open(os.path.join(loc_dir, fname), "w", encoding="utf-8") as fh:
+            fh.write("\n".join(rows) + "\n")
+
+    counts = asdict(shape)
+    counts.update(files=out.files, metaFiles=out.metas, bytes=out.bytes)
+    return counts
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Write a synthetic AssetRipper ExportedProject for benchmarking.")
+    ap.add_argument("out_dir", help="Directory to create (becomes the ExportedProject root)")
+    defaults = ExportShape()
+    for field, value in asdict(defaults).items():
+        ap.add_argument(f"--{field.replace('_', '-')}", type=int, default=value, help=f"(default: {value})")
+    args = ap.parse_args()
+    shape = ExportShape(**{field: getattr(args, field) for field in asdict(defaults)})
+    counts = generate_export(args.out_dir, shape)
+    print(f"Wrote {counts['files']} files ({counts['metaFiles']} .meta, {counts['bytes']:,} bytes) to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
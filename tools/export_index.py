@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Single-pass index over an AssetRipper ExportedProject.
+
+One `os.scandir` traversal of `Assets/` buckets every file by suffix and reads the
+GUID out of each `.meta` file, so the extractors no longer walk the tree (and open
+every `.meta`) once per lookup.
+
+GUIDs are cached on disk keyed by (meta path, mtime, size); warm runs only re-read
+`.meta` files that are new or changed since the previous run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import os
+import pickle
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+GUID_CACHE_FILE = "guid_index.pickle"
+GUID_CACHE_VERSION = 1
+
+
+def read_meta_guid(meta_path: str) -> Optional[str]:
+    try:
+        with open(meta_path, "r", encoding="utf-8", errors="ignore") as fh:
+            # GUID is at top of Unity meta files; stop after a few lines for speed
+            for i, line in enumerate(fh):
+                if line.startswith("guid: "):
+                    return line.split(":", 1)[1].strip()
+                if i > 8:
+                    break
+    except Exception:
+        pass
+    return None
+
+
+class ExportIndex:
+    """Suffix-bucketed file lists plus the GUID -> asset path map of one export.
+
+    File lists keep `os.walk` order (a directory's files, then each subdirectory in
+    turn) so tools that keep the first match behave exactly as before.
+    """
+
+    def __init__(
+        self,
+        export_root: str,
+        cache_dir: Optional[str] = None,
+        rebuild_cache: bool = False,
+    ) -> None:
+        self.export_root = export_root
+        self.assets_root = os.path.join(export_root, "Assets")
+        self.by_suffix: Dict[str, List[Tuple[int, str]]] = {}
+        # guid -> asset path relative to export_root
+        self.guid_map: Dict[str, str] = {}
+        self.file_count = 0
+        self.cache_path = os.path.join(cache_dir, GUID_CACHE_FILE) if cache_dir else None
+        self.rebuild_cache = rebuild_cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_dropped = 0
+        # seconds spent in the directory walk and in building guid_map
+        self.timings: Dict[str, float] = {}
+        self._scan()
+
+    def _scan(self) -> None:
+        started = time.perf_counter()
+        by_suffix = self.by_suffix
+        metas: List[Tuple[str, int, int]] = []
+        stack = [self.assets_root]
+        while stack:
+            current = stack.pop()
+            subdirs: List[str] = []
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            continue
+                        if is_dir:
+                            # os.walk lists but does not descend into symlinked dirs
+                            if not entry.is_symlink():
+                                subdirs.append(entry.path)
+                            continue
+                        suffix = os.path.splitext(entry.name)[1]
+                        bucket = by_suffix.get(suffix)
+                        if bucket is None:
+                            bucket = by_suffix[suffix] = []
+                        # walk position lets multi-suffix queries merge buckets in order
+                        bucket.append((self.file_count, entry.path))
+                        self.file_count += 1
+                        if suffix == ".meta":
+                            try:
+                                st = entry.stat()
+                            except OSError:
+                                continue
+                            metas.append((entry.path, st.st_mtime_ns, st.st_size))
+            except OSError:
+                continue
+            # visit subdirectories in listing order, like os.walk
+            stack.extend(reversed(subdirs))
+        walked = time.perf_counter()
+        self._read_guids(metas)
+        self.timings["walk"] = walked - started
+        self.timings["guid_map"] = time.perf_counter() - walked
+
+    def _read_guids(self, metas: List[Tuple[str, int, int]]) -> None:
+        cached = self._load_cache()
+        entries: Dict[str, Tuple[int, int, Optional[str]]] = {}
+        # scandir paths all extend assets_root, so slicing beats a relpath per file
+        rel_assets = os.path.relpath(self.assets_root, self.export_root)
+        cut = len(os.path.join(self.assets_root, ""))
+        for meta_path, mtime_ns, size in metas:
+            rel_meta = os.path.join(rel_assets, meta_path[cut:])
+            hit = cached.get(rel_meta)
+            if hit is not None and hit[0] == mtime_ns and hit[1] == size:
+                guid = hit[2]
+                self.cache_hits += 1
+            else:
+                guid = read_meta_guid(meta_path)
+                self.cache_misses += 1
+            entries[rel_meta] = (mtime_ns, size, guid)
+            if guid:
+                self.guid_map[guid] = rel_meta[:-5]  # strip .meta
+        self.cache_dropped = sum(1 for key in cached if key not in entries)
+        if self.cache_misses or self.cache_dropped or len(cached) != len(entries):
+            self._save_cache(entries)
+
+    def _load_cache(self) -> Dict[str, Tuple[int, int, Optional[str]]]:
+        if not self.cache_path or self.rebuild_cache or not os.path.isfile(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "rb") as fh:
+                payload = pickle.load(fh)
+        except Exception:
+            return {}
+        if not isinstance(payload, dict) or payload.get("version") != GUID_CACHE_VERSION:
+            return {}
+        if payload.get("exportRoot") != os.path.abspath(self.export_root):
+            return {}
+        return payload.get("entries") or {}
+
+    def _save_cache(self, entries: Dict[str, Tuple[int, int, Optional[str]]]) -> None:
+        if not self.cache_path:
+            return
+        payload = {
+            "version": GUID_CACHE_VERSION,
+            "exportRoot": os.path.abspath(self.export_root),
+            "entries": entries,
+        }
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(tmp_path, "wb") as fh:
+                pickle.dump(payload, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass
+
+    def cache_stats(self) -> str:
+        if not self.cache_path:
+            return f"[guid-cache] disabled ({self.cache_misses} .meta files read)"
+        return (
+            f"[guid-cache] {self.cache_hits} hits, {self.cache_misses} misses, "
+            f"{self.cache_dropped} dropped ({self.cache_path})"
+        )
+
+    def files(self, suffixes: Iterable[str], under: Optional[str] = None) -> List[str]:
+        """Paths with any of `suffixes` in walk order, optionally limited to `under`."""
+        buckets = [self.by_suffix.get(suffix, []) for suffix in dict.fromkeys(suffixes)]
+        if len(buckets) == 1:
+            paths = [path for _, path in buckets[0]]
+        else:
+            paths = [path for _, path in heapq.merge(*buckets)]
+        if under is not None:
+            prefix = os.path.join(under, "")
+            paths = [p for p in paths if p.startswith(prefix)]
+        return paths
+
+    def asset_path(self, guid: str) -> str:
+        return self.guid_map.get(guid, "")
+
+    def absolute_guid_map(self) -> Dict[str, str]:
+        root = self.export_root
+        return {guid: os.path.join(root, rel) for guid, rel in self.guid_map.items()}
+
+
+_INDEXES: Dict[str, ExportIndex] = {}
+
+
+def default_cache_dir(export_root: str) -> str:
+    return os.path.join(export_root, ".ripper_cache")
+
+
+def get_export_index(
+    export_root: str,
+    cache_dir: Optional[str] = None,
+    rebuild_cache: bool = False,
+) -> ExportIndex:
+    """Return the process-wide index for `export_root`, scanning it on first use."""
+    key = os.path.abspath(export_root)
+    index = _INDEXES.get(key)
+    if index is None or rebuild_cache:
+        index = _INDEXES[key] = ExportIndex(export_root, cache_dir, rebuild_cache)
+    return index
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory for on-disk caches (default: <export_root>/.ripper_cache).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write on-disk caches.",
+    )
+    parser.add_argument(
+        "--rebuild-cache",
+        action="store_true",
+        help="Ignore existing caches and rebuild them from scratch.",
+    )
+    parser.add_argument(
+        "--cache-by-hash",
+        action="store_true",
+        help="Validate parse-cache entries by content hash instead of mtime.",
+    )
+
+
+def resolve_cache_dir(args: argparse.Namespace) -> Optional[str]:
+    if getattr(args, "no_cache", False):
+        return None
+    return args.cache_dir or default_cache_dir(args.export_root)
+
+
+def export_index_from_args(args: argparse.Namespace) -> ExportIndex:
+    """Build the shared index for a tool's parsed CLI arguments and report cache stats."""
+    index = get_export_index(
+        args.export_root,
+        cache_dir=resolve_cache_dir(args),
+        rebuild_cache=args.rebuild_cache,
+    )
+    print(index.cache_stats())
+    return index
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Incremental mirroring of source files into an output folder.
+
+`FileSync(root).sync({dest_rel: source})` makes `root` hold exactly those files:
+new or changed ones are copied (or hard-linked / reflinked), files whose content
+already matches are left alone, and anything else under `root` is deleted. A
+manifest in the cache directory (one per output root, never inside `root`)
+remembers each file's content hash together with the (size, mtime, inode) of
+source and destination, so a rerun where nothing changed costs two `stat` calls
+per file and reads nothing. When a stamp does differ, or there is no manifest,
+the content hash decides: a source that was touched but not changed is not
+copied again.
+
+Modes: `copy` (`shutil.copy2`), `hardlink` (`os.link`; falls back to a copy
+across filesystems) and `reflink` (Linux `FICLONE`, sharing extents on btrfs, XFS
+and similar; falls back to a copy where unsupported). Hard-linked outputs are the
+source files themselves, so editing one edits the other. Transfers run on a
+thread pool; every file is written to a temporary name and renamed into place.
+"""
+
+from __future__ import annotations
+
+import argparse
+import errno
+import hashlib
+import json
+import os
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from export_index import resolve_cache_dir
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; reflink mode then always copies
+    fcntl = None
+
+
+# manifests live in the cache dir as <prefix><hash of the output root>.json
+SYNC_STATE_PREFIX = "file_sync_"
+SYNC_MODES = ("copy", "hardlink", "reflink")
+# bump when the manifest layout changes; older manifests are then ignored
+SYNC_MANIFEST_VERSION = 1
+# bytes of the blake2b content hash kept per file
+HASH_BYTES = 16
+HASH_CHUNK = 1 << 20
+TEMP_SUFFIX = ".sync-tmp"
+
+# Linux ioctl that makes a file share another file's extents (copy-on-write)
+_FICLONE = 0x40049409
+
+Stamp = List[int]
+Record = Dict[str, object]
+
+UNCHANGED, COPIED, LINKED, CLONED, MISSING = "unchanged", "copied", "linked", "cloned", "missing"
+
+
+def stamp(st: os.stat_result) -> Stamp:
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def _stat(path: str) -> Optional[os.stat_result]:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=HASH_BYTES)
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _reflink(source: str, dest: str) -> None:
+    if fcntl is None or not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "reflinks are not supported on this platform")
+    with open(source, "rb") as src, open(dest, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def transfer(source: str, dest: str, mode: str = "copy") -> str:
+    """Put `source` at `dest` atomically; returns how (copied, linked or cloned)."""
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    tmp = dest + TEMP_SUFFIX
+    _remove(tmp)
+    method = COPIED
+    try:
+        if mode == "hardlink":
+            try:
+                os.link(source, tmp)
+                method = LINKED
+            except OSError:
+                pass
+        elif mode == "reflink":
+            try:
+                _reflink(source, tmp)
+                shutil.copystat(source, tmp)
+                method = CLONED
+            except OSError:
+                _remove(tmp)
+        if method == COPIED:
+            shutil.copy2(source, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        _remove(tmp)
+        raise
+    return method
+
+
+def _sync_one(source: str, dest: str, mode: str, record: Optional[Record]) -> Tuple[str, Optional[Record]]:
+    """(status, new manifest record) for one file; content decides whether it is rewritten."""
+    src_st = _stat(source)
+    if src_st is None:
+        return MISSING, None
+    dest_st = _stat(dest)
+    known = record is not None and record.get("source") == source and record.get("mode") == mode
+    src_hash = record["hash"] if known and record.get("src") == stamp(src_st) else file_hash(source)
+    if dest_st is not None:
+        linked = os.path.samestat(src_st, dest_st)
+        if known and record.get("dest") == stamp(dest_st):
+            # untouched since it was written from content with the recorded hash
+            dest_hash = record["hash"]
+        elif dest_st.st_size != src_st.st_size:
+            dest_hash = None
+        elif linked:
+            dest_hash = src_hash
+        else:
+            dest_hash = file_hash(dest)
+        # after a mode switch, same content is not enough: hardlink mode links copies
+        # it could link, and the other modes break links back into separate files
+        if mode == "hardlink":
+            wrong_kind = not linked and src_st.st_dev == dest_st.st_dev
+        else:
+            wrong_kind = linked
+        if dest_hash == src_hash and not wrong_kind:
+            return UNCHANGED, _record(source, mode, src_hash, src_st, dest_st)
+    method = transfer(source, dest, mode)
+    return method, _record(source, mode, src_hash, _stat(source) or src_st, os.stat(dest))
+
+
+def _record(source: str, mode: str, digest: str, src_st: os.stat_result, dest_st: os.stat_result) -> Record:
+    return {"source": source, "mode": mode, "hash": digest, "src": stamp(src_st), "dest": stamp(dest_st)}
+
+
+class FileSync:
+    """Keeps `root` an exact mirror of the files passed to `sync`.
+
+    The manifest is kept in `state_dir`; without one nothing is remembered and
+    every file is compared by content. `counts` (files per status) and `removed`
+    (stale files deleted) accumulate over calls, for `summary()`.
+    """
+
+    def __init__(self, root: str, mode: str = "copy", jobs: int = 1, state_dir: Optional[str] = None) -> None:
+        if mode not in SYNC_MODES:
+            raise ValueError(f"unknown sync mode {mode!r} (expected one of {', '.join(SYNC_MODES)})")
+        self.root = root
+        self.state_dir = state_dir
+        self.mode = mode
+        self.jobs = max(1, jobs)
+        self.counts = {status: 0 for status in (COPIED, LINKED, CLONED, UNCHANGED, MISSING)}
+        self.removed = 0
+
+    @property
+    def manifest_path(self) -> Optional[str]:
+        if not self.state_dir:
+            return None
+        key = hashlib.blake2b(os.path.abspath(self.root).encode("utf-8"), digest_size=8).hexdigest()
+        return os.path.join(self.state_dir, f"{SYNC_STATE_PREFIX}{key}.json")
+
+    def _load_manifest(self) -> Dict[str, Record]:
+        if self.manifest_path is None:
+            return {}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as fh:
+                manifest = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        if (
+            not isinstance(manifest, dict)
+            or manifest.get("version") != SYNC_MANIFEST_VERSION
+            or manifest.get("root") != os.path.abspath(self.root)
+        ):
+            return {}
+        files = manifest.get("files")
+        return files if isinstance(files, dict) else {}
+
+    def _save_manifest(self, records: Dict[str, Record]) -> None:
+        path = self.manifest_path
+        if path is None:
+            return
+        manifest = {"version": SYNC_MANIFEST_VERSION, "root": os.path.abspath(self.root), "files": records}
+        try:
+            os.makedirs(self.state_dir, exist_ok=True)
+            tmp = path + TEMP_SUFFIX
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(manifest, fh, separators=(",", ":"), sort_keys=True)
+            os.replace(tmp, path)
+        except OSError:
+            # the mirror itself is complete; the next run just compares contents again
+            pass
+
+    def sync(self, files: Mapping[str, str]) -> Dict[str, str]:
+        """Mirror `files` (path relative to `root` -> source path); returns path -> status."""
+        os.makedirs(self.root, exist_ok=True)
+        old = self._load_manifest()
+        records: Dict[str, Record] = {}
+        statuses: Dict[str, str] = {}
+        pending: List[Tuple[str, str, str, Optional[Record]]] = []
+        for rel_path, source in files.items():
+            rel_path = os.path.normpath(rel_path)
+            dest = os.path.join(self.root, rel_path)
+            record = old.get(rel_path)
+            # fast path: both stamps as recorded, so nothing can have changed
+            if (
+                record is not None
+                and record.get("source") == source
+                and record.get("mode") == self.mode
+            ):
+                src_st = _stat(source)
+                dest_st = _stat(dest)
+                if (
+                    src_st is not None
+                    and dest_st is not None
+                    and record.get("src") == stamp(src_st)
+                    and record.get("dest") == stamp(dest_st)
+                ):
+                    records[rel_path] = record
+                    statuses[rel_path] = UNCHANGED
+                    continue
+            pending.append((rel_path, source, dest, record))
+
+        if self.jobs > 1 and len(pending) > 1:
+            # copies are I/O bound and release the GIL, so threads are enough
+            with ThreadPoolExecutor(max_workers=min(self.jobs, len(pending))) as pool:
+                results = list(pool.map(lambda task: _sync_one(task[1], task[2], self.mode, task[3]), pending))
+        else:
+            results = [_sync_one(source, dest, self.mode, record) for _, source, dest, record in pending]
+        for (rel_path, _, _, _), (status, record) in zip(pending, results):
+            statuses[rel_path] = status
+            if record is not None:
+                records[rel_path] = record
+
+        removed = self._remove_stale(set(statuses))
+        for status in statuses.values():
+            self.counts[status] += 1
+        self.removed += removed
+        if pending or removed or records.keys() != old.keys():
+            self._save_manifest(records)
+        return statuses
+
+    def _remove_stale(self, keep: set) -> int:
+        removed = 0
+        for dirpath, dirnames, filenames in os.walk(self.root, topdown=False):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                rel_path = os.path.relpath(path, self.root)
+                if rel_path in keep:
+                    continue
+                os.remove(path)
+                removed += 1
+            if dirpath != self.root and not os.listdir(dirpath):
+                os.rmdir(dirpath)
+        return removed
+
+    def summary(self) -> str:
+        counts = self.counts
+        total = sum(counts.values())
+        parts = [f"{counts[COPIED]} copied"]
+        if self.mode == "hardlink" or counts[LINKED]:
+            parts.append(f"{counts[LINKED]} hard-linked")
+        if self.mode == "reflink" or counts[CLONED]:
+            parts.append(f"{counts[CLONED]} reflinked")
+        parts.append(f"{counts[UNCHANGED]} unchanged")
+        parts.append(f"{self.removed} stale removed")
+        if counts[MISSING]:
+            parts.append(f"{counts[MISSING]} sources missing")
+        return f"[sync] {total} files into {self.root} ({self.mode}): " + ", ".join(parts)
+
+
+def add_sync_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--link-mode",
+        choices=SYNC_MODES,
+        default="copy",
+        help="How changed files reach the output: copy, hardlink (same filesystem; outputs share the source files) or reflink (copy-on-write clone where the filesystem supports it); both fall back to copying (default: %(default)s).",
+    )
+
+
+def file_sync_from_args(args: argparse.Namespace, root: str, jobs: int = 1) -> FileSync:
+    """A `FileSync` for `root` keeping its manifest in the tool's cache dir (none with --no-cache)."""
+    return FileSync(root, mode=args.link_mode, jobs=jobs, state_dir=resolve_cache_dir(args))
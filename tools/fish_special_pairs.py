@@ -1,69 +1,36 @@
 #!/usr/bin/env python3
 import argparse
-import csv
+import itertools
 import os
 import re
-from typing import Dict, List, Tuple, Set
-
-
-def walk_files(root: str, suffixes: Tuple[str, ...]) -> List[str]:
-    out = []
-    for dp, dn, fn in os.walk(root):
-        for f in fn:
-            if f.endswith(suffixes):
-                out.append(os.path.join(dp, f))
-    return out
-
-
-def parse_localization(export_root: str) -> Dict[str, Dict[str, str]]:
-    loc_dir = os.path.join(export_root, "Assets", "StreamingAssets", "Localization")
-    maps: Dict[str, Dict[str, str]] = {}
-    for lang, fname in [("en", "English.csv"), ("zh", "ChineseSimplified.csv")]:
-        d = {}
-        path = os.path.join(loc_dir, fname)
-        if os.path.isfile(path):
-            try:
-                with open(path, 'r', encoding='utf-8', errors='ignore') as fh:
-                    reader = csv.reader(fh)
-                    for row in reader:
-                        if not row or len(row) < 2:
-                            continue
-                        key = row[0].strip(); text = row[1].strip()
-                        if key:
-                            d[key] = text
-            except Exception:
-                pass
-        maps[lang] = d
-    return maps
-
-
-def build_guid_to_asset_path(export_root: str) -> Dict[str, str]:
-    mapping: Dict[str, str] = {}
-    assets_root = os.path.join(export_root, "Assets")
-    for dp, dn, fn in os.walk(assets_root):
-        for f in fn:
-            if not f.endswith('.meta'):
-                continue
-            meta_path = os.path.join(dp, f)
-            try:
-                with open(meta_path, 'r', encoding='utf-8', errors='ignore') as fh:
-                    for i, line in enumerate(fh):
-                        if line.startswith('guid: '):
-                            guid = line.split(':', 1)[1].strip()
-                            asset_path = meta_path[:-5]
-                            mapping[guid] = os.path.relpath(asset_path, export_root)
-                            break
-                        if i > 8:
-                            break
-            except Exception:
-                pass
-    return mapping
-
-
-def build_item_index(export_root: str) -> Dict[int, Dict]:
+from typing import IO, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from export_index import ExportIndex, add_cache_arguments, export_index_from_args
+from item_catalog import ItemCatalog, get_item_catalog
+from list_items_from_ripper import parse_prefab
+from localization import localization_from_args
+from parse_cache import ParseCache, disabled_cache, parse_cache_from_args
+from prefilter import Prefilter
+from profiling import ReadStats, add_profile_arguments, profiler_from_args, record_index_phases
+from special_pairs import read_special_pairs_many
+from sqlite_export import FISH_TABLES, CatalogWriter, catalog_writer
+from streaming import STDOUT_PATH, logs_to_stderr, open_ndjson, write_ndjson_line
+from tag_registry import get_tag_registry
+from unity_yaml import HEADER_PREFIX
+
+
+# bump whenever read_special_pairs' output changes shape or meaning
+SPECIAL_PAIRS_PARSER_VERSION = "4"
+
+
+def build_item_index(
+    export_root: str, index: ExportIndex, reads: Optional[ReadStats] = None
+) -> Dict[int, Dict]:
     """Return typeID -> {prefabName, displayKey, tags:[guid], prefabPath}"""
     items: Dict[int, Dict] = {}
-    prefabs = walk_files(os.path.join(export_root, "Assets"), (".prefab",))
+    prefilter = Prefilter("item prefabs", ("typeID:",), reads=reads)
+    prefabs = prefilter.filter(index.files((".prefab",)))
+    print(prefilter.summary())
     tid_pat = re.compile(r"^\s*typeID\s*:\s*(\d+)\s*$")
     name_pat = re.compile(r"^\s*m_Name\s*:\s*(.*)$")
     disp_pat = re.compile(r"^\s*displayName\s*:\s*(.*)$")
@@ -72,8 +39,11 @@ def build_item_index(export_root: str) -> Dict[int, Dict]:
         try:
             with open(pf, 'r', encoding='utf-8', errors='ignore') as fh:
                 lines = fh.readlines()
+                size = os.fstat(fh.fileno()).st_size
         except Exception:
             continue
+        if reads is not None:
+            reads.add(size, sum(1 for line in lines if line.startswith(HEADER_PREFIX)))
         content = ''.join(lines)
         if 'typeID:' not in content:
             continue
@@ -108,112 +78,168 @@ def build_item_index(export_root: str) -> Dict[int, Dict]:
     return items
 
 
-def find_special_pairs(export_root: str) -> List[Dict]:
+def _item_index_entry(item: Dict) -> Dict:
+    return {
+        'prefabName': item.get('prefabName', '') or '',
+        'displayKey': item.get('displayNameKey', '') or '',
+        'tags': list(item.get('tags') or []),
+        'prefabPath': item.get('prefab', '') or '',
+    }
+
+
+def is_fish_item(item: Dict) -> bool:
+    """Fishes are detected by displayKey or prefabName prefix."""
+    return (item.get('displayKey', '').startswith('Item_Fish_') or item.get('prefabName', '').startswith('Fish_'))
+
+
+def item_index_from_catalog(catalog: ItemCatalog) -> Dict[int, Dict]:
+    """build_item_index's typeID -> {...} map from list_items output, without touching prefabs.
+
+    Unlike the prefab scan, `tags` holds only the item's real tag GUIDs.
+    """
+    items: Dict[int, Dict] = {}
+    for it in catalog:
+        tid = it.get('typeID')
+        if isinstance(tid, int) and tid not in items:
+            items[tid] = _item_index_entry(it)
+    return items
+
+
+def scan_fish_prefabs(
+    export_root: str, index: ExportIndex, reads: Optional[ReadStats] = None
+) -> Dict[int, Dict]:
+    """Parse only `Fish_*.prefab` files (with list_items' parser) into build_item_index's shape."""
+    items: Dict[int, Dict] = {}
+    for pf in index.files(('.prefab',)):
+        if not os.path.basename(pf).startswith('Fish_'):
+            continue
+        it = parse_prefab(pf, export_root, reads)
+        if it and isinstance(it.get('typeID'), int) and it['typeID'] not in items:
+            items[it['typeID']] = _item_index_entry(it)
+    return items
+
+
+def load_item_index(
+    export_root: str,
+    index: ExportIndex,
+    items_path: Optional[str],
+    reads: Optional[ReadStats] = None,
+) -> Dict[int, Dict]:
+    """Item metadata from list_items output when `items_path` is given, else a full prefab scan.
+
+    If the given output holds no fish at all, only the Fish_* prefabs are scanned to fill in.
+    """
+    if not items_path:
+        return build_item_index(export_root, index, reads)
+    items = item_index_from_catalog(get_item_catalog(items_path))
+    print(f"[items] {len(items)} items from {items_path}")
+    if not any(is_fish_item(it) for it in items.values()):
+        fishes = scan_fish_prefabs(export_root, index, reads)
+        print(f"[items] no fish in {items_path}; scanned {len(fishes)} Fish_* prefabs")
+        for tid, it in fishes.items():
+            items.setdefault(tid, it)
+    return items
+
+
+# asset kinds that can carry a serialized specialPairs list
+SPECIAL_PAIRS_SOURCE_SUFFIXES = ('.unity', '.prefab', '.asset')
+ONLY_FLAG_TAGS = (
+    ('SunnyOnly', 'Fish_OnlySunDay'),
+    ('DayOnly', 'Fish_OnlyDay'),
+    ('NightOnly', 'Fish_OnlyNight'),
+    ('RainOnly', 'Fish_OnlyRainDay'),
+    ('StormOnly', 'Fish_OnlyStorm'),
+)
+FISH_CSV_HEADER = [
+    'fishID','fishPrefab','fishKey','fishEN','fishZH',
+    'SunnyOnly','DayOnly','NightOnly','RainOnly','StormOnly',
+    'baitID','baitPrefab','baitKey','baitEN','baitZH','chance','occurrences',
+    'sceneID','sceneEN','sceneZH','sourceAsset'
+]
+
+
+def find_special_pairs(
+    export_root: str,
+    index: ExportIndex,
+    cache: Optional[ParseCache] = None,
+    jobs: int = 1,
+    reads: Optional[ReadStats] = None,
+) -> List[Dict]:
     # Scan files once, then aggregate identical entries (same source, bait, fish, chance)
-    block_pat = re.compile(r"specialPairs:\s*(?:\n\s*-\s*baitID:\s*\d+\s*\n\s*fishID:\s*\d+\s*\n\s*chance:\s*[0-9.]+)+", re.M)
-    entry_pat = re.compile(r"-\s*baitID:\s*(\d+)\s*\n\s*fishID:\s*(\d+)\s*\n\s*chance:\s*([0-9.]+)")
-    file_set: Set[str] = set()
-    for root in (os.path.join(export_root, 'Assets'),):  # include Scenes via Assets to avoid double scanning
-        for path in walk_files(root, ('.unity', '.prefab', '.asset')):
-            file_set.add(path)
+    if cache is None:
+        cache = disabled_cache(export_root, "special_pairs")
+    paths = index.files(SPECIAL_PAIRS_SOURCE_SUFFIXES)
+    found: Dict[str, Optional[List[Tuple[int, int, float]]]] = {}
+    todo: List[str] = []
+    for path in paths:
+        hit, entries = cache.get(path)
+        if hit:
+            found[path] = entries
+        else:
+            todo.append(path)
+    # marker check and triple parsing both happen in the (optionally parallel) scanner
+    matched_count = 0
+    for path, result in zip(todo, read_special_pairs_many(todo, jobs, reads)):
+        if result is None:
+            found[path] = None
+            continue
+        matched, entries = result
+        matched_count += matched
+        found[path] = entries
+        cache.put(path, entries)
     counts: Dict[Tuple[str,int,int,float], int] = {}
-    for path in file_set:
-        try:
-            with open(path, 'r', encoding='utf-8', errors='ignore') as fh:
-                content = fh.read()
-        except Exception:
+    for path in paths:
+        entries = found[path]
+        if entries is None:
             continue
-        for blk in block_pat.finditer(content):
-            for em in entry_pat.finditer(blk.group(0)):
-                key = (
-                    os.path.relpath(path, export_root),
-                    int(em.group(1)),
-                    int(em.group(2)),
-                    float(em.group(3)),
-                )
-                counts[key] = counts.get(key, 0) + 1
+        source = os.path.relpath(path, export_root)
+        for bait, fish, chance in entries:
+            key = (source, bait, fish, chance)
+            counts[key] = counts.get(key, 0) + 1
+    print(
+        f"[scan] specialPairs sources: {len(todo)} scanned, {matched_count} with specialPairs, "
+        f"{len(paths) - len(todo)} from cache"
+    )
+    # every source was looked up, so entries for any other path are stale
+    cache.prune()
+    print(cache.summary())
     pairs: List[Dict] = []
     for (source, bait, fish, chance), cnt in counts.items():
         pairs.append({'source': source, 'baitID': bait, 'fishID': fish, 'chance': chance, 'count': cnt})
     return pairs
 
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument('export_root', help='Path to AssetRipper ExportedProject root (folder that contains Assets/)')
-    ap.add_argument('--out_csv', default='fish_special_pairs.csv', help='Output CSV path')
-    args = ap.parse_args()
+def iter_fish_rows(
+    export_root: str,
+    index: ExportIndex,
+    items: Dict[int, Dict],
+    pairs: List[Dict],
+    loc: Mapping[str, Dict[str, str]],
+) -> Iterator[List]:
+    """CSV data rows in fishID order: one per fish/special pair, plus fishes without pairs."""
+    guid_map = index.guid_map
 
-    loc = parse_localization(args.export_root)
-    guid_map = build_guid_to_asset_path(args.export_root)
-    items = build_item_index(args.export_root)
-    pairs = find_special_pairs(args.export_root)
-
-    # detect fishes by displayKey or prefabName prefix
-    def is_fish(item):
-        return (item.get('displayKey', '').startswith('Item_Fish_') or item.get('prefabName', '').startswith('Fish_'))
-
-    # Compile Only* tag name set for quick checks
-    only_names = {'Fish_OnlySunDay', 'Fish_OnlyDay', 'Fish_OnlyNight', 'Fish_OnlyRainDay', 'Fish_OnlyStorm'}
+    # Only* flag columns -> tag asset name; checked as bitmasks over registry tag ids
+    tags = get_tag_registry(guid_map, loc)
     def flags_for_fish(item):
-        tags = item.get('tags', []) or []
-        names = set()
-        for g in tags:
-            apath = guid_map.get(g, '')
-            base = os.path.splitext(os.path.basename(apath))[0] if apath else ''
-            if base in only_names:
-                names.add(base)
-        return {
-            'SunnyOnly': 'Fish_OnlySunDay' in names,
-            'DayOnly': 'Fish_OnlyDay' in names,
-            'NightOnly': 'Fish_OnlyNight' in names,
-            'RainOnly': 'Fish_OnlyRainDay' in names,
-            'StormOnly': 'Fish_OnlyStorm' in names,
-        }
+        # Only* tags live under Tag/; the prefab scan's other GUIDs must not become tags
+        bits = tags.mask(item.get('tags', []) or [], register=False)
+        return {column: bool(bits & tags.base_mask(base)) for column, base in ONLY_FLAG_TAGS}
 
     # Prepare rows: one per pair, and also include fishes with no pairs
-    rows = [[
-        'fishID','fishPrefab','fishKey','fishEN','fishZH',
-        'SunnyOnly','DayOnly','NightOnly','RainOnly','StormOnly',
-        'baitID','baitPrefab','baitKey','baitEN','baitZH','chance','occurrences',
-        'sceneID','sceneEN','sceneZH','sourceAsset'
-    ]]
-
     # Index pairs by fishID
     pairs_by_fish: Dict[int, List[Dict]] = {}
     for p in pairs:
         pairs_by_fish.setdefault(p['fishID'], []).append(p)
 
     # All fishes from items
-    fish_type_ids = [tid for tid,it in items.items() if is_fish(it)]
-    # Fallback: scan Fish_*.prefab under Assets/GameObject for any missed fish
+    fish_type_ids = [tid for tid,it in items.items() if is_fish_item(it)]
+    # Fallback: the same Fish_* prefab scan load_item_index uses when --items has no fish
     if not fish_type_ids:
-        go_prefabs = walk_files(os.path.join(args.export_root, 'Assets'), ('.prefab',))
-        tid_pat = re.compile(r"^\s*typeID\s*:\s*(\d+)\s*$")
-        for pf in go_prefabs:
-            base = os.path.basename(pf)
-            if not base.startswith('Fish_'):
-                continue
-            try:
-                with open(pf, 'r', encoding='utf-8', errors='ignore') as fh:
-                    lines = fh.readlines()
-            except Exception:
-                continue
-            tid = None
-            for line in lines:
-                m = tid_pat.match(line)
-                if m:
-                    tid = int(m.group(1)); break
-            if tid is None:
-                continue
-            fish_type_ids.append(tid)
-            # if this fish isn't in items, add a minimal record
-            items.setdefault(tid, {
-                'prefabName': os.path.splitext(base)[0],
-                'displayKey': '',
-                'tags': [],
-                'prefabPath': os.path.relpath(pf, args.export_root),
-            })
+        fishes = scan_fish_prefabs(export_root, index)
+        for tid, it in fishes.items():
+            items.setdefault(tid, it)
+        fish_type_ids = list(fishes)
     for fish_id in sorted(fish_type_ids):
         fit = items.get(fish_id, {})
         fkey = fit.get('displayKey','')
@@ -222,12 +248,12 @@ def main():
         fflags = flags_for_fish(fit)
         fish_pairs = pairs_by_fish.get(fish_id, [])
         if not fish_pairs:
-            rows.append([
+            yield [
                 fish_id, fit.get('prefabName',''), fkey, f_en, f_zh,
                 fflags['SunnyOnly'], fflags['DayOnly'], fflags['NightOnly'], fflags['RainOnly'], fflags['StormOnly'],
                 '', '', '', '', '', '',
                 '', '', '',
-            ])
+            ]
         else:
             for p in fish_pairs:
                 bit = items.get(p['baitID'], {})
@@ -248,17 +274,130 @@ def main():
                     return ''
                 scene_en = localize_scene('en')
                 scene_zh = localize_scene('zh')
-                rows.append([
+                yield [
                     fish_id, fit.get('prefabName',''), fkey, f_en, f_zh,
                     fflags['SunnyOnly'], fflags['DayOnly'], fflags['NightOnly'], fflags['RainOnly'], fflags['StormOnly'],
                     p['baitID'], bit.get('prefabName',''), bkey, b_en, b_zh, p['chance'], p.get('count',1),
                     scene_id, scene_en, scene_zh, src
-                ])
+                ]
+
+
+def build_fish_rows(
+    export_root: str,
+    index: ExportIndex,
+    items: Dict[int, Dict],
+    pairs: List[Dict],
+    loc: Mapping[str, Dict[str, str]],
+) -> List[List]:
+    """CSV rows (header first): one per fish/special pair, plus fishes without pairs."""
+    return [list(FISH_CSV_HEADER)] + list(iter_fish_rows(export_root, index, items, pairs, loc))
+
+
+def fish_csv_line(row: List) -> str:
+    return ','.join(map(lambda x: str(x).replace(',', ';'), row))+'\n'
+
+
+def fish_record(row: List) -> Dict:
+    """NDJSON object for a CSV row; rows without a pair are short, pad them with ''."""
+    return dict(itertools.zip_longest(FISH_CSV_HEADER, row, fillvalue=''))
+
 
-    with open(args.out_csv, 'w', encoding='utf-8') as f:
+def write_fish_rows(rows: List[List], out_csv: str) -> None:
+    with open(out_csv, 'w', encoding='utf-8') as f:
         for r in rows:
-            f.write(','.join(map(lambda x: str(x).replace(',', ';'), r))+'\n')
-    print(f"Wrote {args.out_csv} with {len(rows)-1} rows")
+            f.write(fish_csv_line(r))
+
+
+def stream_fish_rows(
+    rows: Iterable[List],
+    out_csv: str,
+    out: IO[str],
+    catalog: Optional[CatalogWriter] = None,
+) -> int:
+    """Write the CSV and one NDJSON object per row as rows are produced."""
+    count = 0
+    with open(out_csv, 'w', encoding='utf-8') as f:
+        f.write(fish_csv_line(FISH_CSV_HEADER))
+        for r in rows:
+            f.write(fish_csv_line(r))
+            record = fish_record(r)
+            write_ndjson_line(out, record)
+            if catalog is not None:
+                catalog.add_fish_pair(record)
+            count += 1
+    return count
+
+
+def run(args: argparse.Namespace, ndjson_out: Optional[IO[str]] = None) -> None:
+    profiler = profiler_from_args(args, 'fish_special_pairs')
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    index = export_index_from_args(args)
+    record_index_phases(profiler, index)
+    loc = localization_from_args(args)
+    reads = profiler.read_stats()
+    with profiler.phase('parse'):
+        items = load_item_index(args.export_root, index, args.items, reads)
+    cache = parse_cache_from_args(args, 'special_pairs', SPECIAL_PAIRS_PARSER_VERSION)
+    try:
+        with profiler.phase('parse'):
+            pairs = find_special_pairs(args.export_root, index, cache, jobs=jobs, reads=reads)
+    finally:
+        cache.close()
+    if ndjson_out is not None:
+        # pairs aggregate over every source, so only row building and writing stream
+        with profiler.phase('stream'), catalog_writer(args.out_sqlite, FISH_TABLES) as catalog:
+            rows = iter_fish_rows(args.export_root, index, items, pairs, loc)
+            count = stream_fish_rows(rows, args.out_csv, ndjson_out, catalog=catalog)
+        print(loc.summary())
+        print(get_tag_registry(index.guid_map, loc).summary())
+        if catalog is not None:
+            print(catalog.summary())
+        print(f"Wrote {args.out_csv} and {args.out_ndjson} with {count} rows")
+    else:
+        with profiler.phase('enrich'):
+            rows = build_fish_rows(args.export_root, index, items, pairs, loc)
+        print(loc.summary())
+        print(get_tag_registry(index.guid_map, loc).summary())
+        with profiler.phase('write'):
+            write_fish_rows(rows, args.out_csv)
+        count = len(rows) - 1
+        print(f"Wrote {args.out_csv} with {count} rows")
+        if args.out_sqlite:
+            with profiler.phase('sqlite'), CatalogWriter(args.out_sqlite, FISH_TABLES) as catalog:
+                catalog.add_fish_pairs(fish_record(r) for r in rows[1:])
+            print(catalog.summary())
+    if profiler.enabled:
+        profiler.count_reads('parse', reads)
+        profiler.count('parse', records=len(items) + len(pairs))
+        if ndjson_out is not None:
+            profiler.count('stream', records=count)
+        else:
+            profiler.count('enrich', records=count)
+            profiler.count_files('write', (args.out_csv,))
+            profiler.count('write', records=count)
+            if args.out_sqlite:
+                profiler.count('sqlite', records=count)
+        profiler.write(args.profile)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('export_root', help='Path to AssetRipper ExportedProject root (folder that contains Assets/)')
+    ap.add_argument('--out_csv', default='fish_special_pairs.csv', help='Output CSV path')
+    ap.add_argument('--format', choices=('csv', 'ndjson'), default='csv', help='csv: CSV only; ndjson: also stream one JSON object per row (default: csv)')
+    ap.add_argument('--out_ndjson', default='fish_special_pairs.ndjson', help="NDJSON path for --format ndjson; '-' streams to stdout")
+    ap.add_argument('--items', default=None, help='Read item metadata from list_items output (items.json, items.ndjson or an --out_sqlite catalog) instead of scanning every prefab')
+    ap.add_argument('--out_sqlite', default=None, help='Also write a fish_pairs table (indexed by fishID, baitID and sceneID) to this SQLite file')
+    ap.add_argument('--jobs', type=int, default=1, help='Worker processes for the specialPairs scan; 0 = one per CPU (default: 1)')
+    add_cache_arguments(ap)
+    add_profile_arguments(ap)
+    args = ap.parse_args()
+
+    if args.format == 'ndjson':
+        with open_ndjson(args.out_ndjson) as out, logs_to_stderr(args.out_ndjson == STDOUT_PATH):
+            run(args, out)
+    else:
+        run(args)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Lazy, indexed lookups over the output of list_items_from_ripper.py.
+
+    from item_catalog import ItemCatalog
+    catalog = ItemCatalog("items.json")        # nothing is read yet
+    catalog.by_type_id(1005)["nameEN"]         # loads the file, builds the typeID index
+    catalog.query(tag="Tag_Food", category="Food")
+
+`items.json`, `--format ndjson` output (`items.ndjson`) and an `--out_sqlite` catalog
+(`*.sqlite3`, `*.sqlite`, `*.db`) are all accepted. A JSON file is only read on first
+use, each index is built the first time a lookup needs it, and `query` results are
+memoized, so scripts that need a handful of lookups never pay for indexes they do
+not use. An SQLite catalog is never loaded whole for lookups: typeID, key, name, tag
+and category lookups run as `SELECT ... WHERE` queries against the indexes
+`--out_sqlite` creates, and only the matching items are rebuilt.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from functools import cached_property
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+ItemRecord = Dict[str, object]
+
+SQLITE_SUFFIXES = (".sqlite3", ".sqlite", ".db")
+
+# item fields SQLite stores as 0/1 integers
+BOOL_FIELDS = ("stackable", "inventory", "usageUtilities", "slots", "itemGraphic")
+
+
+# typeIDs per `IN (...)` query, well under SQLite's host parameter limit
+SQLITE_BATCH_SIZE = 500
+
+
+class SqliteItemReader:
+    """Item records rebuilt on demand from the tables written by `--out_sqlite`.
+
+    Each lookup is one indexed `SELECT` for the matching typeIDs plus one for their
+    tags and stats. Records are memoized by typeID, so repeated lookups (and a later
+    `all()`) hand out the same dict objects.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._records: Dict[int, ItemRecord] = {}
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            self._db.row_factory = sqlite3.Row
+        return self._db
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _build(self, rows: Iterable[sqlite3.Row]) -> List[ItemRecord]:
+        found: List[ItemRecord] = []
+        fresh: Dict[int, ItemRecord] = {}
+        for row in rows:
+            it = self._records.get(row["typeID"])
+            if it is None:
+                # the writer stores the extractors' "" as NULL
+                it = {key: "" if row[key] is None else row[key] for key in row.keys()}
+                for key in BOOL_FIELDS:
+                    if key in it:
+                        it[key] = bool(it[key])
+                it.update(tags=[], tagKeys=[], tagsEN=[], tagsZH=[], stats={})
+                fresh[row["typeID"]] = it
+            found.append(it)
+        type_ids = list(fresh)
+        for start in range(0, len(type_ids), SQLITE_BATCH_SIZE):
+            batch = type_ids[start:start + SQLITE_BATCH_SIZE]
+            marks = ",".join("?" * len(batch))
+            tag_rows = self.db.execute(
+                f"SELECT * FROM item_tags WHERE typeID IN ({marks}) ORDER BY typeID, position", batch
+            )
+            for row in tag_rows:
+                it = fresh[row["typeID"]]
+                it["tags"].append(row["tagGUID"] or "")
+                # unresolved GUIDs have no key and, as in items.json, no key/name entries
+                if row["tagKey"] is not None:
+                    it["tagKeys"].append(row["tagKey"])
+                    it["tagsEN"].append(row["nameEN"] or "")
+                    it["tagsZH"].append(row["nameZH"] or "")
+            stat_rows = self.db.execute(
+                f"SELECT * FROM item_stats WHERE typeID IN ({marks}) ORDER BY rowid", batch
+            )
+            for row in stat_rows:
+                fresh[row["typeID"]]["stats"][row["key"]] = row["value"]
+        self._records.update(fresh)
+        return found
+
+    def where(self, condition: str, params: Tuple = ()) -> Tuple[ItemRecord, ...]:
+        """Items whose `items` row matches `condition`, in typeID order."""
+        return tuple(self._build(self.db.execute(f"SELECT * FROM items WHERE {condition} ORDER BY typeID", params)))
+
+    def first(self, column: str, value: object) -> Optional[ItemRecord]:
+        rows = self.db.execute(f"SELECT * FROM items WHERE {column} = ? ORDER BY typeID LIMIT 1", (value,))
+        found = self._build(rows)
+        return found[0] if found else None
+
+    def with_tag(self, tag_key: str) -> Tuple[ItemRecord, ...]:
+        return self.where("typeID IN (SELECT typeID FROM item_tags WHERE tagKey = ?)", (tag_key,))
+
+    def in_category(self, category: str) -> Tuple[ItemRecord, ...]:
+        if not category:
+            return self.where("category IS NULL OR category = ''")
+        return self.where("category = ?", (category,))
+
+    def tag_keys(self) -> List[str]:
+        rows = self.db.execute("SELECT DISTINCT tagKey FROM item_tags WHERE tagKey IS NOT NULL AND tagKey != ''")
+        return sorted(row[0] for row in rows)
+
+    def categories(self) -> List[str]:
+        return sorted({row[0] or "" for row in self.db.execute("SELECT DISTINCT category FROM items")})
+
+    def count(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def all(self) -> List[ItemRecord]:
+        return self._build(self.db.execute("SELECT * FROM items ORDER BY typeID"))
+
+
+def read_sqlite_items(path: str) -> List[ItemRecord]:
+    """Rebuild every item record (with tags and stats) from an `--out_sqlite` catalog."""
+    reader = SqliteItemReader(path)
+    try:
+        return reader.all()
+    finally:
+        reader.close()
+
+
+def read_items(path: str) -> List[ItemRecord]:
+    """Item records from an items.json array, an items.ndjson file or an SQLite catalog."""
+    if path.endswith(SQLITE_SUFFIXES):
+        return read_sqlite_items(path)
+    with open(path, "r", encoding="utf-8") as fh:
+        if path.endswith(".ndjson"):
+            return [json.loads(line) for line in fh if line.strip()]
+        return json.load(fh)
+
+
+def _unique_index(items: Iterable[ItemRecord], field: str) -> Dict[object, ItemRecord]:
+    index: Dict[object, ItemRecord] = {}
+    for it in items:
+        value = it.get(field)
+        if value not in (None, "") and value not in index:
+            index[value] = it
+    return index
+
+
+class ItemCatalog:
+    """typeID / displayNameKey / prefabName lookups plus tag and category queries.
+
+    Over an SQLite catalog the lookups are answered by `SqliteItemReader` until
+    something needs the whole list (`items`, iteration, an unfiltered `query`); from
+    then on the in-memory indexes are used, built over the same record objects.
+    """
+
+    def __init__(self, path: Optional[str] = None, items: Optional[List[ItemRecord]] = None) -> None:
+        if path is None and items is None:
+            raise ValueError("ItemCatalog needs an items.json/items.ndjson/SQLite path or a list of items")
+        self.path = path
+        self._items = items
+        self._sqlite: Optional[SqliteItemReader] = None
+        if items is None and path is not None and path.endswith(SQLITE_SUFFIXES):
+            self._sqlite = SqliteItemReader(path)
+        self._queries: Dict[Tuple[Optional[str], Optional[str]], Tuple[ItemRecord, ...]] = {}
+
+    @classmethod
+    def from_items(cls, items: List[ItemRecord]) -> "ItemCatalog":
+        return cls(items=items)
+
+    @property
+    def items(self) -> List[ItemRecord]:
+        if self._items is None:
+            assert self.path is not None
+            if self._sqlite is not None:
+                self._items = self._sqlite.all()
+            else:
+                self._items = read_items(self.path)
+        return self._items
+
+    @property
+    def loaded(self) -> bool:
+        return self._items is not None
+
+    def _lookup_sql(self) -> Optional[SqliteItemReader]:
+        """The SQLite reader while lookups should go to the database, else None."""
+        return self._sqlite if self._items is None else None
+
+    @cached_property
+    def _by_type_id(self) -> Dict[object, ItemRecord]:
+        return _unique_index(self.items, "typeID")
+
+    @cached_property
+    def _by_display_name_key(self) -> Dict[object, ItemRecord]:
+        return _unique_index(self.items, "displayNameKey")
+
+    @cached_property
+    def _by_prefab_name(self) -> Dict[object, ItemRecord]:
+        return _unique_index(self.items, "prefabName")
+
+    @cached_property
+    def _by_tag(self) -> Dict[str, Tuple[ItemRecord, ...]]:
+        index: Dict[str, List[ItemRecord]] = {}
+        for it in self.items:
+            for key in dict.fromkeys(it.get("tagKeys") or ()):
+                if key:
+                    index.setdefault(key, []).append(it)
+        return {key: tuple(found) for key, found in index.items()}
+
+    @cached_property
+    def _by_category(self) -> Dict[str, Tuple[ItemRecord, ...]]:
+        index: Dict[str, List[ItemRecord]] = {}
+        for it in self.items:
+            index.setdefault(it.get("category") or "", []).append(it)
+        return {key: tuple(found) for key, found in index.items()}
+
+    def _unique(self, field: str, index_name: str, value: object) -> Optional[ItemRecord]:
+        db = self._lookup_sql()
+        if db is not None:
+            return None if value in (None, "") else db.first(field, value)
+        return getattr(self, index_name).get(value)
+
+    def by_type_id(self, type_id: int) -> Optional[ItemRecord]:
+        return self._unique("typeID", "_by_type_id", type_id)
+
+    def by_display_name_key(self, key: str) -> Optional[ItemRecord]:
+        return self._unique("displayNameKey", "_by_display_name_key", key)
+
+    def by_prefab_name(self, name: str) -> Optional[ItemRecord]:
+        return self._unique("prefabName", "_by_prefab_name", name)
+
+    def _tagged(self, tag_key: str) -> Tuple[ItemRecord, ...]:
+        db = self._lookup_sql()
+        if db is not None:
+            return db.with_tag(tag_key) if tag_key else ()
+        return self._by_tag.get(tag_key, ())
+
+    def with_tag(self, tag_key: str) -> Tuple[ItemRecord, ...]:
+        """Items carrying a tag, by localization key (`Tag_Food`) or bare name (`Food`)."""
+        found = self._tagged(tag_key)
+        if not found and not tag_key.startswith("Tag_"):
+            found = self._tagged(f"Tag_{tag_key}")
+        return found
+
+    def in_category(self, category: str) -> Tuple[ItemRecord, ...]:
+        db = self._lookup_sql()
+        if db is not None:
+            return db.in_category(category)
+        return self._by_category.get(category, ())
+
+    def tag_keys(self) -> List[str]:
+        db = self._lookup_sql()
+        return db.tag_keys() if db is not None else sorted(self._by_tag)
+
+    def categories(self) -> List[str]:
+        db = self._lookup_sql()
+        return db.categories() if db is not None else sorted(self._by_category)
+
+    def query(self, tag: Optional[str] = None, category: Optional[str] = None) -> Tuple[ItemRecord, ...]:
+        """Items matching every given filter, in catalog (typeID) order; memoized."""
+        key = (tag, category)
+        cached = self._queries.get(key)
+        if cached is not None:
+            return cached
+        if tag is None and category is None:
+            result = tuple(self.items)
+        elif category is None:
+            result = self.with_tag(tag)
+        elif tag is None:
+            result = self.in_category(category)
+        else:
+            # walk the smaller posting list and test membership in the other
+            tagged, in_category = self.with_tag(tag), self.in_category(category)
+            small, large = (tagged, in_category) if len(tagged) <= len(in_category) else (in_category, tagged)
+            wanted = {id(it) for it in large}
+            result = tuple(it for it in small if id(it) in wanted)
+        self._queries[key] = result
+        return result
+
+    def __len__(self) -> int:
+        db = self._lookup_sql()
+        return db.count() if db is not None else len(self.items)
+
+    def __iter__(self) -> Iterator[ItemRecord]:
+        return iter(self.items)
+
+    def __contains__(self, type_id: object) -> bool:
+        return self.by_type_id(type_id) is not None  # type: ignore[arg-type]
+
+
+_CATALOGS: Dict[str, Tuple[Tuple[int, int], ItemCatalog]] = {}
+
+
+def get_item_catalog(path: str) -> ItemCatalog:
+    """Process-wide catalog for `path`, reopened when the file changes on disk."""
+    key = os.path.abspath(path)
+    st = os.stat(key)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _CATALOGS.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    catalog = ItemCatalog(key)
+    _CATALOGS[key] = (stamp, catalog)
+    return catalog
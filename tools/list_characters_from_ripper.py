@@ -1,68 +1,44 @@
 #!/usr/bin/env python3
 import argparse
+import contextlib
 import csv
+import io
 import json
 import os
 import re
-from typing import Dict, List, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from export_index import (
+    ExportIndex,
+    add_cache_arguments,
+    export_index_from_args,
+    get_export_index,
+)
+from localization import Localization, get_localization, localization_from_args
+from parallel import map_chunks
+from parse_cache import ParseCache, disabled_cache, parse_cache_from_args
+from profiling import ReadStats, add_profile_arguments, profiler_from_args, record_index_phases
+from sqlite_export import CHARACTER_TABLES, CatalogWriter, catalog_writer
+from streaming import (
+    DEFAULT_RUN_SIZE,
+    STDOUT_PATH,
+    external_sort,
+    logs_to_stderr,
+    open_ndjson,
+    write_ndjson_line,
+)
+from unity_yaml import HEADER_PREFIX
 
 
 TARGET_SCRIPT_GUID = "d551df320acceeb317a9e97502ade12f"
-
-
-def walk_files(root: str, suffixes: Tuple[str, ...]) -> List[str]:
-    paths: List[str] = []
-    for dirpath, _, filenames in os.walk(root):
-        for fname in filenames:
-            if fname.endswith(suffixes):
-                paths.append(os.path.join(dirpath, fname))
-    return paths
-
-
-def parse_localization(export_root: str) -> Dict[str, Dict[str, str]]:
-    loc_dir = os.path.join(export_root, "Assets", "StreamingAssets", "Localization")
-    result: Dict[str, Dict[str, str]] = {}
-    for lang, fname in [("en", "English.csv"), ("zh", "ChineseSimplified.csv")]:
-        table: Dict[str, str] = {}
-        path = os.path.join(loc_dir, fname)
-        if os.path.isfile(path):
-            try:
-                with open(path, "r", encoding="utf-8", errors="ignore") as fh:
-                    reader = csv.reader(fh)
-                    for row in reader:
-                        if not row or len(row) < 2:
-                            continue
-                        key = row[0].strip()
-                        value = row[1].strip()
-                        if key:
-                            table[key] = value
-            except Exception:
-                pass
-        result[lang] = table
-    return result
-
-
-def build_guid_to_asset_path(export_root: str) -> Dict[str, str]:
-    mapping: Dict[str, str] = {}
-    assets_root = os.path.join(export_root, "Assets")
-    for dirpath, _, filenames in os.walk(assets_root):
-        for fname in filenames:
-            if not fname.endswith(".meta"):
-                continue
-            meta_path = os.path.join(dirpath, fname)
-            try:
-                with open(meta_path, "r", encoding="utf-8", errors="ignore") as fh:
-                    for idx, line in enumerate(fh):
-                        if line.startswith("guid: "):
-                            guid = line.split(":", 1)[1].strip()
-                            asset_path = meta_path[:-5]
-                            mapping[guid] = os.path.relpath(asset_path, export_root)
-                            break
-                        if idx > 8:
-                            break
-            except Exception:
-                pass
-    return mapping
+# bump whenever parse_character_asset's output changes shape or meaning
+CHARACTER_PARSER_VERSION = "1"
+CHARACTER_SCRIPT_FILE_ID = "fileID: 70297966"
+# the m_Script reference sits in the first lines of a ScriptableObject asset
+SCRIPT_HEADER_LINES = 20
+PROBE_BYTES = 4096
+CHARACTER_BATCH_SIZE = 4096
 
 
 def parse_number(value: str) -> Optional[float]:
@@ -79,20 +55,50 @@ def parse_number(value: str) -> Optional[float]:
 GUID_RE = re.compile(r"guid:\s*([0-9a-f]+)", re.IGNORECASE)
 
 
-def parse_character_asset(path: str) -> Optional[Dict]:
+def is_character_script_header(lines: Iterable[str]) -> bool:
+    """True if one of the header lines is the CharacterRandomPreset `m_Script` reference."""
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith("m_Script:") and CHARACTER_SCRIPT_FILE_ID in stripped and TARGET_SCRIPT_GUID in stripped:
+            return True
+    return False
+
+
+def probe_character_asset(path: str, reads: Optional[ReadStats] = None) -> bool:
+    """Cheap detection: read only the first few KB, enough for the first header lines.
+
+    Gives the same answer as `parse_character_asset`'s check over `readlines()[:20]`;
+    if the first 4 KB hold fewer than 20 lines, reading continues until they do.
+    """
+    try:
+        with open(path, "rb") as fh:
+            head = fh.read(PROBE_BYTES)
+            while head.count(b"\n") < SCRIPT_HEADER_LINES:
+                more = fh.read(PROBE_BYTES)
+                if not more:
+                    break
+                head += more
+    except OSError:
+        return False
+    if reads is not None:
+        reads.add(len(head))
+    text = head.decode("utf-8", errors="ignore")
+    # universal newlines, like the text-mode readlines() it stands in for
+    lines = io.StringIO(text, newline=None).readlines()[:SCRIPT_HEADER_LINES]
+    return is_character_script_header(lines)
+
+
+def parse_character_asset(path: str, reads: Optional[ReadStats] = None) -> Optional[Dict]:
     try:
         with open(path, "r", encoding="utf-8", errors="ignore") as fh:
             lines = fh.readlines()
+            size = os.fstat(fh.fileno()).st_size
     except Exception:
         return None
+    if reads is not None:
+        reads.add(size, sum(1 for line in lines if line.startswith(HEADER_PREFIX)))
 
-    script_line = None
-    for line in lines[:20]:
-        stripped = line.strip()
-        if stripped.startswith("m_Script:") and "fileID: 70297966" in stripped and TARGET_SCRIPT_GUID in stripped:
-            script_line = stripped
-            break
-    if not script_line:
+    if not is_character_script_header(lines[:SCRIPT_HEADER_LINES]):
         return None
 
     data: Dict[str, object] = {
@@ -163,7 +169,11 @@ def parse_character_asset(path: str) -> Optional[Dict]:
     return data
 
 
-def enrich_character(entry: Dict, guid_map: Dict[str, str], loc: Dict[str, Dict[str, str]], export_root: str) -> Dict:
+# preset fields holding a GUID reference; enrichment adds a `{field}Path` for each
+REFERENCE_FIELDS = ("characterModel", "lootBoxPrefab", "facePreset", "aiController", "skillPfb")
+
+
+def enrich_character(entry: Dict, guid_map: Dict[str, str], loc: Localization, export_root: str) -> Dict:
     asset_path = entry.get("asset_path", "")
     if asset_path:
         entry["asset_path"] = os.path.relpath(asset_path, export_root)
@@ -186,7 +196,7 @@ def enrich_character(entry: Dict, guid_map: Dict[str, str], loc: Dict[str, Dict[
     entry["name_en"] = loc.get("en", {}).get(name_key, "")
     entry["name_zh"] = loc.get("zh", {}).get(name_key, "")
 
-    for field in ("characterModel", "lootBoxPrefab", "facePreset", "aiController", "skillPfb"):
+    for field in REFERENCE_FIELDS:
         guid = entry.get(f"{field}Guid")
         if guid:
             entry[f"{field}Path"] = guid_map.get(guid, "")
@@ -206,22 +216,109 @@ def enrich_character(entry: Dict, guid_map: Dict[str, str], loc: Dict[str, Dict[
     return entry
 
 
-def load_characters(export_root: str) -> List[Dict]:
+def _probe_chunk(paths: List[str], counting: bool) -> Tuple[List[bool], Optional[ReadStats]]:
+    reads = ReadStats() if counting else None
+    return [probe_character_asset(path, reads) for path in paths], reads
+
+
+def _parse_chunk(paths: List[str], counting: bool) -> Tuple[List[Optional[Dict]], Optional[ReadStats]]:
+    reads = ReadStats() if counting else None
+    return [parse_character_asset(path, reads) for path in paths], reads
+
+
+def iter_characters(
+    export_root: str,
+    index: Optional[ExportIndex] = None,
+    cache: Optional[ParseCache] = None,
+    jobs: int = 1,
+    reads: Optional[ReadStats] = None,
+) -> Iterator[Dict]:
+    """Raw `parse_character_asset` results for every preset under Assets/MonoBehaviour.
+
+    Uncached assets go through two stages, each spread over `jobs` processes: a
+    header probe that reads only the first few KB, then a full parse of the matches.
+    """
+    if index is None:
+        index = get_export_index(export_root)
+    if cache is None:
+        cache = disabled_cache(export_root, "characters")
     mono_dir = os.path.join(export_root, "Assets", "MonoBehaviour")
-    assets = walk_files(mono_dir, (".asset",))
-    loc = parse_localization(export_root)
-    guid_map = build_guid_to_asset_path(export_root)
-    entries: List[Dict] = []
-    for asset in assets:
-        parsed = parse_character_asset(asset)
-        if parsed:
-            enriched = enrich_character(parsed, guid_map, loc, export_root)
-            entries.append(enriched)
-    entries.sort(key=lambda e: (e.get("preset_type", ""), e.get("preset_group", ""), e.get("name_en", ""), e.get("asset_name", "")))
+    assets = index.files((".asset",), under=mono_dir)
+    probed = parsed_count = 0
+    with contextlib.ExitStack() as stack:
+        pool = None
+        if jobs > 1 and len(assets) > 1:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=jobs))
+        for start in range(0, len(assets), CHARACTER_BATCH_SIZE):
+            batch = assets[start:start + CHARACTER_BATCH_SIZE]
+            results: Dict[str, Optional[Dict]] = {}
+            todo: List[str] = []
+            for asset in batch:
+                hit, parsed = cache.get(asset)
+                if hit:
+                    if parsed:
+                        # cached entries may come from a differently spelled export root
+                        parsed["asset_path"] = asset
+                    results[asset] = parsed
+                else:
+                    todo.append(asset)
+            matches = [asset for asset, ok in zip(todo, map_chunks(_probe_chunk, todo, jobs, pool, reads)) if ok]
+            probed += len(todo)
+            parsed_count += len(matches)
+            for asset, parsed in zip(matches, map_chunks(_parse_chunk, matches, jobs, pool, reads)):
+                results[asset] = parsed
+            for asset in todo:
+                # assets failing the probe are cached as "not a preset" too
+                cache.put(asset, results.setdefault(asset, None))
+            for asset in batch:
+                if results[asset]:
+                    yield results[asset]
+    print(f"[probe] character assets: {probed} probed, {parsed_count} fully parsed, {len(assets) - probed} from cache")
+    # every preset candidate was looked up, so entries for any other path are stale
+    cache.prune()
+    print(cache.summary())
+
+
+def parse_characters(
+    export_root: str,
+    index: Optional[ExportIndex] = None,
+    cache: Optional[ParseCache] = None,
+    jobs: int = 1,
+    reads: Optional[ReadStats] = None,
+) -> List[Dict]:
+    return list(iter_characters(export_root, index, cache, jobs, reads))
+
+
+def character_sort_key(entry: Dict) -> Tuple[str, str, str, str]:
+    return (entry.get("preset_type", ""), entry.get("preset_group", ""), entry.get("name_en", ""), entry.get("asset_name", ""))
+
+
+def enrich_characters(
+    parsed_assets: List[Dict],
+    guid_map: Dict[str, str],
+    localization: Localization,
+    export_root: str,
+) -> List[Dict]:
+    entries = [enrich_character(parsed, guid_map, localization, export_root) for parsed in parsed_assets]
+    entries.sort(key=character_sort_key)
     return entries
 
 
-def write_csv(path: str, entries: List[Dict]) -> None:
+def load_characters(
+    export_root: str,
+    index: Optional[ExportIndex] = None,
+    cache: Optional[ParseCache] = None,
+    localization: Optional[Localization] = None,
+) -> List[Dict]:
+    if index is None:
+        index = get_export_index(export_root)
+    if localization is None:
+        localization = get_localization(export_root)
+    parsed_assets = parse_characters(export_root, index, cache)
+    return enrich_characters(parsed_assets, index.guid_map, localization, export_root)
+
+
+def write_csv(path: str, entries: Iterable[Dict]) -> None:
     field_order = [
         "asset_path",
         "asset_name",
@@ -260,19 +357,126 @@ def write_csv(path: str, entries: List[Dict]) -> None:
             writer.writerow(row)
 
 
+def write_characters(entries: List[Dict], out_csv: str, out_json: str) -> None:
+    with open(out_json, "w", encoding="utf-8") as fh:
+        json.dump(entries, fh, indent=2, ensure_ascii=False)
+
+    write_csv(out_csv, entries)
+
+
+def stream_characters(
+    records: Iterable[Dict],
+    out_csv: str,
+    out: IO[str],
+    run_size: int = DEFAULT_RUN_SIZE,
+    catalog: Optional[CatalogWriter] = None,
+) -> int:
+    """Sort enriched entries with a bounded external merge and write CSV + NDJSON
+    (and SQLite rows when a catalog writer is given)."""
+    count = 0
+
+    def emit() -> Iterator[Dict]:
+        nonlocal count
+        for entry in external_sort(records, character_sort_key, run_size):
+            write_ndjson_line(out, entry)
+            if catalog is not None:
+                catalog.add_character(entry)
+            count += 1
+            yield entry
+
+    write_csv(out_csv, emit())
+    return count
+
+
+def run(args: argparse.Namespace, ndjson_out: Optional[IO[str]] = None) -> None:
+    profiler = profiler_from_args(args, "list_characters")
+    index = export_index_from_args(args)
+    record_index_phases(profiler, index)
+    cache = parse_cache_from_args(args, "characters", CHARACTER_PARSER_VERSION)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    reads = profiler.read_stats()
+    if ndjson_out is not None:
+        localization = localization_from_args(args)
+        # parse, enrich and write interleave, so the whole pass is one phase
+        try:
+            with profiler.phase("stream"), catalog_writer(args.out_sqlite, CHARACTER_TABLES) as catalog:
+                parsed = iter_characters(args.export_root, index, cache, jobs, reads)
+                records = (enrich_character(p, index.guid_map, localization, args.export_root) for p in parsed)
+                count = stream_characters(records, args.out_csv, ndjson_out, catalog=catalog)
+        finally:
+            cache.close()
+        print(localization.summary())
+        if catalog is not None:
+            print(catalog.summary())
+        print(f"Wrote {args.out_csv} and {args.out_ndjson} with {count} entries")
+        if profiler.enabled:
+            profiler.count_reads("stream", reads)
+            profiler.count("stream", records=count)
+            profiler.write(args.profile)
+        return
+
+    try:
+        with profiler.phase("parse"):
+            parsed_assets = parse_characters(args.export_root, index, cache, jobs, reads)
+    finally:
+        cache.close()
+    localization = localization_from_args(args)
+    with profiler.phase("enrich"):
+        entries = enrich_characters(parsed_assets, index.guid_map, localization, args.export_root)
+    print(localization.summary())
+    with profiler.phase("write"):
+        write_characters(entries, args.out_csv, args.out_json)
+    if args.out_sqlite:
+        with profiler.phase("sqlite"), CatalogWriter(args.out_sqlite, CHARACTER_TABLES) as catalog:
+            catalog.add_characters(entries)
+        print(catalog.summary())
+    if profiler.enabled:
+        profiler.count_reads("parse", reads)
+        profiler.count("parse", records=len(parsed_assets))
+        profiler.count("enrich", records=len(entries))
+        profiler.count_files("write", (args.out_csv, args.out_json))
+        profiler.count("write", records=len(entries))
+        if args.out_sqlite:
+            profiler.count("sqlite", records=len(entries))
+        profiler.write(args.profile)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="List Duckov characters defined in AssetRipper export.")
     parser.add_argument("export_root", help="Path to AssetRipper ExportedProject root (folder that contains Assets/)")
     parser.add_argument("--out_csv", default="characters.csv", help="Path for CSV output")
     parser.add_argument("--out_json", default="characters.json", help="Path for JSON output")
+    parser.add_argument(
+        "--format",
+        choices=("json", "ndjson"),
+        default="json",
+        help="json: one indented array; ndjson: stream one entry per line to --out_ndjson instead, as it is produced (default: json)",
+    )
+    parser.add_argument(
+        "--out_ndjson",
+        default="characters.ndjson",
+        help="Path for NDJSON output with --format ndjson; '-' streams to stdout",
+    )
+    parser.add_argument(
+        "--out_sqlite",
+        default=None,
+        help="Also write a characters table (indexed by preset group/type and name key) to this SQLite file",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for probing and parsing assets; 0 = one per CPU (default: 1)",
+    )
+    add_cache_arguments(parser)
+    add_profile_arguments(parser)
     args = parser.parse_args()
 
-    entries = load_characters(args.export_root)
-
-    with open(args.out_json, "w", encoding="utf-8") as fh:
-        json.dump(entries, fh, indent=2, ensure_ascii=False)
-
-    write_csv(args.out_csv, entries)
+    if args.format == "ndjson":
+        with open_ndjson(args.out_ndjson) as out, logs_to_stderr(args.out_ndjson == STDOUT_PATH):
+            run(args, out)
+    else:
+        run(args)
 
 
 if __name__ == "__main__":
@@ -1,111 +1,111 @@
 #!/usr/bin/env python3
 import argparse
-import csv
+import contextlib
+import functools
 import json
 import os
 import re
-from typing import Dict, List, Tuple
-
-
-def walk_files(root: str, suffixes: Tuple[str, ...]) -> List[str]:
-    out = []
-    for dp, dn, fn in os.walk(root):
-        for f in fn:
-            if f.endswith(suffixes):
-                out.append(os.path.join(dp, f))
-    return out
-
-
-def parse_localization(export_root: str) -> Dict[str, Dict[str, str]]:
-    loc_dir = os.path.join(export_root, "Assets", "StreamingAssets", "Localization")
-    maps: Dict[str, Dict[str, str]] = {}
-    for lang, fname in [("en", "English.csv"), ("zh", "ChineseSimplified.csv")]:
-        path = os.path.join(loc_dir, fname)
-        d = {}
-        if os.path.isfile(path):
-            try:
-                with open(path, "r", encoding="utf-8", errors="ignore") as fh:
-                    reader = csv.reader(fh)
-                    for row in reader:
-                        if not row or len(row) < 2:
-                            continue
-                        key = row[0].strip()
-                        text = row[1].strip()
-                        if key:
-                            d[key] = text
-            except Exception:
-                pass
-        maps[lang] = d
-    return maps
-
-
-def extract_mono_objects(lines: List[str]) -> List[Dict]:
-    objs = []
-    start_indices = []
-    for i, line in enumerate(lines):
-        if line.startswith("--- !u!114 "):
-            start_indices.append(i)
-    start_indices.append(len(lines))
-    for i in range(len(start_indices) - 1):
-        s = start_indices[i]
-        e = start_indices[i + 1]
-        block = lines[s:e]
-        # ensure it's MonoBehaviour
-        if not block or not block[0].startswith("--- !u!114 "):
-            continue
-        objs.append({"start": s, "end": e, "lines": block})
-    return objs
-
-
-def build_guid_to_asset_path(export_root: str) -> Dict[str, str]:
-    """Build a GUID -> asset relative path map by scanning .meta files under Assets/.
-    Useful to resolve tag GUIDs to Tag asset filenames (Tag_<Name>)."""
-    mapping: Dict[str, str] = {}
-    assets_root = os.path.join(export_root, "Assets")
-    for dp, dn, fn in os.walk(assets_root):
-        for f in fn:
-            if not f.endswith('.meta'):
-                continue
-            meta_path = os.path.join(dp, f)
-            try:
-                with open(meta_path, 'r', encoding='utf-8', errors='ignore') as fh:
-                    # GUID is at top of Unity meta files; stop after a few lines for speed
-                    for i, line in enumerate(fh):
-                        if line.startswith('guid: '):
-                            guid = line.split(':', 1)[1].strip()
-                            asset_path = meta_path[:-5]  # strip .meta
-                            mapping[guid] = os.path.relpath(asset_path, export_root)
-                            break
-                        if i > 8:
-                            break
-            except Exception:
-                pass
-    return mapping
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from export_index import (
+    ExportIndex,
+    add_cache_arguments,
+    export_index_from_args,
+    get_export_index,
+)
+from localization import localization_from_args
+from parallel import map_chunks
+from parse_cache import ParseCache, disabled_cache, parse_cache_from_args
+from prefilter import Prefilter
+from profiling import ReadStats, add_profile_arguments, profiler_from_args, record_index_phases
+from sqlite_export import ITEM_TABLES, CatalogWriter, catalog_writer
+from streaming import (
+    DEFAULT_RUN_SIZE,
+    STDOUT_PATH,
+    external_sort,
+    logs_to_stderr,
+    open_ndjson,
+    unique_sorted,
+    write_ndjson_line,
+)
+from tag_registry import TagRegistry, get_tag_registry
+from unity_yaml import UnityDocument, iter_documents
+
+
+# bump whenever parse_prefab's output changes shape or meaning
+ITEM_PARSER_VERSION = "1"
+
+# prefabs looked up and parsed together by iter_items
+ITEM_BATCH_SIZE = 4096
+
+# presence flags across file
+PRESENCE_FIELDS = ("inventory", "usageUtilities", "slots", "itemGraphic")
+
+
+def extract_mono_objects(documents: Iterable[UnityDocument]) -> Iterator[Dict]:
+    """Yield MonoBehaviour blocks: a `--- !u!114` document up to the next one.
+
+    Non-MonoBehaviour documents that follow a MonoBehaviour stay part of its block, and
+    only one block is held at a time.
+    """
+    block: Optional[Dict] = None
+    for doc in documents:
+        if doc.class_id == 114:
+            if block is not None:
+                yield block
+            block = {"start": doc.start, "end": doc.end, "lines": list(doc.lines)}
+        elif block is not None:
+            block["end"] = doc.end
+            block["lines"].extend(doc.lines)
+    if block is not None:
+        yield block
+
+
+def _digits(value: str) -> Optional[str]:
+    return value if value.isdecimal() else None
+
+
+def _decimal(value: str) -> Optional[str]:
+    return value if value and not value.strip("0123456789.") else None
+
+
+def _text(value: str) -> Optional[str]:
+    return value
+
+
+# key -> converter for the item fields we keep; anything else is skipped after one lookup
+ITEM_FIELDS = {
+    "typeID": _digits,
+    "displayName": _text,
+    "maxStackCount": _digits,
+    "value": _digits,
+    "quality": _digits,
+    "displayQuality": _digits,
+    "weight": _decimal,
+    "order": _digits,
+    "soundKey": _text,
+}
+
+GUID_RE = re.compile(r"guid:\s*([0-9a-f]+)")
 
 
 def parse_item_from_block(block_lines: List[str]) -> Dict:
     # Detect an Item-like block by presence of key fields
     # Fields we try to capture: typeID, displayName, maxStackCount, value, quality, displayQuality, weight, order, soundKey, iconGUID
     item = {}
-    pat_map = {
-        "typeID": re.compile(r"^\s*typeID\s*:\s*(\d+)\s*$"),
-        "displayName": re.compile(r"^\s*displayName\s*:\s*(.*)$"),
-        "maxStackCount": re.compile(r"^\s*maxStackCount\s*:\s*(\d+)\s*$"),
-        "value": re.compile(r"^\s*value\s*:\s*(\d+)\s*$"),
-        "quality": re.compile(r"^\s*quality\s*:\s*(\d+)\s*$"),
-        "displayQuality": re.compile(r"^\s*displayQuality\s*:\s*(\d+)\s*$"),
-        "weight": re.compile(r"^\s*weight\s*:\s*([0-9.]+)\s*$"),
-        "order": re.compile(r"^\s*order\s*:\s*(\d+)\s*$"),
-        "soundKey": re.compile(r"^\s*soundKey\s*:\s*(.*)$"),
-    }
+    fields = ITEM_FIELDS
     icon_guid = None
     for line in block_lines:
-        for k, pat in pat_map.items():
-            m = pat.match(line)
-            if m:
-                item[k] = m.group(1).strip()
+        key, sep, rest = line.partition(":")
+        if sep:
+            convert = fields.get(key.strip())
+            if convert is not None:
+                value = convert(rest.strip())
+                if value is not None:
+                    item[key.strip()] = value
         if icon_guid is None and "icon:" in line and "guid:" in line:
-            mg = re.search(r"guid:\s*([0-9a-f]+)", line)
+            mg = GUID_RE.search(line)
             if mg:
                 icon_guid = mg.group(1)
     if icon_guid:
@@ -116,131 +116,244 @@ def parse_item_from_block(block_lines: List[str]) -> Dict:
     return {}
 
 
-def list_items(export_root: str) -> List[Dict]:
-    items: List[Dict] = []
-    prefabs = walk_files(os.path.join(export_root, "Assets"), (".prefab",))
-    for pf in prefabs:
-        try:
-            with open(pf, "r", encoding="utf-8", errors="ignore") as fh:
-                lines = fh.readlines()
-        except Exception:
-            continue
-        # Find GameObject name
-        go_name = None
-        for line in lines[:200]:
-            if line.strip().startswith("m_Name:"):
-                go_name = line.split(":", 1)[1].strip()
-                break
-        # Extract MonoBehaviour blocks
-        blocks = extract_mono_objects(lines)
-        # First pass: find primary item MB
-        primary = None
-        for b in blocks:
-            meta = parse_item_from_block(b["lines"])
-            if meta:
-                primary = meta
-                break
-        if not primary:
-            continue
-        # Fill extra info
-        type_id = int(primary.get("typeID", 0))
-        max_stack = int(primary.get("maxStackCount", 1) or 1)
-        # Attempt to find nested attributes in same file (list: entries with key/baseValue, tags, vars)
-        stats: Dict[str, float] = {}
-        key_pat = re.compile(r"^\s*key\s*:\s*(.*)$")
-        base_pat = re.compile(r"^\s*baseValue\s*:\s*([0-9.]+)\s*$")
-        cur_key = None
-        tag_guids: List[str] = []
-        variables_count = 0
-        constants_count = 0
-        agents_count = 0
-        effects_count = 0
-        reading_tags = False
-        reading_which = None
-        def is_new_prop(s: str) -> bool:
-            # a same-level or higher-level property start like '  something:'
-            return bool(re.match(r"^\s{2,}[a-zA-Z_][a-zA-Z0-9_]*\s*:\s*", s)) and not s.strip().startswith('-')
-        for b in blocks:
-            for line in b["lines"]:
-                km = key_pat.match(line)
-                if km:
-                    cur_key = km.group(1).strip()
-                bm = base_pat.match(line)
-                if bm and cur_key:
-                    try:
-                        stats[cur_key] = float(bm.group(1))
-                    except Exception:
-                        pass
-                    cur_key = None
-                # tags
-                if not reading_tags and line.strip().startswith("tags:"):
-                    reading_tags = True
-                    continue
-                if reading_tags:
-                    if "guid:" in line and "-" in line:
-                        mg = re.search(r"guid:\s*([0-9a-f]+)", line)
-                        if mg:
-                            tag_guids.append(mg.group(1))
-                    elif is_new_prop(line):
-                        # ignore internal container props like 'list:' or 'entries:' inside tags
-                        prop = line.strip().split(':', 1)[0]
-                        if prop not in ("list", "entries"):
-                            reading_tags = False
-                # list counters
-                if reading_which is None:
-                    if line.strip().startswith("variables:"):
-                        reading_which = 'variables'
-                    elif line.strip().startswith("constants:"):
-                        reading_which = 'constants'
-                    elif line.strip().startswith("agents:"):
-                        reading_which = 'agents'
-                    elif line.strip().startswith("effects:"):
-                        reading_which = 'effects'
+_IDENT_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_")
+
+
+def is_new_prop(s: str) -> bool:
+    # a same-level or higher-level property start like '  something:'
+    body = s.lstrip()
+    if len(s) - len(body) < 2:
+        return False
+    key, sep, _ = body.partition(":")
+    if not sep:
+        return False
+    key = key.rstrip()
+    return bool(key) and not key[0].isdigit() and _IDENT_CHARS.issuperset(key)
+
+
+COUNTED_LISTS = ("variables", "constants", "agents", "effects")
+
+
+class NestedAttributeScanner:
+    """Line-by-line state machine for stats (key/baseValue), tag GUIDs and list sizes.
+
+    State carries across MonoBehaviour blocks, so feed every block of a prefab in order.
+    """
+
+    def __init__(self) -> None:
+        self.stats: Dict[str, float] = {}
+        self.tag_guids: List[str] = []
+        self.counts = dict.fromkeys(COUNTED_LISTS, 0)
+        self.cur_key: Optional[str] = None
+        self.reading_tags = False
+        self.reading_which: Optional[str] = None
+
+    def feed(self, lines: Iterable[str]) -> None:
+        stats = self.stats
+        counts = self.counts
+        tag_guids = self.tag_guids
+        cur_key = self.cur_key
+        reading_tags = self.reading_tags
+        reading_which = self.reading_which
+        for line in lines:
+            stripped = line.strip()
+            # `head` is everything before the first colon, so `head == "tags"` is
+            # exactly `stripped.startswith("tags:")`
+            head, sep, rest = stripped.partition(":")
+            if sep:
+                key = head.rstrip()
+                if key == "key":
+                    cur_key = rest.strip()
+                elif key == "baseValue" and cur_key:
+                    value = _decimal(rest.strip())
+                    if value is not None:
+                        try:
+                            stats[cur_key] = float(value)
+                        except ValueError:
+                            pass
+                        cur_key = None
+            # tags
+            if not reading_tags and sep and head == "tags":
+                reading_tags = True
+                continue
+            if reading_tags:
+                if "guid:" in line and "-" in line:
+                    mg = GUID_RE.search(line)
+                    if mg:
+                        tag_guids.append(mg.group(1))
+                elif is_new_prop(line):
+                    # ignore internal container props like 'list:' or 'entries:' inside tags
+                    if head not in ("list", "entries"):
+                        reading_tags = False
+            # list counters
+            if reading_which is None:
+                if sep and head in counts:
+                    reading_which = head
+            else:
+                if stripped.startswith("- "):
+                    counts[reading_which] += 1
+                elif is_new_prop(line):
+                    reading_which = None
+        self.cur_key = cur_key
+        self.reading_tags = reading_tags
+        self.reading_which = reading_which
+
+
+def parse_prefab(pf: str, export_root: str, reads: Optional[ReadStats] = None) -> Optional[Dict]:
+    """Parse one prefab into an item record, or None if it holds no item MonoBehaviour."""
+    # Find GameObject name (first m_Name in the first 200 lines) and file-wide presence flags
+    go_name = None
+    seen_lines = 0
+    documents_read = 0
+    presence = dict.fromkeys(PRESENCE_FIELDS, False)
+
+    def watch(documents: Iterable[UnityDocument]) -> Iterator[UnityDocument]:
+        nonlocal go_name, seen_lines, documents_read
+        for doc in documents:
+            if doc.class_id is not None:
+                documents_read += 1
+            lines = doc.lines
+            if go_name is None and seen_lines < 200:
+                for line in lines[: 200 - seen_lines]:
+                    if line.strip().startswith("m_Name:"):
+                        go_name = line.split(":", 1)[1].strip()
+                        break
+            seen_lines += len(lines)
+            for line in lines:
+                stripped = line.strip()
+                for field in PRESENCE_FIELDS:
+                    if not presence[field] and stripped.startswith(field + ":"):
+                        presence[field] = True
+            yield doc
+
+    # Attempt to find nested attributes in same file (list: entries with key/baseValue, tags, vars)
+    scanner = NestedAttributeScanner()
+    primary = None
+    try:
+        with open(pf, "rb") as fh:
+            # Extract MonoBehaviour blocks; the first one that looks like an item is primary
+            for b in extract_mono_objects(watch(iter_documents(fh))):
+                if primary is None:
+                    primary = parse_item_from_block(b["lines"]) or None
+                scanner.feed(b["lines"])
+            if reads is not None:
+                reads.add(os.fstat(fh.fileno()).st_size, documents_read)
+    except OSError:
+        return None
+    if not primary:
+        return None
+    # Fill extra info
+    type_id = int(primary.get("typeID", 0))
+    max_stack = int(primary.get("maxStackCount", 1) or 1)
+    disp_key = primary.get("displayName", "")
+    category = ""
+    if disp_key.startswith("Item_"):
+        parts = disp_key.split("_")
+        if len(parts) > 1:
+            category = parts[1]
+    return {
+        "prefab": os.path.relpath(pf, export_root),
+        "prefabName": go_name or "",
+        "typeID": type_id,
+        "displayNameKey": disp_key,
+        "category": category,
+        "maxStackCount": max_stack,
+        "stackable": max_stack > 1,
+        "value": int(primary.get("value", 0) or 0),
+        "quality": int(primary.get("quality", 0) or 0),
+        "displayQuality": int(primary.get("displayQuality", 0) or 0),
+        "weight": float(primary.get("weight", 0.0) or 0.0),
+        "order": int(primary.get("order", 0) or 0),
+        "soundKey": primary.get("soundKey", ""),
+        "iconGUID": primary.get("iconGUID", ""),
+        "tags": scanner.tag_guids,
+        "variablesCount": scanner.counts["variables"],
+        "constantsCount": scanner.counts["constants"],
+        "agentsCount": scanner.counts["agents"],
+        "effectsCount": scanner.counts["effects"],
+        **presence,
+        "stats": scanner.stats,
+    }
+
+
+def _parse_prefab_chunk(
+    export_root: str, chunk: List[str], counting: bool
+) -> Tuple[List[Optional[Dict]], Optional[ReadStats]]:
+    reads = ReadStats() if counting else None
+    return [parse_prefab(pf, export_root, reads) for pf in chunk], reads
+
+
+def parse_prefabs(
+    prefabs: List[str],
+    export_root: str,
+    jobs: int = 1,
+    pool: Optional[ProcessPoolExecutor] = None,
+    reads: Optional[ReadStats] = None,
+) -> List[Optional[Dict]]:
+    """Parse prefabs in input order, spreading chunks over `jobs` worker processes."""
+    return map_chunks(functools.partial(_parse_prefab_chunk, export_root), prefabs, jobs, pool, reads)
+
+
+def iter_items(
+    export_root: str,
+    index: Optional[ExportIndex] = None,
+    jobs: int = 1,
+    cache: Optional[ParseCache] = None,
+    reads: Optional[ReadStats] = None,
+) -> Iterator[Dict]:
+    """Parsed items in walk order, duplicates included.
+
+    Prefabs are looked up, filtered and parsed one batch at a time, so only a batch
+    of results is held in memory.
+    """
+    if index is None:
+        index = get_export_index(export_root)
+    if cache is None:
+        cache = disabled_cache(export_root, "items")
+    prefabs = index.files((".prefab",))
+    # an item MonoBehaviour needs both keys; skip every other prefab undecoded
+    prefilter = Prefilter("prefabs", ("typeID", "displayName"), reads=reads)
+    with contextlib.ExitStack() as stack:
+        pool = None
+        if jobs > 1 and len(prefabs) > 1:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=jobs))
+        for start in range(0, len(prefabs), ITEM_BATCH_SIZE):
+            batch = prefabs[start:start + ITEM_BATCH_SIZE]
+            results: Dict[str, Optional[Dict]] = {}
+            todo: List[str] = []
+            for pf in batch:
+                hit, value = cache.get(pf)
+                if hit:
+                    results[pf] = value
                 else:
-                    if line.strip().startswith("- "):
-                        if reading_which == 'variables': variables_count += 1
-                        elif reading_which == 'constants': constants_count += 1
-                        elif reading_which == 'agents': agents_count += 1
-                        elif reading_which == 'effects': effects_count += 1
-                    elif is_new_prop(line):
-                        reading_which = None
-
-        # presence flags across file
-        presence = {
-            "inventory": any(l.strip().startswith("inventory:") for l in lines),
-            "usageUtilities": any(l.strip().startswith("usageUtilities:") for l in lines),
-            "slots": any(l.strip().startswith("slots:") for l in lines),
-            "itemGraphic": any(l.strip().startswith("itemGraphic:") for l in lines),
-        }
-        disp_key = primary.get("displayName", "")
-        category = ""
-        if disp_key.startswith("Item_"):
-            parts = disp_key.split("_")
-            if len(parts) > 1:
-                category = parts[1]
-        items.append({
-            "prefab": os.path.relpath(pf, export_root),
-            "prefabName": go_name or "",
-            "typeID": type_id,
-            "displayNameKey": disp_key,
-            "category": category,
-            "maxStackCount": max_stack,
-            "stackable": max_stack > 1,
-            "value": int(primary.get("value", 0) or 0),
-            "quality": int(primary.get("quality", 0) or 0),
-            "displayQuality": int(primary.get("displayQuality", 0) or 0),
-            "weight": float(primary.get("weight", 0.0) or 0.0),
-            "order": int(primary.get("order", 0) or 0),
-            "soundKey": primary.get("soundKey", ""),
-            "iconGUID": primary.get("iconGUID", ""),
-            "tags": tag_guids,
-            "variablesCount": variables_count,
-            "constantsCount": constants_count,
-            "agentsCount": agents_count,
-            "effectsCount": effects_count,
-            **presence,
-            "stats": stats,
-        })
+                    todo.append(pf)
+            candidates = prefilter.filter(todo)
+            for pf, parsed in zip(candidates, parse_prefabs(candidates, export_root, jobs, pool, reads)):
+                results[pf] = parsed
+            for pf in todo:
+                # rejected prefabs are cached as "no item" too
+                cache.put(pf, results.setdefault(pf, None))
+            for pf in batch:
+                if results[pf]:
+                    yield results[pf]
+    print(prefilter.summary())
+    # every prefab was looked up, so entries for any other path are stale
+    cache.prune()
+    print(cache.summary())
+
+
+def item_sort_key(item: Dict) -> int:
+    return item["typeID"]
+
+
+def list_items(
+    export_root: str,
+    index: Optional[ExportIndex] = None,
+    jobs: int = 1,
+    cache: Optional[ParseCache] = None,
+    reads: Optional[ReadStats] = None,
+) -> List[Dict]:
+    items = list(iter_items(export_root, index, jobs, cache, reads))
     # Deduplicate by typeID (keep first)
     seen = set()
     uniq: List[Dict] = []
@@ -249,100 +362,192 @@ def list_items(export_root: str) -> List[Dict]:
             continue
         seen.add(it["typeID"])
         uniq.append(it)
-    return sorted(uniq, key=lambda x: x["typeID"])
+    return sorted(uniq, key=item_sort_key)
 
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("export_root", help="Path to AssetRipper ExportedProject root (folder that contains Assets/")
-    ap.add_argument("--out_csv", default="items.csv", help="Output CSV path")
-    ap.add_argument("--out_json", default="items.json", help="Output JSON path")
-    args = ap.parse_args()
+ITEM_CSV_COLUMNS = [
+    "typeID",
+    "prefabName",
+    "displayNameKey",
+    "category",
+    "nameEN",
+    "nameZH",
+    "descEN",
+    "descZH",
+    "maxStackCount",
+    "stackable",
+    "value",
+    "quality",
+    "displayQuality",
+    "weight",
+    "order",
+    "soundKey",
+    "iconGUID",
+    "tags",
+    "tagKeys",
+    "tagsEN",
+    "tagsZH",
+    "variablesCount",
+    "constantsCount",
+    "agentsCount",
+    "effectsCount",
+    "inventory",
+    "usageUtilities",
+    "slots",
+    "itemGraphic",
+    "prefab",
+]
 
-    items = list_items(args.export_root)
-    loc = parse_localization(args.export_root)
-    guid_map = build_guid_to_asset_path(args.export_root)
 
+def enrich_item(
+    it: Dict,
+    loc: Mapping[str, Dict[str, str]],
+    guid_map: Dict[str, str],
+    tags: Optional[TagRegistry] = None,
+) -> Dict:
+    """Add localized names/descriptions, the icon texture path and tag keys/names in place."""
     # Enrich with localized names/descriptions where possible
-    for it in items:
-        key = it.get("displayNameKey", "")
-        it["nameEN"] = loc.get("en", {}).get(key, "")
-        it["nameZH"] = loc.get("zh", {}).get(key, "")
-        desc_key = (key + "_Desc") if key else ""
-        it["descEN"] = loc.get("en", {}).get(desc_key, "")
-        it["descZH"] = loc.get("zh", {}).get(desc_key, "")
+    key = it.get("displayNameKey", "")
+    it["nameEN"] = loc.get("en", {}).get(key, "")
+    it["nameZH"] = loc.get("zh", {}).get(key, "")
+    desc_key = (key + "_Desc") if key else ""
+    it["descEN"] = loc.get("en", {}).get(desc_key, "")
+    it["descZH"] = loc.get("zh", {}).get(desc_key, "")
 
     # Map icon GUIDs to icon texture paths
-    for it in items:
-        icon_guid = it.get("iconGUID", "")
-        icon_path = guid_map.get(icon_guid, "")
-        it["iconPath"] = icon_path.replace('Sprite', 'Texture2D').replace('.asset', '.png')
+    icon_guid = it.get("iconGUID", "")
+    icon_path = guid_map.get(icon_guid, "")
+    it["iconPath"] = icon_path.replace('Sprite', 'Texture2D').replace('.asset', '.png')
 
     # Map tag GUIDs to Tag_<Name> keys and localized names
+    if tags is None:
+        tags = get_tag_registry(guid_map, loc)
+    tag_keys, tag_names = tags.describe(tags.ids(it.get("tags", []) or []))
+    it["tagKeys"] = tag_keys
+    it["tagsEN"] = tag_names["en"]
+    it["tagsZH"] = tag_names["zh"]
+    return it
+
+
+def enrich_items(items: List[Dict], loc: Mapping[str, Dict[str, str]], guid_map: Dict[str, str]) -> None:
+    tags = get_tag_registry(guid_map, loc)
     for it in items:
-        tag_guids = it.get("tags", []) or []
-        tag_keys = []
-        tag_en = []
-        tag_zh = []
-        for g in tag_guids:
-            asset_path = guid_map.get(g, "")
-            base = os.path.splitext(os.path.basename(asset_path))[0] if asset_path else ""
-            tkey = ("Tag_" + base) if base else ""
-            if tkey:
-                tag_keys.append(tkey)
-                tag_en.append(loc.get("en", {}).get(tkey, base))
-                tag_zh.append(loc.get("zh", {}).get(tkey, base))
-        it["tagKeys"] = tag_keys
-        it["tagsEN"] = tag_en
-        it["tagsZH"] = tag_zh
+        enrich_item(it, loc, guid_map, tags)
+
+
+def item_csv_line(it: Dict) -> str:
+    return ",".join(str(it.get(c, "")).replace(",", ";") for c in ITEM_CSV_COLUMNS) + "\n"
+
 
+def write_items(items: List[Dict], out_csv: str, out_json: str) -> None:
     # Write CSV (core fields)
-    cols = [
-        "typeID",
-        "prefabName",
-        "displayNameKey",
-        "category",
-        "nameEN",
-        "nameZH",
-        "descEN",
-        "descZH",
-        "maxStackCount",
-        "stackable",
-        "value",
-        "quality",
-        "displayQuality",
-        "weight",
-        "order",
-        "soundKey",
-        "iconGUID",
-        "tags",
-        "tagKeys",
-        "tagsEN",
-        "tagsZH",
-        "variablesCount",
-        "constantsCount",
-        "agentsCount",
-        "effectsCount",
-        "inventory",
-        "usageUtilities",
-        "slots",
-        "itemGraphic",
-        "prefab",
-    ]
-    with open(args.out_csv, "w", encoding="utf-8") as f:
-        f.write(",".join(cols) + "\n")
+    with open(out_csv, "w", encoding="utf-8") as f:
+        f.write(",".join(ITEM_CSV_COLUMNS) + "\n")
         for it in items:
-            row = []
-            for c in cols:
-                v = it.get(c, "")
-                row.append(str(v).replace(",", ";"))
-            f.write(",".join(row) + "\n")
+            f.write(item_csv_line(it))
 
     # Write JSON (full details including stats)
-    with open(args.out_json, "w", encoding="utf-8") as f:
+    with open(out_json, "w", encoding="utf-8") as f:
         json.dump(items, f, ensure_ascii=False, indent=2)
 
+
+def stream_items(
+    records: Iterable[Dict],
+    out_csv: str,
+    out: IO[str],
+    run_size: int = DEFAULT_RUN_SIZE,
+    catalog: Optional[CatalogWriter] = None,
+) -> int:
+    """Dedup/sort enriched items with a bounded external merge and write CSV + NDJSON
+    (and SQLite rows when a catalog writer is given)."""
+    ordered = unique_sorted(external_sort(records, item_sort_key, run_size), item_sort_key)
+    count = 0
+    with open(out_csv, "w", encoding="utf-8") as f:
+        f.write(",".join(ITEM_CSV_COLUMNS) + "\n")
+        for it in ordered:
+            write_ndjson_line(out, it)
+            f.write(item_csv_line(it))
+            if catalog is not None:
+                catalog.add_item(it)
+            count += 1
+    return count
+
+
+def run(args: argparse.Namespace, ndjson_out: Optional[IO[str]] = None) -> None:
+    profiler = profiler_from_args(args, "list_items")
+    index = export_index_from_args(args)
+    record_index_phases(profiler, index)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    cache = parse_cache_from_args(args, "items", ITEM_PARSER_VERSION)
+    loc = localization_from_args(args)
+    reads = profiler.read_stats()
+    if ndjson_out is not None:
+        # parse, enrich and write interleave, so the whole pass is one phase
+        try:
+            tags = get_tag_registry(index.guid_map, loc)
+            with profiler.phase("stream"), catalog_writer(args.out_sqlite, ITEM_TABLES, tags) as catalog:
+                parsed = iter_items(args.export_root, index, jobs=jobs, cache=cache, reads=reads)
+                records = (enrich_item(it, loc, index.guid_map, tags) for it in parsed)
+                count = stream_items(records, args.out_csv, ndjson_out, catalog=catalog)
+        finally:
+            cache.close()
+        print(loc.summary())
+        print(tags.summary())
+        if catalog is not None:
+            print(catalog.summary())
+        print(f"Wrote {args.out_csv} with {count} items and {args.out_ndjson}")
+        if profiler.enabled:
+            profiler.count_reads("stream", reads)
+            profiler.count("stream", records=count)
+            profiler.write(args.profile)
+        return
+
+    try:
+        with profiler.phase("parse"):
+            items = list_items(args.export_root, index, jobs=jobs, cache=cache, reads=reads)
+    finally:
+        cache.close()
+    with profiler.phase("enrich"):
+        enrich_items(items, loc, index.guid_map)
+    print(loc.summary())
+    print(get_tag_registry(index.guid_map, loc).summary())
+    with profiler.phase("write"):
+        write_items(items, args.out_csv, args.out_json)
     print(f"Wrote {args.out_csv} with {len(items)} items and {args.out_json}")
+    if args.out_sqlite:
+        tags = get_tag_registry(index.guid_map, loc)
+        with profiler.phase("sqlite"), CatalogWriter(args.out_sqlite, ITEM_TABLES, tags=tags) as catalog:
+            catalog.add_items(items)
+        print(catalog.summary())
+    if profiler.enabled:
+        profiler.count_reads("parse", reads)
+        profiler.count("parse", records=len(items))
+        profiler.count("enrich", records=len(items))
+        profiler.count_files("write", (args.out_csv, args.out_json))
+        profiler.count("write", records=len(items))
+        if args.out_sqlite:
+            profiler.count("sqlite", records=len(items))
+        profiler.write(args.profile)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("export_root", help="Path to AssetRipper ExportedProject root (folder that contains Assets/")
+    ap.add_argument("--out_csv", default="items.csv", help="Output CSV path")
+    ap.add_argument("--out_json", default="items.json", help="Output JSON path")
+    ap.add_argument("--format", choices=("json", "ndjson"), default="json", help="json: one indented array; ndjson: stream one item per line to --out_ndjson instead, as it is produced (default: json)")
+    ap.add_argument("--out_ndjson", default="items.ndjson", help="NDJSON path for --format ndjson; '-' streams to stdout")
+    ap.add_argument("--out_sqlite", default=None, help="Also write items, item_tags and item_stats tables (indexed by typeID, category and tag key) to this SQLite file")
+    ap.add_argument("--jobs", type=int, default=1, help="Worker processes for prefab parsing; 0 = one per CPU (default: 1)")
+    add_cache_arguments(ap)
+    add_profile_arguments(ap)
+    args = ap.parse_args()
+
+    if args.format == "ndjson":
+        with open_ndjson(args.out_ndjson) as out, logs_to_stderr(args.out_ndjson == STDOUT_PATH):
+            run(args, out)
+    else:
+        run(args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Shared, lazily loaded localization tables.
+
+Every `*.csv` under `Assets/StreamingAssets/Localization` is a language. A table is
+only parsed the first time that language is asked for, and the parsed key -> text
+map is cached on disk keyed by the CSV's (mtime, size), so warm runs unpickle it
+instead of running `csv.reader` again.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import pickle
+from typing import Dict, Iterator, List, Mapping, Optional
+
+from export_index import resolve_cache_dir
+
+
+LOCALIZATION_CACHE_DIR = "localization"
+LOCALIZATION_CACHE_VERSION = 1
+
+# short codes used by the extractors -> CSV file stem
+LANGUAGE_ALIASES = {
+    "en": "English",
+    "zh": "ChineseSimplified",
+}
+
+
+def read_localization_csv(path: str) -> Dict[str, str]:
+    """Parse one `key,text,...` localization CSV; later rows win on duplicate keys."""
+    table: Dict[str, str] = {}
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as fh:
+            for row in csv.reader(fh):
+                if not row or len(row) < 2:
+                    continue
+                key = row[0].strip()
+                if key:
+                    table[key] = row[1].strip()
+    except Exception:
+        pass
+    return table
+
+
+class Localization(Mapping[str, Dict[str, str]]):
+    """Language code (`en`, `zh` or any CSV stem such as `Japanese`) -> key -> text.
+
+    Indexing never raises: a language without a CSV maps to an empty table, matching
+    what the extractors have always done for missing files.
+    """
+
+    def __init__(
+        self,
+        export_root: str,
+        cache_dir: Optional[str] = None,
+        rebuild_cache: bool = False,
+    ) -> None:
+        self.export_root = export_root
+        self.loc_dir = os.path.join(export_root, "Assets", "StreamingAssets", "Localization")
+        self.cache_dir = os.path.join(cache_dir, LOCALIZATION_CACHE_DIR) if cache_dir else None
+        self.rebuild_cache = rebuild_cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._tables: Dict[str, Dict[str, str]] = {}
+        self.files: Dict[str, str] = {}
+        try:
+            with os.scandir(self.loc_dir) as it:
+                for entry in it:
+                    stem, ext = os.path.splitext(entry.name)
+                    if ext.lower() == ".csv" and entry.is_file():
+                        self.files[stem] = entry.path
+        except OSError:
+            pass
+        self._by_folded = {stem.casefold(): stem for stem in self.files}
+
+    def languages(self) -> List[str]:
+        """CSV stems found under the localization folder, sorted."""
+        return sorted(self.files)
+
+    def resolve(self, lang: str) -> Optional[str]:
+        """CSV stem for a language code, or None if there is no such table."""
+        stem = LANGUAGE_ALIASES.get(lang, lang)
+        if stem in self.files:
+            return stem
+        return self._by_folded.get(stem.casefold())
+
+    def table(self, lang: str) -> Dict[str, str]:
+        stem = self.resolve(lang)
+        if stem is None:
+            return {}
+        table = self._tables.get(stem)
+        if table is None:
+            table = self._tables[stem] = self._load(stem)
+        return table
+
+    def lookup(self, key: str, lang: str, default: str = "") -> str:
+        return self.table(lang).get(key, default)
+
+    def _load(self, stem: str) -> Dict[str, str]:
+        path = self.files[stem]
+        try:
+            st = os.stat(path)
+        except OSError:
+            return {}
+        stamp = (st.st_mtime_ns, st.st_size)
+        cache_path = os.path.join(self.cache_dir, stem + ".pickle") if self.cache_dir else None
+        if cache_path and not self.rebuild_cache:
+            try:
+                with open(cache_path, "rb") as fh:
+                    payload = pickle.load(fh)
+                if (
+                    isinstance(payload, dict)
+                    and payload.get("version") == LOCALIZATION_CACHE_VERSION
+                    and payload.get("stamp") == stamp
+                ):
+                    self.cache_hits += 1
+                    return payload["table"]
+            except Exception:
+                pass
+        self.cache_misses += 1
+        table = read_localization_csv(path)
+        if cache_path:
+            payload = {"version": LOCALIZATION_CACHE_VERSION, "stamp": stamp, "table": table}
+            tmp_path = cache_path + ".tmp"
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(tmp_path, "wb") as fh:
+                    pickle.dump(payload, fh, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                pass
+        return table
+
+    def __getitem__(self, lang: str) -> Dict[str, str]:
+        return self.table(lang)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.languages())
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def summary(self) -> str:
+        loaded = ", ".join(sorted(self._tables)) or "none"
+        if not self.cache_dir:
+            return f"[localization] loaded {loaded} of {len(self.files)} tables (cache disabled)"
+        return (
+            f"[localization] loaded {loaded} of {len(self.files)} tables: "
+            f"{self.cache_hits} cached, {self.cache_misses} parsed"
+        )
+
+
+_LOCALIZATIONS: Dict[str, Localization] = {}
+
+
+def get_localization(
+    export_root: str,
+    cache_dir: Optional[str] = None,
+    rebuild_cache: bool = False,
+) -> Localization:
+    """Return the process-wide localization service for `export_root`."""
+    key = os.path.abspath(export_root)
+    loc = _LOCALIZATIONS.get(key)
+    if loc is None or rebuild_cache:
+        loc = _LOCALIZATIONS[key] = Localization(export_root, cache_dir, rebuild_cache)
+    return loc
+
+
+def localization_from_args(args: argparse.Namespace) -> Localization:
+    return get_localization(
+        args.export_root,
+        cache_dir=resolve_cache_dir(args),
+        rebuild_cache=args.rebuild_cache,
+    )
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Chunked process-pool mapping shared by the extractors' `--jobs` stages.
+
+Paths are split into a few chunks per worker, so the pool stays busy without one
+IPC round trip per file, and results come back flattened in input order, so what a
+tool writes does not depend on `--jobs`. Chunk functions also report what they read
+as a `ReadStats`, which the parent merges for the `--profile` report.
+"""
+
+from __future__ import annotations
+
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Sequence, Tuple, TypeVar
+
+from profiling import ReadStats
+
+
+# upper bound on paths per chunk; small inputs get smaller chunks
+MAX_CHUNK_SIZE = 256
+# chunks handed to each worker when the input is small enough
+CHUNKS_PER_WORKER = 4
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# (chunk, counting) -> (one result per item, the chunk's ReadStats or None)
+ChunkFunc = Callable[[Sequence[T], bool], Tuple[List[R], Optional[ReadStats]]]
+
+
+def map_chunks(
+    func: ChunkFunc,
+    items: Sequence[T],
+    jobs: int = 1,
+    pool: Optional[ProcessPoolExecutor] = None,
+    reads: Optional[ReadStats] = None,
+) -> List[R]:
+    """`func` over chunks of `items`, flattened in input order.
+
+    Runs in this process when `jobs` <= 1 or there is a single item; otherwise in
+    `pool`, or in a pool of `jobs` workers created for this call. `func` must be
+    picklable (a module-level function or a `functools.partial` of one).
+    """
+    counting = reads is not None
+    if jobs <= 1 or len(items) < 2:
+        results, chunk_reads = func(items, counting)
+        if counting:
+            reads.merge(chunk_reads)
+        return results
+    chunk_size = max(1, min(MAX_CHUNK_SIZE, len(items) // (jobs * CHUNKS_PER_WORKER)))
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    results = []
+    with contextlib.ExitStack() as stack:
+        if pool is None:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=jobs))
+        for chunk_results, chunk_reads in pool.map(func, chunks, [counting] * len(chunks)):
+            results.extend(chunk_results)
+            if counting:
+                reads.merge(chunk_reads)
+    return results
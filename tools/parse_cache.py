@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Persistent parse cache shared by the extractors.
+
+Maps (namespace, relative path) to a parser's pickled result, valid while the file's
+size, stamp (mtime, or a content hash with `--cache-by-hash`) and the parser version
+still match. After a game patch only the changed files are parsed again, and once a
+run has looked up every file of a namespace, `prune` drops the entries of files that
+were deleted or renamed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import pickle
+import sqlite3
+from typing import Any, Dict, Optional, Set, Tuple
+
+from export_index import resolve_cache_dir
+
+
+PARSE_CACHE_FILE = "parse_cache.sqlite3"
+
+_MISS = (False, None)
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ParseCache:
+    """One namespace (e.g. "items") of the on-disk parse cache.
+
+    With `cache_dir=None` nothing is stored and every lookup is a miss, so callers use
+    the same code path whether caching is enabled or not.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str],
+        export_root: str,
+        namespace: str,
+        version: str,
+        rebuild: bool = False,
+        by_hash: bool = False,
+    ) -> None:
+        self.export_root = export_root
+        self.namespace = namespace
+        self.version = version
+        self.rebuild = rebuild
+        self.by_hash = by_hash
+        self.hits = 0
+        self.misses = 0
+        self.pruned = 0
+        # relative paths looked up this run; everything else in the namespace is stale
+        self._seen: Set[str] = set()
+        self._pending: Dict[str, Tuple[int, str]] = {}
+        self.db: Optional[sqlite3.Connection] = None
+        self.db_path: Optional[str] = None
+        if cache_dir:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                self.db_path = os.path.join(cache_dir, PARSE_CACHE_FILE)
+                self.db = sqlite3.connect(self.db_path)
+                self.db.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    " namespace TEXT NOT NULL, path TEXT NOT NULL, size INTEGER NOT NULL,"
+                    " stamp TEXT NOT NULL, version TEXT NOT NULL, payload BLOB NOT NULL,"
+                    " PRIMARY KEY (namespace, path))"
+                )
+            except (OSError, sqlite3.Error):
+                self.db = None
+                self.db_path = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.db is not None
+
+    def _key(self, path: str) -> Optional[Tuple[str, int, str]]:
+        try:
+            st = os.stat(path)
+            stamp = ("h:" + file_digest(path)) if self.by_hash else str(st.st_mtime_ns)
+        except OSError:
+            return None
+        return os.path.relpath(path, self.export_root), st.st_size, stamp
+
+    def get(self, path: str) -> Tuple[bool, Any]:
+        """Return (hit, value); `value` may legitimately be None for a cached "no result"."""
+        if self.db is None:
+            self.misses += 1
+            return _MISS
+        key = self._key(path)
+        if key is None:
+            self.misses += 1
+            return _MISS
+        rel, size, stamp = key
+        self._seen.add(rel)
+        # remember the stamp so put() doesn't stat/hash the file a second time
+        self._pending[path] = (size, stamp)
+        if self.rebuild:
+            self.misses += 1
+            return _MISS
+        row = self.db.execute(
+            "SELECT size, stamp, version, payload FROM entries WHERE namespace = ? AND path = ?",
+            (self.namespace, rel),
+        ).fetchone()
+        if row is None or row[0] != size or row[1] != stamp or row[2] != self.version:
+            self.misses += 1
+            return _MISS
+        try:
+            value = pickle.loads(row[3])
+        except Exception:
+            self.misses += 1
+            return _MISS
+        self.hits += 1
+        return True, value
+
+    def put(self, path: str, value: Any) -> None:
+        if self.db is None:
+            return
+        pending = self._pending.pop(path, None)
+        if pending is None:
+            key = self._key(path)
+            if key is None:
+                return
+            _, size, stamp = key
+        else:
+            size, stamp = pending
+        rel = os.path.relpath(path, self.export_root)
+        self.db.execute(
+            "INSERT OR REPLACE INTO entries (namespace, path, size, stamp, version, payload)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (self.namespace, rel, size, stamp, self.version,
+             pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)),
+        )
+
+    def prune(self) -> int:
+        """Drop this namespace's entries for files not looked up since the cache opened.
+
+        Call it only after a complete pass over the namespace's files; returns how many
+        entries were removed.
+        """
+        if self.db is None:
+            return 0
+        self.db.execute("CREATE TEMP TABLE IF NOT EXISTS seen_paths (path TEXT PRIMARY KEY)")
+        self.db.execute("DELETE FROM seen_paths")
+        self.db.executemany("INSERT OR IGNORE INTO seen_paths (path) VALUES (?)", ((rel,) for rel in self._seen))
+        removed = self.db.execute(
+            "DELETE FROM entries WHERE namespace = ? AND path NOT IN (SELECT path FROM seen_paths)",
+            (self.namespace,),
+        ).rowcount
+        self.db.execute("DELETE FROM seen_paths")
+        self.pruned += removed
+        return removed
+
+    def close(self) -> None:
+        if self.db is not None:
+            try:
+                self.db.commit()
+            finally:
+                self.db.close()
+                self.db = None
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        if self.db_path is None:
+            return f"[parse-cache] {self.namespace}: disabled ({total} files parsed)"
+        rate = (100.0 * self.hits / total) if total else 0.0
+        pruned = f", {self.pruned} stale entries pruned" if self.pruned else ""
+        return (
+            f"[parse-cache] {self.namespace}: {self.hits} hits, {self.misses} misses "
+            f"({rate:.1f}% hit rate){pruned}"
+        )
+
+
+def parse_cache_from_args(args: argparse.Namespace, namespace: str, version: str) -> ParseCache:
+    return ParseCache(
+        resolve_cache_dir(args),
+        args.export_root,
+        namespace,
+        version,
+        rebuild=args.rebuild_cache,
+        by_hash=getattr(args, "cache_by_hash", False),
+    )
+
+
+def disabled_cache(export_root: str, namespace: str) -> ParseCache:
+    return ParseCache(None, export_root, namespace, "")
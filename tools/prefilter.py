@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Byte-level prefilter that rejects files before they are decoded.
+
+Each candidate file is searched for the marker strings its parser cannot do without
+(memory-mapped for large files, a plain read for small ones). Only files containing
+the markers are handed on to the full UTF-8 decode and parse.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+from typing import Iterable, List, Optional, Sequence, Union
+
+from profiling import ReadStats
+
+
+# below this size one read() is cheaper than setting up a mapping
+MMAP_THRESHOLD = 64 * 1024
+
+
+def _as_bytes(marker: Union[str, bytes]) -> bytes:
+    return marker.encode("utf-8") if isinstance(marker, str) else marker
+
+
+def file_contains(
+    path: str,
+    markers: Sequence[bytes],
+    require_all: bool = True,
+    reads: Optional[ReadStats] = None,
+) -> bool:
+    """True if the raw bytes of `path` contain all (or any) of `markers`."""
+    try:
+        with open(path, "rb") as fh:
+            size = os.fstat(fh.fileno()).st_size
+            if reads is not None:
+                reads.add(size)
+            if size == 0:
+                return False
+            if size < MMAP_THRESHOLD:
+                data = fh.read()
+                found = (marker in data for marker in markers)
+                return all(found) if require_all else any(found)
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                found = (buf.find(marker) >= 0 for marker in markers)
+                return all(found) if require_all else any(found)
+    except (OSError, ValueError):
+        return False
+
+
+class Prefilter:
+    """Counts how many files a named stage accepted and rejected on marker bytes."""
+
+    def __init__(
+        self,
+        name: str,
+        markers: Iterable[Union[str, bytes]],
+        require_all: bool = True,
+        reads: Optional[ReadStats] = None,
+    ) -> None:
+        self.name = name
+        self.markers = tuple(_as_bytes(m) for m in markers)
+        self.require_all = require_all
+        self.reads = reads
+        self.accepted = 0
+        self.rejected = 0
+
+    def matches(self, path: str) -> bool:
+        if file_contains(path, self.markers, self.require_all, self.reads):
+            self.accepted += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def filter(self, paths: Iterable[str]) -> List[str]:
+        return [path for path in paths if self.matches(path)]
+
+    def summary(self) -> str:
+        joiner = " + " if self.require_all else " | "
+        wanted = joiner.join(m.decode("utf-8", errors="replace") for m in self.markers)
+        total = self.accepted + self.rejected
+        return (
+            f"[prefilter] {self.name}: {self.rejected} of {total} files rejected, "
+            f"{self.accepted} decoded (markers: {wanted})"
+        )
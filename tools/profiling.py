@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Phase timers and counters for the extractors' `--profile` report.
+
+Each tool wraps its stages (walk, guid_map, parse, enrich, write) in
+`profiler.phase(name)` and records files, bytes, YAML documents and records per
+phase. Input counts come from a `ReadStats` the parsers fill while they read, so
+files answered from the parse cache or rejected early cost (and count) nothing. A
+disabled profiler hands out one shared no-op context, no `ReadStats` and returns
+from every counting call immediately, so an unprofiled run does no extra work.
+cProfile and tracemalloc captures can be switched on per run with
+`--profile-capture`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import cProfile
+import datetime as dt
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from export_index import ExportIndex
+
+
+CAPTURE_KINDS = ("cprofile", "tracemalloc")
+# entries kept per phase in the cProfile and tracemalloc sections of the report
+TOP_ENTRIES = 25
+
+_NULL_PHASE = contextlib.nullcontext()
+
+
+def _reset_tracemalloc_peak() -> None:
+    """Start tracing if needed and make the next peak reading start from now."""
+    if hasattr(tracemalloc, "reset_peak"):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        return
+    # Python 3.8 has no reset_peak; restarting clears the traces and with them the peak
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    tracemalloc.start()
+
+
+class ReadStats:
+    """Files opened, bytes read and Unity YAML documents split by the parsers.
+
+    Parsers take an optional `reads` and call `add` once per file they read (a file
+    both prefiltered and parsed counts twice). Plain attributes keep it picklable,
+    so pool workers fill their own and the parent `merge`s them.
+    """
+
+    __slots__ = ("files", "bytes", "documents")
+
+    def __init__(self) -> None:
+        self.files = 0
+        self.bytes = 0
+        self.documents = 0
+
+    def add(self, size: int, documents: int = 0) -> None:
+        self.files += 1
+        self.bytes += size
+        self.documents += documents
+
+    def merge(self, other: Optional["ReadStats"]) -> None:
+        if other is None:
+            return
+        self.files += other.files
+        self.bytes += other.bytes
+        self.documents += other.documents
+
+    def counts(self) -> Dict[str, int]:
+        return {"files": self.files, "bytes": self.bytes, "documents": self.documents}
+
+
+@dataclass
+class PhaseStats:
+    seconds: float = 0.0
+    calls: int = 0
+    counts: Dict[str, int] = field(default_factory=dict)
+    tracemalloc: Optional[Dict[str, object]] = None
+
+
+class Profiler:
+    """Collects per-phase wall time and counts for one tool run."""
+
+    def __init__(self, tool: str, enabled: bool = False, capture: Iterable[str] = ()) -> None:
+        self.tool = tool
+        self.enabled = enabled
+        self.capture = frozenset(capture) if enabled else frozenset()
+        self.phases: Dict[str, PhaseStats] = {}
+        self._cprofiles: Dict[str, cProfile.Profile] = {}
+        self._started = time.perf_counter()
+
+    def _stats(self, name: str) -> PhaseStats:
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats()
+        return stats
+
+    def phase(self, name: str):
+        """Context manager timing one phase; re-entering a phase adds to its totals."""
+        if not self.enabled:
+            return _NULL_PHASE
+        return self._timed(name)
+
+    @contextlib.contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        stats = self._stats(name)
+        profile = None
+        if "cprofile" in self.capture:
+            profile = self._cprofiles.get(name)
+            if profile is None:
+                profile = self._cprofiles[name] = cProfile.Profile()
+        snapshot = None
+        if "tracemalloc" in self.capture:
+            _reset_tracemalloc_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            snapshot = tracemalloc.take_snapshot()
+        if profile is not None:
+            profile.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats.seconds += time.perf_counter() - start
+            stats.calls += 1
+            if profile is not None:
+                profile.disable()
+            if snapshot is not None:
+                current, peak = tracemalloc.get_traced_memory()
+                top = tracemalloc.take_snapshot().compare_to(snapshot, "lineno")[:TOP_ENTRIES]
+                stats.tracemalloc = {
+                    "peakBytes": max(peak - baseline, (stats.tracemalloc or {}).get("peakBytes", 0)),
+                    "netBytes": current - baseline,
+                    "top": [
+                        {"location": str(diff.traceback[0]), "sizeDiff": diff.size_diff, "countDiff": diff.count_diff}
+                        for diff in top
+                    ],
+                }
+
+    def record(self, name: str, seconds: float, **counts: int) -> None:
+        """Add a phase that was timed elsewhere (e.g. inside ExportIndex)."""
+        if not self.enabled:
+            return
+        stats = self._stats(name)
+        stats.seconds += seconds
+        stats.calls += 1
+        self.count(name, **counts)
+
+    def count(self, name: str, **counts: int) -> None:
+        if not self.enabled:
+            return
+        totals = self._stats(name).counts
+        for key, value in counts.items():
+            totals[key] = totals.get(key, 0) + value
+
+    def read_stats(self) -> Optional[ReadStats]:
+        """A fresh `ReadStats` for the parsers to fill, or None (count nothing) when disabled."""
+        return ReadStats() if self.enabled else None
+
+    def count_reads(self, name: str, reads: Optional[ReadStats]) -> None:
+        if not self.enabled or reads is None:
+            return
+        self.count(name, **reads.counts())
+
+    def count_files(self, name: str, paths: Iterable[str]) -> None:
+        """Count files and bytes that a phase wrote (sizes from `stat`; nothing is read)."""
+        if not self.enabled:
+            return
+        files = size = 0
+        for path in paths:
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                continue
+            files += 1
+        self.count(name, files=files, bytes=size)
+
+    def _cprofile_report(self, name: str) -> List[Dict[str, object]]:
+        stats = pstats.Stats(self._cprofiles[name])
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:TOP_ENTRIES]
+        return [
+            {
+                "function": f"{filename}:{line}({func})",
+                "calls": nc,
+                "totalSeconds": round(tt, 6),
+                "cumulativeSeconds": round(ct, 6),
+            }
+            for (filename, line, func), (cc, nc, tt, ct, callers) in rows
+        ]
+
+    def report(self) -> Dict[str, object]:
+        phases = []
+        for name, stats in self.phases.items():
+            entry: Dict[str, object] = {
+                "name": name,
+                "seconds": round(stats.seconds, 6),
+                "calls": stats.calls,
+                "counts": stats.counts,
+            }
+            if name in self._cprofiles:
+                entry["cprofile"] = self._cprofile_report(name)
+            if stats.tracemalloc is not None:
+                entry["tracemalloc"] = stats.tracemalloc
+            phases.append(entry)
+        return {
+            "tool": self.tool,
+            "generatedAt": dt.datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "argv": sys.argv[1:],
+            "capture": sorted(self.capture),
+            "totalSeconds": round(time.perf_counter() - self._started, 6),
+            "phases": phases,
+        }
+
+    def write(self, path: Optional[str]) -> None:
+        if not self.enabled or not path:
+            return
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.report(), fh, indent=2)
+        print(f"[profile] wrote {path}")
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        default=None,
+        metavar="OUT.json",
+        help="Write per-phase timings and file/byte/document/record counts to this JSON file.",
+    )
+    parser.add_argument(
+        "--profile-capture",
+        action="append",
+        choices=CAPTURE_KINDS,
+        default=[],
+        help="With --profile, also capture cProfile hot spots or tracemalloc allocations per phase (repeatable).",
+    )
+
+
+def profiler_from_args(args: argparse.Namespace, tool: str) -> Profiler:
+    return Profiler(tool, enabled=bool(args.profile), capture=args.profile_capture)
+
+
+def record_index_phases(profiler: Profiler, index: ExportIndex) -> None:
+    """Report an ExportIndex's directory walk and GUID-map build as phases."""
+    if not profiler.enabled:
+        return
+    profiler.record("walk", index.timings.get("walk", 0.0), files=index.file_count)
+    metas = index.cache_hits + index.cache_misses
+    profiler.record(
+        "guid_map",
+        index.timings.get("guid_map", 0.0),
+        files=metas,
+        cacheHits=index.cache_hits,
+        records=len(index.guid_map),
+    )
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Scanner for serialized fishing `specialPairs` lists.
+
+Each file is checked for the `specialPairs:` marker on its raw bytes (memory-mapped
+for large files) and never decoded as a whole. From every marker a line-by-line
+state machine reads the `- baitID / fishID / chance` triples that follow, so the
+cost is linear in the list length instead of a backtracking multiline regex over
+the file. Files can be spread over a process pool; results come back in input
+order so the aggregated counts are the same whatever `jobs` is.
+
+The triples found are exactly those the previous multiline regex matched on the
+text-mode (universal newline) read: a trailing `\\r` is dropped from every line so
+CRLF files read like LF ones, blank lines may sit between lines, a list ends at the
+first line that is not the expected field, an incomplete trailing entry is dropped,
+and anything after a chance value on its line (including trailing spaces) ends the
+list after that entry. A chance that is not a number (`1.2.3`) ends the list before
+its entry.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import re
+from typing import List, Optional, Sequence, Tuple, Union
+
+from parallel import map_chunks
+from prefilter import MMAP_THRESHOLD
+from profiling import ReadStats
+
+
+SPECIAL_PAIRS_MARKER = b"specialPairs:"
+
+Buffer = Union[bytes, mmap.mmap]
+SpecialPair = Tuple[int, int, float]
+
+_BAIT_LINE_RE = re.compile(rb"\s*-\s*baitID:\s*(\d+)\s*$")
+_FISH_LINE_RE = re.compile(rb"\s*fishID:\s*(\d+)\s*$")
+_CHANCE_LINE_RE = re.compile(rb"\s*chance:\s*([0-9.]+)")
+
+# state machine: which field the next non-blank line has to be
+_EXPECT_BAIT, _EXPECT_FISH, _EXPECT_CHANCE = range(3)
+
+
+def _read_block(buf: Buffer, start: int, entries: List[SpecialPair]) -> int:
+    """Append the triples of the list whose marker ends at `start`; return where to resume."""
+    size = len(buf)
+    line_end = buf.find(b"\n", start)
+    if line_end < 0 or buf[start:line_end].strip():
+        # `specialPairs: []` or similar: not a block list
+        return start
+    pos = line_end + 1
+    state = _EXPECT_BAIT
+    bait = fish = 0
+    while pos < size:
+        line_end = buf.find(b"\n", pos)
+        if line_end < 0:
+            line_end = size
+        line = buf[pos:line_end]
+        if line.endswith(b"\r"):
+            # CRLF: the text-mode read saw a plain newline here
+            line = line[:-1]
+        if not line.strip():
+            pos = line_end + 1
+            continue
+        if state == _EXPECT_BAIT:
+            m = _BAIT_LINE_RE.match(line)
+            if not m:
+                return pos
+            bait = int(m.group(1))
+            state = _EXPECT_FISH
+        elif state == _EXPECT_FISH:
+            m = _FISH_LINE_RE.match(line)
+            if not m:
+                return pos
+            fish = int(m.group(1))
+            state = _EXPECT_CHANCE
+        else:
+            m = _CHANCE_LINE_RE.match(line)
+            if not m:
+                return pos
+            try:
+                chance = float(m.group(1))
+            except ValueError:
+                return pos
+            entries.append((bait, fish, chance))
+            if m.end() != len(line):
+                # the list only continues if the value is followed by the newline
+                return pos + m.end()
+            state = _EXPECT_BAIT
+        pos = line_end + 1
+    return size
+
+
+def scan_special_pairs(buf: Buffer) -> List[SpecialPair]:
+    """Every (baitID, fishID, chance) entry of the buffer's specialPairs lists, repeats included."""
+    entries: List[SpecialPair] = []
+    pos = buf.find(SPECIAL_PAIRS_MARKER)
+    while pos >= 0:
+        resume = _read_block(buf, pos + len(SPECIAL_PAIRS_MARKER), entries)
+        pos = buf.find(SPECIAL_PAIRS_MARKER, resume)
+    return entries
+
+
+def read_special_pairs(
+    path: str, reads: Optional[ReadStats] = None
+) -> Optional[Tuple[bool, List[SpecialPair]]]:
+    """(marker found, entries) for one file, or None if it cannot be read."""
+    try:
+        with open(path, "rb") as fh:
+            size = os.fstat(fh.fileno()).st_size
+            if reads is not None:
+                reads.add(size)
+            if size == 0:
+                return False, []
+            if size < MMAP_THRESHOLD:
+                data = fh.read()
+                if SPECIAL_PAIRS_MARKER not in data:
+                    return False, []
+                return True, scan_special_pairs(data)
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                if buf.find(SPECIAL_PAIRS_MARKER) < 0:
+                    return False, []
+                return True, scan_special_pairs(buf)
+    except OSError:
+        return None
+
+
+def _read_chunk(
+    paths: Sequence[str], counting: bool
+) -> Tuple[List[Optional[Tuple[bool, List[SpecialPair]]]], Optional[ReadStats]]:
+    reads = ReadStats() if counting else None
+    return [read_special_pairs(path, reads) for path in paths], reads
+
+
+def read_special_pairs_many(
+    paths: Sequence[str],
+    jobs: int = 1,
+    reads: Optional[ReadStats] = None,
+) -> List[Optional[Tuple[bool, List[SpecialPair]]]]:
+    """`read_special_pairs` for each path, in input order, over `jobs` worker processes."""
+    return map_chunks(_read_chunk, paths, jobs, reads=reads)
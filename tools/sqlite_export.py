@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+`--out_sqlite` target shared by the item, character and fish extractors.
+
+Each tool writes its records into normalized tables of one SQLite file (items plus
+item_tags and item_stats, characters, fish_pairs), so lookups like "typeID -> name"
+or "all items with tag X" are index queries instead of a scan of the JSON output.
+A tool only replaces its own tables; several tools can share one database file.
+Rows are buffered and inserted with `executemany`, indexes are created after the
+bulk load, and the whole rewrite is a single transaction.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from tag_registry import TagRegistry
+
+
+# rows buffered per table before an executemany
+INSERT_BATCH_SIZE = 5000
+
+ITEM_COLUMNS: Sequence[Tuple[str, str]] = (
+    ("typeID", "INTEGER PRIMARY KEY"),
+    ("prefab", "TEXT"),
+    ("prefabName", "TEXT"),
+    ("displayNameKey", "TEXT"),
+    ("category", "TEXT"),
+    ("nameEN", "TEXT"),
+    ("nameZH", "TEXT"),
+    ("descEN", "TEXT"),
+    ("descZH", "TEXT"),
+    ("maxStackCount", "INTEGER"),
+    ("stackable", "INTEGER"),
+    ("value", "INTEGER"),
+    ("quality", "INTEGER"),
+    ("displayQuality", "INTEGER"),
+    ("weight", "REAL"),
+    ("order", "INTEGER"),
+    ("soundKey", "TEXT"),
+    ("iconGUID", "TEXT"),
+    ("iconPath", "TEXT"),
+    ("variablesCount", "INTEGER"),
+    ("constantsCount", "INTEGER"),
+    ("agentsCount", "INTEGER"),
+    ("effectsCount", "INTEGER"),
+    ("inventory", "INTEGER"),
+    ("usageUtilities", "INTEGER"),
+    ("slots", "INTEGER"),
+    ("itemGraphic", "INTEGER"),
+)
+
+ITEM_TAG_COLUMNS: Sequence[Tuple[str, str]] = (
+    ("typeID", "INTEGER NOT NULL"),
+    ("position", "INTEGER NOT NULL"),
+    ("tagGUID", "TEXT"),
+    ("tagKey", "TEXT"),
+    ("nameEN", "TEXT"),
+    ("nameZH", "TEXT"),
+)
+
+ITEM_STAT_COLUMNS: Sequence[Tuple[str, str]] = (
+    ("typeID", "INTEGER NOT NULL"),
+    ("key", "TEXT NOT NULL"),
+    ("value", "REAL"),
+)
+
+CHARACTER_COLUMNS: Sequence[Tuple[str, str]] = (
+    ("asset_path", "TEXT PRIMARY KEY"),
+    ("asset_name", "TEXT"),
+    ("preset_type", "TEXT"),
+    ("preset_group", "TEXT"),
+    ("preset_name", "TEXT"),
+    ("name_key", "TEXT"),
+    ("name_en", "TEXT"),
+    ("name_zh", "TEXT"),
+    ("team", "INTEGER"),
+    ("characterIconType", "INTEGER"),
+    ("is_bossish", "INTEGER"),
+    ("health", "NUMERIC"),
+    ("hasSoul", "INTEGER"),
+    ("showHealthBar", "INTEGER"),
+    ("showName", "INTEGER"),
+    ("exp", "NUMERIC"),
+    ("moveSpeedFactor", "REAL"),
+    ("hasSkill", "INTEGER"),
+    ("hasCashChance", "REAL"),
+    ("itemSkillChance", "REAL"),
+    ("damageMultiplier", "REAL"),
+    ("characterModelGuid", "TEXT"),
+    ("characterModelPath", "TEXT"),
+    ("lootBoxPrefabGuid", "TEXT"),
+    ("lootBoxPrefabPath", "TEXT"),
+    ("facePresetGuid", "TEXT"),
+    ("facePresetPath", "TEXT"),
+    ("aiControllerGuid", "TEXT"),
+    ("aiControllerPath", "TEXT"),
+    ("skillPfbGuid", "TEXT"),
+    ("skillPfbPath", "TEXT"),
+)
+
+FISH_PAIR_COLUMNS: Sequence[Tuple[str, str]] = (
+    ("fishID", "INTEGER NOT NULL"),
+    ("fishPrefab", "TEXT"),
+    ("fishKey", "TEXT"),
+    ("fishEN", "TEXT"),
+    ("fishZH", "TEXT"),
+    ("SunnyOnly", "INTEGER"),
+    ("DayOnly", "INTEGER"),
+    ("NightOnly", "INTEGER"),
+    ("RainOnly", "INTEGER"),
+    ("StormOnly", "INTEGER"),
+    ("baitID", "INTEGER"),
+    ("baitPrefab", "TEXT"),
+    ("baitKey", "TEXT"),
+    ("baitEN", "TEXT"),
+    ("baitZH", "TEXT"),
+    ("chance", "REAL"),
+    ("occurrences", "INTEGER"),
+    ("sceneID", "TEXT"),
+    ("sceneEN", "TEXT"),
+    ("sceneZH", "TEXT"),
+    ("sourceAsset", "TEXT"),
+)
+
+TABLE_COLUMNS: Dict[str, Sequence[Tuple[str, str]]] = {
+    "items": ITEM_COLUMNS,
+    "item_tags": ITEM_TAG_COLUMNS,
+    "item_stats": ITEM_STAT_COLUMNS,
+    "characters": CHARACTER_COLUMNS,
+    "fish_pairs": FISH_PAIR_COLUMNS,
+}
+
+# (index name, column) per table; created after the bulk insert
+TABLE_INDEXES: Dict[str, Sequence[Tuple[str, str]]] = {
+    "items": (
+        ("idx_items_category", "category"),
+        ("idx_items_display_name_key", "displayNameKey"),
+        ("idx_items_prefab_name", "prefabName"),
+    ),
+    "item_tags": (
+        ("idx_item_tags_tag_key", "tagKey"),
+        ("idx_item_tags_type_id", "typeID"),
+    ),
+    "item_stats": (
+        ("idx_item_stats_type_id", "typeID"),
+        ("idx_item_stats_key", "key"),
+    ),
+    "characters": (
+        ("idx_characters_preset_group", "preset_group"),
+        ("idx_characters_preset_type", "preset_type"),
+        ("idx_characters_name_key", "name_key"),
+    ),
+    "fish_pairs": (
+        ("idx_fish_pairs_fish_id", "fishID"),
+        ("idx_fish_pairs_bait_id", "baitID"),
+        ("idx_fish_pairs_scene_id", "sceneID"),
+    ),
+}
+
+ITEM_TABLES = ("items", "item_tags", "item_stats")
+CHARACTER_TABLES = ("characters",)
+FISH_TABLES = ("fish_pairs",)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_value(value: object) -> object:
+    """'' (the extractors' "missing") becomes NULL; lists/dicts are not stored inline."""
+    if value == "" or isinstance(value, (list, dict)):
+        return None
+    return value
+
+
+class CatalogWriter:
+    """Replace some tables of an SQLite catalog in one transaction.
+
+    Use as a context manager: the tables are dropped and recreated on entry, rows
+    added with the `add_*` methods are inserted in `executemany` batches, and the
+    indexes plus the commit happen on a clean exit (an exception rolls back).
+    `item_tags` rows get their key and names from `tags`; a GUID it cannot resolve
+    (or any GUID, without a registry) keeps NULLs there.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        tables: Sequence[str],
+        batch_size: int = INSERT_BATCH_SIZE,
+        tags: Optional[TagRegistry] = None,
+    ) -> None:
+        self.path = path
+        self.tables = tuple(tables)
+        self.tags = tags
+        self.batch_size = batch_size
+        self.counts: Dict[str, int] = {table: 0 for table in self.tables}
+        self._pending: Dict[str, List[Tuple]] = {table: [] for table in self.tables}
+        self._insert_sql = {
+            table: "INSERT INTO {} ({}) VALUES ({})".format(
+                _quote(table),
+                ", ".join(_quote(name) for name, _ in TABLE_COLUMNS[table]),
+                ", ".join("?" for _ in TABLE_COLUMNS[table]),
+            )
+            for table in self.tables
+        }
+        self.db: Optional[sqlite3.Connection] = None
+
+    def __enter__(self) -> "CatalogWriter":
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # autocommit mode, so BEGIN/COMMIT below bracket the DDL as well as the inserts
+        self.db = sqlite3.connect(self.path, isolation_level=None)
+        self.db.execute("BEGIN")
+        for table in self.tables:
+            columns = ", ".join(f"{_quote(name)} {kind}" for name, kind in TABLE_COLUMNS[table])
+            self.db.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+            self.db.execute(f"CREATE TABLE {_quote(table)} ({columns})")
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        assert self.db is not None
+        try:
+            if exc_type is None:
+                self.flush()
+                for table in self.tables:
+                    for index_name, column in TABLE_INDEXES.get(table, ()):
+                        self.db.execute(f"CREATE INDEX {_quote(index_name)} ON {_quote(table)} ({_quote(column)})")
+                self.db.execute("COMMIT")
+            else:
+                self.db.execute("ROLLBACK")
+        finally:
+            self.db.close()
+            self.db = None
+
+    def _add(self, table: str, row: Tuple) -> None:
+        pending = self._pending[table]
+        pending.append(row)
+        if len(pending) >= self.batch_size:
+            self._flush_table(table)
+
+    def _flush_table(self, table: str) -> None:
+        pending = self._pending[table]
+        if not pending:
+            return
+        assert self.db is not None
+        self.db.executemany(self._insert_sql[table], pending)
+        self.counts[table] += len(pending)
+        self._pending[table] = []
+
+    def flush(self) -> None:
+        for table in self.tables:
+            self._flush_table(table)
+
+    def add_item(self, item: Dict) -> None:
+        type_id = item.get("typeID")
+        self._add("items", tuple(_sql_value(item.get(name, "")) for name, _ in ITEM_COLUMNS))
+        # tagKeys/tagsEN/tagsZH skip unresolved GUIDs, so each GUID is looked up on its own
+        tags = self.tags
+        for position, guid in enumerate(item.get("tags") or []):
+            tag_id = tags.lookup(guid) if tags is not None else None
+            if tag_id is None:
+                described = (None, None, None)
+            else:
+                described = (
+                    tags.keys[tag_id],
+                    _sql_value(tags.names["en"][tag_id]),
+                    _sql_value(tags.names["zh"][tag_id]),
+                )
+            self._add("item_tags", (type_id, position, guid, *described))
+        for key, value in (item.get("stats") or {}).items():
+            self._add("item_stats", (type_id, key, value))
+
+    def add_character(self, entry: Dict) -> None:
+        self._add("characters", tuple(_sql_value(entry.get(name, "")) for name, _ in CHARACTER_COLUMNS))
+
+    def add_fish_pair(self, record: Dict) -> None:
+        self._add("fish_pairs", tuple(_sql_value(record.get(name, "")) for name, _ in FISH_PAIR_COLUMNS))
+
+    def add_items(self, items: Iterable[Dict]) -> None:
+        for item in items:
+            self.add_item(item)
+
+    def add_characters(self, entries: Iterable[Dict]) -> None:
+        for entry in entries:
+            self.add_character(entry)
+
+    def add_fish_pairs(self, records: Iterable[Dict]) -> None:
+        for record in records:
+            self.add_fish_pair(record)
+
+    def summary(self) -> str:
+        counts = ", ".join(f"{self.counts[table]} {table}" for table in self.tables)
+        return f"[sqlite] wrote {counts} to {self.path}"
+
+
+def catalog_writer(path: Optional[str], tables: Sequence[str], tags: Optional[TagRegistry] = None):
+    """A `CatalogWriter` for `--out_sqlite PATH`, or a context yielding None without one."""
+    if not path:
+        return contextlib.nullcontext(None)
+    return CatalogWriter(path, tables, tags=tags)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Helpers for the extractors' `--format ndjson` streaming mode.
+
+Records are written one JSON object per line as they are produced. Where a tool's
+output has to be sorted (and deduplicated), `external_sort` keeps at most
+`run_size` records in memory: full runs are sorted and spilled to temporary files,
+then merged back with `heapq.merge`.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import heapq
+import itertools
+import json
+import os
+import pickle
+import sys
+import tempfile
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# records held in memory before a sorted run is spilled to disk
+DEFAULT_RUN_SIZE = 20000
+
+STDOUT_PATH = "-"
+
+
+def _spill(run: List[Tuple[Any, int, Dict]], tmp_dir: Optional[str]) -> IO[bytes]:
+    run.sort(key=lambda entry: (entry[0], entry[1]))
+    fh = tempfile.TemporaryFile(dir=tmp_dir)
+    for entry in run:
+        pickle.dump(entry, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    fh.seek(0)
+    return fh
+
+
+def _read_run(fh: IO[bytes]) -> Iterator[Tuple[Any, int, Dict]]:
+    while True:
+        try:
+            yield pickle.load(fh)
+        except EOFError:
+            return
+
+
+def external_sort(
+    records: Iterable[Dict],
+    key: Callable[[Dict], Any],
+    run_size: int = DEFAULT_RUN_SIZE,
+    tmp_dir: Optional[str] = None,
+) -> Iterator[Dict]:
+    """Yield `records` sorted by `key`, stable, holding at most `run_size` in memory.
+
+    Ties keep production order, so a following `unique_sorted` keeps the first record
+    of each key exactly like an in-memory "keep first, then sort" would.
+    """
+    seq = itertools.count()
+    runs: List[IO[bytes]] = []
+    run: List[Tuple[Any, int, Dict]] = []
+    try:
+        for record in records:
+            run.append((key(record), next(seq), record))
+            if len(run) >= run_size:
+                runs.append(_spill(run, tmp_dir))
+                run = []
+        if not runs:
+            # everything fit in one run; no temporary files needed
+            run.sort(key=lambda entry: (entry[0], entry[1]))
+            for entry in run:
+                yield entry[2]
+            return
+        if run:
+            runs.append(_spill(run, tmp_dir))
+            run = []
+        merged = heapq.merge(*(_read_run(fh) for fh in runs), key=lambda entry: (entry[0], entry[1]))
+        for entry in merged:
+            yield entry[2]
+    finally:
+        for fh in runs:
+            fh.close()
+
+
+def unique_sorted(records: Iterable[Dict], key: Callable[[Dict], Any]) -> Iterator[Dict]:
+    """Drop records whose key equals the previous record's (input sorted by that key)."""
+    missing = object()
+    previous: Any = missing
+    for record in records:
+        current = key(record)
+        if current == previous:
+            continue
+        previous = current
+        yield record
+
+
+def write_ndjson_line(fh: IO[str], record: Dict) -> None:
+    fh.write(json.dumps(record, ensure_ascii=False))
+    fh.write("\n")
+
+
+@contextlib.contextmanager
+def open_ndjson(path: str) -> Iterator[IO[str]]:
+    """Open an NDJSON output; `-` writes to stdout (which is left open)."""
+    if path == STDOUT_PATH:
+        yield sys.stdout
+        sys.stdout.flush()
+        return
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        yield fh
+
+
+def logs_to_stderr(active: bool):
+    """While records stream to stdout, send the tools' progress prints to stderr."""
+    if active:
+        return contextlib.redirect_stdout(sys.stderr)
+    return contextlib.nullcontext()
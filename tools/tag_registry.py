@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Resolved item tags shared by the item and fish extractors.
+
+A tag is referenced by the GUID of its asset; its key is `Tag_<asset file name>` and
+its display names come from the localization tables. `TagRegistry` resolves every
+asset under a `Tag/` folder once up front (any other GUID the first time it is
+seen, unless the caller asks for known tags only) and hands out compact integer
+ids, so per-item work is one dict lookup per tag, and "does this item have tag X"
+checks are bitmask tests.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+
+TAG_KEY_PREFIX = "Tag_"
+TAG_ASSET_DIR = "Tag"
+DEFAULT_LANGUAGES = ("en", "zh")
+
+_UNSEEN = object()
+
+
+class TagRegistry:
+    """GUID -> tag id, with per-id key, asset base name and localized names.
+
+    `keys[i]`, `bases[i]`, `guids[i]` and `names[lang][i]` describe tag id `i`; a
+    GUID whose asset cannot be resolved has no id. Names fall back to the base name
+    when a language has no entry, as the extractors always did.
+    """
+
+    def __init__(
+        self,
+        guid_map: Mapping[str, str],
+        localization: Mapping[str, Mapping[str, str]],
+        languages: Sequence[str] = DEFAULT_LANGUAGES,
+    ) -> None:
+        self._guid_map = guid_map
+        self._localization = localization
+        self.languages = tuple(languages)
+        self._tables = {lang: localization.get(lang, {}) for lang in self.languages}
+        self._ids: Dict[str, Optional[int]] = {}
+        self.guids: List[str] = []
+        self.bases: List[str] = []
+        self.keys: List[str] = []
+        self.names: Dict[str, List[str]] = {lang: [] for lang in self.languages}
+        self._base_masks: Dict[str, int] = {}
+        for guid, path in guid_map.items():
+            if os.path.basename(os.path.dirname(path)) == TAG_ASSET_DIR:
+                self._register(guid, path)
+        self.preloaded = len(self.guids)
+
+    def _register(self, guid: str, path: str) -> Optional[int]:
+        base = os.path.splitext(os.path.basename(path))[0] if path else ""
+        if not base:
+            self._ids[guid] = None
+            return None
+        tag_id = len(self.guids)
+        key = TAG_KEY_PREFIX + base
+        self._ids[guid] = tag_id
+        self.guids.append(guid)
+        self.bases.append(base)
+        self.keys.append(key)
+        for lang, table in self._tables.items():
+            self.names[lang].append(table.get(key, base))
+        self._base_masks[base] = self._base_masks.get(base, 0) | (1 << tag_id)
+        return tag_id
+
+    def lookup(self, guid: str, register: bool = True) -> Optional[int]:
+        """Tag id for a GUID, or None if the GUID does not resolve to an asset.
+
+        With `register=False` only tags already known (every `Tag/` asset and any GUID
+        registered earlier) have ids; other GUIDs are not added.
+        """
+        tag_id = self._ids.get(guid, _UNSEEN)
+        if tag_id is _UNSEEN:
+            if not register:
+                return None
+            tag_id = self._register(guid, self._guid_map.get(guid, ""))
+        return tag_id
+
+    def ids(self, guids: Iterable[str], register: bool = True) -> List[int]:
+        """Ids of the resolvable GUIDs, in order (repeats kept)."""
+        out = []
+        for guid in guids:
+            tag_id = self.lookup(guid, register)
+            if tag_id is not None:
+                out.append(tag_id)
+        return out
+
+    def mask(self, guids: Iterable[str], register: bool = True) -> int:
+        bits = 0
+        for tag_id in self.ids(guids, register):
+            bits |= 1 << tag_id
+        return bits
+
+    def base_mask(self, base: str) -> int:
+        """Bits of every tag seen so far whose asset is named `base` (e.g. `Fish_OnlyDay`)."""
+        return self._base_masks.get(base, 0)
+
+    def describe(self, ids: Iterable[int]) -> Tuple[List[str], Dict[str, List[str]]]:
+        """(tag keys, {lang: localized names}) for a list of ids."""
+        ids = list(ids)
+        keys = self.keys
+        return [keys[i] for i in ids], {lang: [names[i] for i in ids] for lang, names in self.names.items()}
+
+    def __len__(self) -> int:
+        return len(self.guids)
+
+    def summary(self) -> str:
+        return f"[tags] {len(self.guids)} tags resolved ({self.preloaded} from {TAG_ASSET_DIR}/ folders up front)"
+
+
+_LAST_REGISTRY: Optional[TagRegistry] = None
+
+
+def get_tag_registry(
+    guid_map: Mapping[str, str],
+    localization: Mapping[str, Mapping[str, str]],
+) -> TagRegistry:
+    """The registry for this (guid map, localization) pair, shared by repeated calls.
+
+    Only the most recent registry is kept, so a process that builds many guid maps
+    (the benchmarks) does not hold on to all of them.
+    """
+    global _LAST_REGISTRY
+    registry = _LAST_REGISTRY
+    if registry is None or registry._guid_map is not guid_map or registry._localization is not localization:
+        registry = _LAST_REGISTRY = TagRegistry(guid_map, localization)
+    return registry
@@ -0,0 +1,544 @@
+#!/usr/bin/env python3
+"""
+Zoom-level tile pyramids for large PNG textures.
+
+`build_pyramid` decodes a PNG, cuts it into `tile_size` square tiles, halves it
+with a 2x2 box filter and repeats until the whole image fits in one tile. Level 0
+is full resolution; level z is scaled by 1/2**z. Tiles are written to
+`<directory>/<z>/<column>_<row>.png` next to a `manifest.json` describing the
+levels and the source's content hash; a pyramid whose manifest already matches
+the source and tile size is left untouched. `build_pyramids` builds several
+pyramids over a process pool.
+
+PNGs are decoded and encoded with Pillow when it is installed and otherwise with
+a small zlib/struct codec (non-interlaced greyscale, RGB, palette and alpha images
+of any bit depth; 16-bit samples keep their high byte).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    from PIL import Image
+except ImportError:  # the stdlib codec below covers the PNGs Unity exports
+    Image = None
+
+
+DEFAULT_TILE_SIZE = 256
+MANIFEST_FILE = "manifest.json"
+# bump whenever tile contents or layout change, so existing pyramids are rebuilt
+PYRAMID_VERSION = 1
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# bytes of the blake2b hash of the source PNG kept in the manifest
+SOURCE_HASH_BYTES = 16
+
+# PNG color type -> samples per pixel
+_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+# samples per pixel -> color type of the 8-bit PNGs written here
+_COLOR_TYPES = {1: 0, 2: 4, 3: 2, 4: 6}
+_PILLOW_MODES = ("L", "LA", "RGB", "RGBA")
+
+
+class PNGError(ValueError):
+    """A PNG the stdlib codec cannot read."""
+
+
+# --- byte lanes: a row as one big integer, eight bits per sample ---
+
+@lru_cache(maxsize=64)
+def _lanes(length: int, value: int) -> int:
+    return int.from_bytes(bytes((value,)) * length, "big")
+
+
+def _add_rows(a: bytes, b: bytes) -> bytes:
+    """Bytewise (a + b) mod 256."""
+    n = len(a)
+    high, low = _lanes(n, 0x80), _lanes(n, 0x7F)
+    x = int.from_bytes(a, "big")
+    y = int.from_bytes(b, "big")
+    return (((x & low) + (y & low)) ^ ((x ^ y) & high)).to_bytes(n, "big")
+
+
+def _subtract_rows(a: bytes, b: bytes) -> bytes:
+    """Bytewise (a - b) mod 256."""
+    n = len(a)
+    high, low = _lanes(n, 0x80), _lanes(n, 0x7F)
+    x = int.from_bytes(a, "big")
+    y = int.from_bytes(b, "big")
+    return (((x | high) - (y & low)) ^ ((x ^ y ^ high) & high)).to_bytes(n, "big")
+
+
+def _average_rows(a: bytes, b: bytes, round_up: bool) -> bytes:
+    """Bytewise (a + b) / 2, rounded down or up."""
+    n = len(a)
+    x = int.from_bytes(a, "big")
+    y = int.from_bytes(b, "big")
+    half = ((x ^ y) & _lanes(n, 0xFE)) >> 1
+    if round_up:
+        return ((x | y) - half).to_bytes(n, "big")
+    return ((x & y) + half).to_bytes(n, "big")
+
+
+# --- stdlib codec ---
+
+class Raster:
+    """8-bit image rows of `width * channels` bytes each."""
+
+    __slots__ = ("width", "height", "channels", "rows")
+
+    def __init__(self, width: int, height: int, channels: int, rows: List[bytes]) -> None:
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.rows = rows
+
+    def crop(self, x: int, y: int, width: int, height: int) -> "Raster":
+        c = self.channels
+        return Raster(width, height, c, [row[x * c:(x + width) * c] for row in self.rows[y:y + height]])
+
+    def half(self) -> "Raster":
+        """The image at half size (rounded up), each pixel the mean of a 2x2 block."""
+        c = self.channels
+        width = (self.width + 1) // 2
+        rows: List[bytes] = []
+        for y in range(0, self.height, 2):
+            top = self.rows[y]
+            bottom = self.rows[y + 1] if y + 1 < self.height else top
+            if self.width % 2:
+                # repeat the last column so every output pixel has a full block
+                top += top[-c:]
+                bottom += bottom[-c:]
+            # rounding down here and up below keeps the result unbiased overall
+            mixed = _average_rows(top, bottom, round_up=False)
+            if c == 1:
+                rows.append(_average_rows(mixed[0::2], mixed[1::2], round_up=True))
+                continue
+            row = bytearray(width * c)
+            step = 2 * c
+            for k in range(c):
+                row[k::c] = _average_rows(mixed[k::step], mixed[c + k::step], round_up=True)
+            rows.append(bytes(row))
+        return Raster(width, len(rows), c, rows)
+
+    def png(self) -> bytes:
+        return encode_png(self)
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+def encode_png(raster: Raster) -> bytes:
+    """An 8-bit PNG of the raster, every row stored with the Up filter."""
+    header = struct.pack(">IIBBBBB", raster.width, raster.height, 8, _COLOR_TYPES[raster.channels], 0, 0, 0)
+    previous = bytes(raster.width * raster.channels)
+    parts = []
+    for row in raster.rows:
+        parts.append(b"\x02")
+        parts.append(_subtract_rows(row, previous))
+        previous = row
+    return (
+        PNG_SIGNATURE
+        + _chunk(b"IHDR", header)
+        + _chunk(b"IDAT", zlib.compress(b"".join(parts), 6))
+        + _chunk(b"IEND", b"")
+    )
+
+
+# Sub, Average and Paeth depend on the byte one pixel to the left, so each channel
+# is decoded as its own strided sequence with the left neighbour in a local
+# variable instead of being read back from the output buffer.
+
+def _unfilter_sub(line: bytes, bpp: int) -> bytes:
+    out = bytearray(len(line))
+    for k in range(bpp):
+        a = 0
+        channel = bytearray()
+        append = channel.append
+        for x in line[k::bpp]:
+            a = (x + a) & 0xFF
+            append(a)
+        out[k::bpp] = channel
+    return bytes(out)
+
+
+def _unfilter_average(line: bytes, previous: bytes, bpp: int) -> bytes:
+    out = bytearray(len(line))
+    for k in range(bpp):
+        a = 0
+        channel = bytearray()
+        append = channel.append
+        for x, b in zip(line[k::bpp], previous[k::bpp]):
+            a = (x + ((a + b) >> 1)) & 0xFF
+            append(a)
+        out[k::bpp] = channel
+    return bytes(out)
+
+
+def _unfilter_paeth(line: bytes, previous: bytes, bpp: int) -> bytes:
+    out = bytearray(len(line))
+    for k in range(bpp):
+        a = c = 0
+        channel = bytearray()
+        append = channel.append
+        for x, b in zip(line[k::bpp], previous[k::bpp]):
+            # distances of p = a + b - c to a, b and c
+            pa = b - c
+            pb = a - c
+            pc = pa + pb
+            if pa < 0:
+                pa = -pa
+            if pb < 0:
+                pb = -pb
+            if pc < 0:
+                pc = -pc
+            if pa <= pb and pa <= pc:
+                a = (x + a) & 0xFF
+            elif pb <= pc:
+                a = (x + b) & 0xFF
+            else:
+                a = (x + c) & 0xFF
+            append(a)
+            c = b
+        out[k::bpp] = channel
+    return bytes(out)
+
+
+def _unfilter(raw: bytes, height: int, stride: int, bpp: int) -> List[bytes]:
+    if len(raw) < height * (stride + 1):
+        raise PNGError("truncated image data")
+    rows: List[bytes] = []
+    previous = bytes(stride)
+    pos = 0
+    for _ in range(height):
+        kind = raw[pos]
+        line = raw[pos + 1:pos + 1 + stride]
+        pos += stride + 1
+        if kind == 0:
+            row = line
+        elif kind == 1:
+            row = _unfilter_sub(line, bpp)
+        elif kind == 2:
+            row = _add_rows(line, previous)
+        elif kind == 3:
+            row = _unfilter_average(line, previous, bpp)
+        elif kind == 4:
+            row = _unfilter_paeth(line, previous, bpp)
+        else:
+            raise PNGError(f"unknown filter type {kind}")
+        rows.append(row)
+        previous = row
+    return rows
+
+
+def _unpack_bits(row: bytes, bit_depth: int, count: int) -> bytes:
+    per_byte = 8 // bit_depth
+    mask = (1 << bit_depth) - 1
+    shifts = [8 - bit_depth * (i + 1) for i in range(per_byte)]
+    out = bytearray()
+    for byte in row:
+        out.extend((byte >> shift) & mask for shift in shifts)
+    return bytes(out[:count])
+
+
+def decode_png(data: bytes) -> Raster:
+    """8-bit rows of a non-interlaced PNG; palettes become RGB or RGBA."""
+    if data[:8] != PNG_SIGNATURE:
+        raise PNGError("not a PNG file")
+    pos = 8
+    header = None
+    palette = b""
+    transparency = b""
+    idat: List[bytes] = []
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body[:13])
+        elif kind == b"PLTE":
+            palette = body
+        elif kind == b"tRNS":
+            transparency = body
+        elif kind == b"IDAT":
+            idat.append(body)
+        elif kind == b"IEND":
+            break
+    if header is None:
+        raise PNGError("missing IHDR chunk")
+    width, height, bit_depth, color_type, _, _, interlace = header
+    if color_type not in _CHANNELS or bit_depth not in (1, 2, 4, 8, 16):
+        raise PNGError(f"unsupported color type {color_type} / bit depth {bit_depth}")
+    if interlace:
+        raise PNGError("interlaced PNGs need Pillow")
+    channels = _CHANNELS[color_type]
+    bits_per_pixel = channels * bit_depth
+    stride = (width * bits_per_pixel + 7) // 8
+    try:
+        raw = zlib.decompress(b"".join(idat))
+    except zlib.error as exc:
+        raise PNGError(f"corrupt image data: {exc}") from exc
+    rows = _unfilter(raw, height, stride, max(1, bits_per_pixel // 8))
+
+    if bit_depth == 16:
+        rows = [row[0::2] for row in rows]
+    elif bit_depth < 8:
+        rows = [_unpack_bits(row, bit_depth, width) for row in rows]
+        if color_type == 0:
+            scale = bytes(min(255, value * 255 // ((1 << bit_depth) - 1)) for value in range(256))
+            rows = [row.translate(scale) for row in rows]
+
+    if color_type == 3:
+        entries = len(palette) // 3
+        if not entries:
+            raise PNGError("palette image without PLTE chunk")
+        channels = 4 if transparency else 3
+        tables = [
+            bytes(palette[3 * min(i, entries - 1) + k] for i in range(256)) for k in range(3)
+        ]
+        if transparency:
+            tables.append(bytes(transparency[i] if i < len(transparency) else 255 for i in range(256)))
+        expanded = []
+        for row in rows:
+            out = bytearray(width * channels)
+            for k, table in enumerate(tables):
+                out[k::channels] = row.translate(table)
+            expanded.append(bytes(out))
+        rows = expanded
+    return Raster(width, height, channels, rows)
+
+
+# --- Pillow backend ---
+
+class _PillowRaster:
+    """`Raster`'s interface over a Pillow image."""
+
+    __slots__ = ("image",)
+
+    def __init__(self, image: Any) -> None:
+        self.image = image
+
+    @property
+    def width(self) -> int:
+        return self.image.width
+
+    @property
+    def height(self) -> int:
+        return self.image.height
+
+    def crop(self, x: int, y: int, width: int, height: int) -> "_PillowRaster":
+        return _PillowRaster(self.image.crop((x, y, x + width, y + height)))
+
+    def half(self) -> "_PillowRaster":
+        size = ((self.image.width + 1) // 2, (self.image.height + 1) // 2)
+        return _PillowRaster(self.image.resize(size, Image.BOX))
+
+    def png(self) -> bytes:
+        out = io.BytesIO()
+        self.image.save(out, format="PNG")
+        return out.getvalue()
+
+
+def _open_pillow(data: bytes) -> _PillowRaster:
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    if image.mode not in _PILLOW_MODES:
+        has_alpha = image.mode in ("PA", "RGBa", "La") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    return _PillowRaster(image)
+
+
+def open_image(data: bytes) -> Any:
+    """A `Raster` (or Pillow-backed equivalent) for PNG bytes."""
+    if Image is not None:
+        return _open_pillow(data)
+    return decode_png(data)
+
+
+def codec_name() -> str:
+    return "Pillow" if Image is not None else "stdlib"
+
+
+# --- pyramids ---
+
+class PyramidResult(NamedTuple):
+    source: str
+    directory: str
+    manifest: Optional[Dict[str, Any]]
+    built: bool
+    error: Optional[str]
+
+    @property
+    def tiles(self) -> int:
+        if not self.manifest:
+            return 0
+        return sum(level["columns"] * level["rows"] for level in self.manifest["levels"])
+
+
+def pyramid_levels(width: int, height: int, tile_size: int) -> List[Dict[str, int]]:
+    """Size and tile grid of each level, from full resolution down to one tile."""
+    levels = []
+    while True:
+        levels.append(
+            {
+                "width": width,
+                "height": height,
+                "columns": -(-width // tile_size),
+                "rows": -(-height // tile_size),
+            }
+        )
+        if width <= tile_size and height <= tile_size:
+            return levels
+        width, height = (width + 1) // 2, (height + 1) // 2
+
+
+def tile_path(z: int, column: int, row: int) -> str:
+    return f"{z}/{column}_{row}.png"
+
+
+def source_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=SOURCE_HASH_BYTES).hexdigest()
+
+
+def read_manifest(directory: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE), "r", encoding="utf-8") as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return manifest if isinstance(manifest, dict) else None
+
+
+def _is_current(manifest: Optional[Dict[str, Any]], digest: str, tile_size: int) -> bool:
+    return (
+        manifest is not None
+        and manifest.get("version") == PYRAMID_VERSION
+        and manifest.get("tileSize") == tile_size
+        and (manifest.get("source") or {}).get("hash") == digest
+    )
+
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def _write_pyramid(data: bytes, digest: str, directory: str, tile_size: int) -> Dict[str, Any]:
+    image = open_image(data)
+    levels = pyramid_levels(image.width, image.height, tile_size)
+    # build next to the old pyramid and swap it in at the end
+    staging = directory + ".tmp"
+    _remove(staging)
+    for z, level in enumerate(levels):
+        if z:
+            image = image.half()
+        os.makedirs(os.path.join(staging, str(z)))
+        for row in range(level["rows"]):
+            y = row * tile_size
+            for column in range(level["columns"]):
+                x = column * tile_size
+                tile = image.crop(x, y, min(tile_size, level["width"] - x), min(tile_size, level["height"] - y))
+                with open(os.path.join(staging, tile_path(z, column, row)), "wb") as fh:
+                    fh.write(tile.png())
+    manifest = {
+        "version": PYRAMID_VERSION,
+        "source": {"hash": digest, "width": levels[0]["width"], "height": levels[0]["height"]},
+        "tileSize": tile_size,
+        "format": "png",
+        "levels": levels,
+    }
+    with open(os.path.join(staging, MANIFEST_FILE), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+    _remove(directory)
+    os.replace(staging, directory)
+    return manifest
+
+
+def _build(task: Tuple[str, str, int, bytes, str]) -> PyramidResult:
+    source, directory, tile_size, data, digest = task
+    try:
+        manifest = _write_pyramid(data, digest, directory, tile_size)
+    except (OSError, ValueError, zlib.error) as exc:
+        _remove(directory + ".tmp")
+        return PyramidResult(source, directory, None, False, str(exc) or type(exc).__name__)
+    return PyramidResult(source, directory, manifest, True, None)
+
+
+def _prepare(source: str, directory: str, tile_size: int, force: bool):
+    """An unchanged/failed result, or the task for `_build`."""
+    try:
+        with open(source, "rb") as fh:
+            data = fh.read()
+    except OSError as exc:
+        return PyramidResult(source, directory, None, False, str(exc))
+    digest = source_hash(data)
+    manifest = read_manifest(directory)
+    if not force and _is_current(manifest, digest, tile_size):
+        return PyramidResult(source, directory, manifest, False, None)
+    return (source, directory, tile_size, data, digest)
+
+
+def build_pyramid(
+    source: str,
+    directory: str,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    force: bool = False,
+) -> PyramidResult:
+    """Tile `source` into `directory` unless its manifest already matches."""
+    prepared = _prepare(source, directory, tile_size, force)
+    if isinstance(prepared, PyramidResult):
+        return prepared
+    return _build(prepared)
+
+
+def build_pyramids(
+    tasks: Sequence[Tuple[str, str]],
+    tile_size: int = DEFAULT_TILE_SIZE,
+    jobs: int = 1,
+    force: bool = False,
+) -> List[PyramidResult]:
+    """`build_pyramid` for each (source, directory), in input order, over `jobs` processes.
+
+    Sources are hashed in this process first, so a run where nothing changed never
+    starts the pool.
+    """
+    results: List[Optional[PyramidResult]] = []
+    pending: List[Tuple[int, Tuple[str, str, int, bytes, str]]] = []
+    for source, directory in tasks:
+        prepared = _prepare(source, directory, tile_size, force)
+        if isinstance(prepared, PyramidResult):
+            results.append(prepared)
+        else:
+            pending.append((len(results), prepared))
+            results.append(None)
+    if jobs <= 1 or len(pending) < 2:
+        built = [_build(task) for _, task in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+            # one texture per task: each is far larger than the IPC it costs
+            built = list(pool.map(_build, [task for _, task in pending]))
+    for (slot, _), result in zip(pending, built):
+        results[slot] = result
+    return results  # type: ignore[return-value]
+
+
+def pyramid_summary(results: Sequence[PyramidResult]) -> str:
+    built = sum(1 for result in results if result.built)
+    failed = sum(1 for result in results if result.error)
+    tiles = sum(result.tiles for result in results if result.built)
+    return (
+        f"[tiles] {len(results)} textures ({codec_name()} codec): {built} tiled ({tiles} tiles), "
+        f"{len(results) - built - failed} unchanged, {failed} failed"
+    )
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+World position, rotation and scale for Unity Transform hierarchies.
+
+`solve_world_transforms` orders the requested Transforms and their ancestors into
+topological levels (roots first; no recursion, so hierarchy depth does not matter)
+and composes each level with its parents' world transforms in one step. With NumPy
+installed a level is a handful of vectorized quaternion operations over arrays;
+without it the same level loop runs on tuples. Both paths evaluate the same
+floating-point expressions in the same order, so their results are identical.
+
+Transforms are any objects with `parent_transform_id`, `local_position`,
+`local_rotation` and `local_scale` (e.g. extract_map_data's `TransformData`). A
+parent id missing from the mapping composes with the identity; a parent cycle is
+cut where it is found.
+"""
+
+from __future__ import annotations
+
+import math
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # the tuple fallback below needs only the stdlib
+    np = None
+
+
+Vector3 = Tuple[float, float, float]
+Quaternion = Tuple[float, float, float, float]
+WorldTransform = Tuple[Vector3, Quaternion, Vector3]
+
+IDENTITY: WorldTransform = ((0.0, 0.0, 0.0), (0.0, 0.0, 0.0, 1.0), (1.0, 1.0, 1.0))
+
+# below this many transforms array setup costs more than it saves
+NUMPY_MIN_TRANSFORMS = 256
+# levels narrower than this are composed one transform at a time even with NumPy
+NUMPY_MIN_LEVEL = 32
+
+# parent slot of transforms whose parent id is not in the mapping
+_IDENTITY_PARENT = -1
+# parent slot of roots
+_NO_PARENT = -2
+
+
+def normalize_quaternion(q: Quaternion) -> Quaternion:
+    x, y, z, w = q
+    mag_sq = x * x + y * y + z * z + w * w
+    if mag_sq <= 1e-12:
+        return (0.0, 0.0, 0.0, 1.0)
+    inv_mag = 1.0 / math.sqrt(mag_sq)
+    return (x * inv_mag, y * inv_mag, z * inv_mag, w * inv_mag)
+
+
+def quaternion_multiply(q1: Quaternion, q2: Quaternion) -> Quaternion:
+    x1, y1, z1, w1 = q1
+    x2, y2, z2, w2 = q2
+    x = w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2
+    y = w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2
+    z = w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2
+    w = w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2
+    return normalize_quaternion((x, y, z, w))
+
+
+def cross(a: Vector3, b: Vector3) -> Vector3:
+    ax, ay, az = a
+    bx, by, bz = b
+    return (
+        ay * bz - az * by,
+        az * bx - ax * bz,
+        ax * by - ay * bx,
+    )
+
+
+def rotate_vector(q: Quaternion, v: Vector3) -> Vector3:
+    q = normalize_quaternion(q)
+    x, y, z, w = q
+    u = (x, y, z)
+    uv = cross(u, v)
+    uuv = cross(u, uv)
+    uv = tuple(component * (2.0 * w) for component in uv)
+    uuv = tuple(component * 2.0 for component in uuv)
+    return (
+        v[0] + uv[0] + uuv[0],
+        v[1] + uv[1] + uuv[1],
+        v[2] + uv[2] + uuv[2],
+    )
+
+
+def compose(parent: WorldTransform, data: Any) -> WorldTransform:
+    """World transform of `data` under a parent whose world transform is known."""
+    parent_pos, parent_rot, parent_scale = parent
+    local_position = data.local_position
+    local_scale = data.local_scale
+    scaled_local = (
+        parent_scale[0] * local_position[0],
+        parent_scale[1] * local_position[1],
+        parent_scale[2] * local_position[2],
+    )
+    rotated = rotate_vector(parent_rot, scaled_local)
+    world_pos = (
+        parent_pos[0] + rotated[0],
+        parent_pos[1] + rotated[1],
+        parent_pos[2] + rotated[2],
+    )
+    world_rot = quaternion_multiply(parent_rot, data.local_rotation)
+    world_scale = (
+        parent_scale[0] * local_scale[0],
+        parent_scale[1] * local_scale[1],
+        parent_scale[2] * local_scale[2],
+    )
+    return world_pos, world_rot, world_scale
+
+
+def topological_levels(
+    transforms: Mapping[int, Any],
+    ids: Optional[Iterable[int]] = None,
+) -> Tuple[List[int], List[int], List[List[int]]]:
+    """(order, parent slot per position, levels of positions) for `ids` and their ancestors.
+
+    `order[i]` is a transform id; its parent slot is the parent's position in `order`,
+    `_IDENTITY_PARENT` for a parent id not in `transforms`, or `_NO_PARENT` for a root.
+    `levels[0]` holds the roots and the children of missing parents; every other
+    position sits one level below its parent.
+    """
+    position: Dict[int, int] = {}
+    order: List[int] = []
+    parents: List[int] = []
+    depths: List[int] = []
+    for start in transforms if ids is None else ids:
+        if start in position or start not in transforms:
+            continue
+        # fast path: a root, or a parent already placed (the usual case in file order)
+        parent_id = transforms[start].parent_transform_id
+        parent_slot = _NO_PARENT if parent_id is None else position.get(parent_id, _IDENTITY_PARENT)
+        if parent_slot != _IDENTITY_PARENT:
+            position[start] = len(order)
+            order.append(start)
+            parents.append(parent_slot)
+            depths.append(0 if parent_slot == _NO_PARENT else depths[parent_slot] + 1)
+            continue
+        # walk up until a solved ancestor, a root or a missing parent
+        chain: List[int] = []
+        on_chain = set()
+        node = start
+        parent_slot = _NO_PARENT
+        depth = -1
+        while True:
+            chain.append(node)
+            on_chain.add(node)
+            parent_id = transforms[node].parent_transform_id
+            if parent_id is None:
+                break
+            if parent_id in position:
+                parent_slot = position[parent_id]
+                depth = depths[parent_slot]
+                break
+            if parent_id not in transforms:
+                parent_slot = _IDENTITY_PARENT
+                break
+            if parent_id in on_chain:
+                # a cycle: treat the node closing it as a root
+                break
+            node = parent_id
+        # assign from the top of the chain down so parents precede children
+        for node in reversed(chain):
+            depth += 1
+            position[node] = len(order)
+            order.append(node)
+            parents.append(parent_slot)
+            depths.append(depth)
+            parent_slot = position[node]
+    levels: List[List[int]] = [[] for _ in range(max(depths, default=-1) + 1)]
+    for slot, depth in enumerate(depths):
+        levels[depth].append(slot)
+    return order, parents, levels
+
+
+def _solve_python(
+    transforms: Mapping[int, Any],
+    order: List[int],
+    parents: List[int],
+    levels: List[List[int]],
+) -> List[WorldTransform]:
+    world: List[WorldTransform] = [IDENTITY] * len(order)
+    for level in levels:
+        for slot in level:
+            data = transforms[order[slot]]
+            parent_slot = parents[slot]
+            if parent_slot == _NO_PARENT:
+                world[slot] = (data.local_position, data.local_rotation, data.local_scale)
+            else:
+                parent = IDENTITY if parent_slot == _IDENTITY_PARENT else world[parent_slot]
+                world[slot] = compose(parent, data)
+    return world
+
+
+def _rows(values: Iterable[Tuple[float, ...]], count: int, width: int):
+    return np.fromiter(chain.from_iterable(values), dtype=np.float64, count=count * width).reshape(count, width)
+
+
+def _tuples(rows) -> List[Tuple[float, ...]]:
+    # column lists zipped back together allocate far fewer objects than rows.tolist()
+    return list(zip(*rows.T.tolist()))
+
+
+def _normalize_rows(q):
+    x, y, z, w = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    mag_sq = x * x + y * y + z * z + w * w
+    degenerate = mag_sq <= 1e-12
+    inv_mag = 1.0 / np.sqrt(np.where(degenerate, 1.0, mag_sq))
+    out = q * inv_mag[:, None]
+    out[degenerate] = (0.0, 0.0, 0.0, 1.0)
+    return out
+
+
+def _cross_rows(a, b):
+    ax, ay, az = a[:, 0], a[:, 1], a[:, 2]
+    bx, by, bz = b[:, 0], b[:, 1], b[:, 2]
+    return np.stack((ay * bz - az * by, az * bx - ax * bz, ax * by - ay * bx), axis=1)
+
+
+def _multiply_rows(q1, q2):
+    x1, y1, z1, w1 = q1[:, 0], q1[:, 1], q1[:, 2], q1[:, 3]
+    x2, y2, z2, w2 = q2[:, 0], q2[:, 1], q2[:, 2], q2[:, 3]
+    return _normalize_rows(
+        np.stack(
+            (
+                w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+                w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+                w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+                w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+            ),
+            axis=1,
+        )
+    )
+
+
+def _solve_numpy(
+    transforms: Mapping[int, Any],
+    order: List[int],
+    parents: List[int],
+    levels: List[List[int]],
+) -> Tuple[Any, Any, Any]:
+    """World position, rotation and scale arrays, one row per position in `order`."""
+    count = len(order)
+    datas = [transforms[transform_id] for transform_id in order]
+    local_pos = _rows((data.local_position for data in datas), count, 3)
+    local_rot = _rows((data.local_rotation for data in datas), count, 4)
+    local_scale = _rows((data.local_scale for data in datas), count, 3)
+    # one extra row holds the identity that children of missing parents compose with
+    world_pos = np.zeros((count + 1, 3))
+    world_rot = np.zeros((count + 1, 4))
+    world_scale = np.ones((count + 1, 3))
+    world_rot[count, 3] = 1.0
+    parent_slots = np.array(parents, dtype=np.int64)
+    parent_slots[parent_slots == _IDENTITY_PARENT] = count
+    # results of narrow levels, kept as tuples until a wide level needs them in the arrays
+    pending: Dict[int, WorldTransform] = {}
+
+    def flush() -> None:
+        slots = list(pending)
+        world_pos[slots] = [pending[slot][0] for slot in slots]
+        world_rot[slots] = [pending[slot][1] for slot in slots]
+        world_scale[slots] = [pending[slot][2] for slot in slots]
+        pending.clear()
+
+    for level in levels:
+        if len(level) < NUMPY_MIN_LEVEL:
+            # narrow levels (long chains) are cheaper one by one than as arrays
+            for slot in level:
+                parent_slot = parents[slot]
+                data = datas[slot]
+                if parent_slot == _NO_PARENT:
+                    pending[slot] = (data.local_position, data.local_rotation, data.local_scale)
+                    continue
+                if parent_slot == _IDENTITY_PARENT:
+                    parent = IDENTITY
+                else:
+                    parent = pending.get(parent_slot)
+                    if parent is None:
+                        parent = (
+                            tuple(world_pos[parent_slot].tolist()),
+                            tuple(world_rot[parent_slot].tolist()),
+                            tuple(world_scale[parent_slot].tolist()),
+                        )
+                pending[slot] = compose(parent, data)
+            continue
+        if pending:
+            flush()
+        slots = np.array(level, dtype=np.int64)
+        parent = parent_slots[slots]
+        roots = parent == _NO_PARENT
+        if roots.any():
+            root_slots = slots[roots]
+            world_pos[root_slots] = local_pos[root_slots]
+            world_rot[root_slots] = local_rot[root_slots]
+            world_scale[root_slots] = local_scale[root_slots]
+            slots, parent = slots[~roots], parent[~roots]
+            if not len(slots):
+                continue
+        parent_pos, parent_rot, parent_scale = world_pos[parent], world_rot[parent], world_scale[parent]
+        scaled_local = parent_scale * local_pos[slots]
+        q = _normalize_rows(parent_rot)
+        u, w = q[:, :3], q[:, 3]
+        uv = _cross_rows(u, scaled_local)
+        uuv = _cross_rows(u, uv)
+        uv = uv * (2.0 * w)[:, None]
+        uuv = uuv * 2.0
+        world_pos[slots] = parent_pos + (scaled_local + uv + uuv)
+        world_rot[slots] = _multiply_rows(parent_rot, local_rot[slots])
+        world_scale[slots] = parent_scale * local_scale[slots]
+    if pending:
+        flush()
+    return world_pos[:count], world_rot[:count], world_scale[:count]
+
+
+def _solve(
+    transforms: Mapping[int, Any],
+    ids: Optional[Iterable[int]],
+    use_numpy: Optional[bool],
+    positions_only: bool,
+) -> Dict[int, Any]:
+    order, parents, levels = topological_levels(transforms, ids)
+    if use_numpy is None:
+        # long thin hierarchies get nothing from arrays; only batch wide levels
+        use_numpy = (
+            np is not None
+            and len(order) >= NUMPY_MIN_TRANSFORMS
+            and len(order) >= NUMPY_MIN_LEVEL * len(levels)
+        )
+    if use_numpy and np is None:
+        raise RuntimeError("use_numpy=True needs NumPy installed")
+    if use_numpy and order:
+        world_pos, world_rot, world_scale = _solve_numpy(transforms, order, parents, levels)
+        # converting rows back to tuples dominates large batches; skip what is not asked for
+        positions = _tuples(world_pos)
+        if positions_only:
+            return dict(zip(order, positions))
+        return dict(zip(order, zip(positions, _tuples(world_rot), _tuples(world_scale))))
+    world = _solve_python(transforms, order, parents, levels)
+    if positions_only:
+        return {transform_id: solved[0] for transform_id, solved in zip(order, world)}
+    return dict(zip(order, world))
+
+
+def solve_world_transforms(
+    transforms: Mapping[int, Any],
+    ids: Optional[Iterable[int]] = None,
+    use_numpy: Optional[bool] = None,
+) -> Dict[int, WorldTransform]:
+    """transform id -> (world position, rotation, scale) for `ids` (default: all) and their ancestors.
+
+    Ids not in `transforms` are left out. `use_numpy=None` picks NumPy when it is
+    installed and the levels are wide enough on average to pay for it.
+    """
+    return _solve(transforms, ids, use_numpy, positions_only=False)
+
+
+def world_positions(
+    transforms: Mapping[int, Any],
+    ids: Optional[Iterable[int]] = None,
+    use_numpy: Optional[bool] = None,
+) -> Dict[int, Vector3]:
+    """transform id -> world position; see `solve_world_transforms`."""
+    return _solve(transforms, ids, use_numpy, positions_only=True)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Streaming iterator over the `--- !u!<class> &<fileID>` documents of a Unity YAML file.
+
+Documents are yielded one at a time straight from a file handle or an in-memory
+buffer, keeping only the current document's raw bytes. Lines are decoded on first
+access, so consumers that only look at `class_id` never pay for decoding.
+"""
+
+from __future__ import annotations
+
+import mmap
+from array import array
+from typing import IO, Collection, Iterator, List, Optional, Tuple, Union
+
+
+HEADER_PREFIX = "--- !u!"
+HEADER_PREFIX_BYTES = b"--- !u!"
+
+Source = Union[str, bytes, bytearray, IO, "MappedYamlFile"]
+
+
+def parse_document_header(line: Union[str, bytes]) -> Tuple[int, int]:
+    """Return (class_id, file_id) of a `--- !u!<class> &<fileID>` header line."""
+    parts = line.split()
+    if len(parts) < 3:
+        return (0, 0)
+    try:
+        class_id = int(parts[1][3:])  # skip "!u!"
+        file_id = int(parts[2][1:])  # skip '&'
+    except ValueError:
+        return (0, 0)
+    return class_id, file_id
+
+
+def split_lines(text: str) -> List[str]:
+    """Split like a text-mode `readlines()`: universal newlines, line ends kept."""
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines = text.split("\n")
+    last = lines.pop()
+    lines = [line + "\n" for line in lines]
+    if last:
+        lines.append(last)
+    return lines
+
+
+class UnityDocument:
+    """One YAML document: header ids, position in the source and its lazily decoded lines.
+
+    `class_id` is None for the preamble (`%YAML`/`%TAG` lines) before the first header.
+    `start`/`end` are offsets into the source: bytes for binary sources, characters for
+    text handles.
+    """
+
+    __slots__ = ("class_id", "file_id", "start", "end", "_raw", "_buf", "_lines")
+
+    def __init__(
+        self,
+        class_id: Optional[int],
+        file_id: int,
+        start: int,
+        end: int,
+        raw: Union[str, bytes, None],
+        buf=None,
+    ) -> None:
+        self.class_id = class_id
+        self.file_id = file_id
+        self.start = start
+        self.end = end
+        self._raw = raw
+        # backing buffer for documents sliced out of bytes/mmap sources
+        self._buf = buf
+        self._lines: Optional[List[str]] = None
+
+    @property
+    def raw(self) -> Union[str, bytes]:
+        if self._raw is None:
+            # sliced from the backing buffer only when somebody asks for it
+            self._raw = self._buf[self.start : self.end]
+        return self._raw
+
+    @property
+    def text(self) -> str:
+        raw = self.raw
+        if isinstance(raw, str):
+            return raw
+        return raw.decode("utf-8", errors="ignore")
+
+    @property
+    def lines(self) -> List[str]:
+        if self._lines is None:
+            self._lines = split_lines(self.text)
+        return self._lines
+
+    def contains(self, marker: Union[str, bytes]) -> bool:
+        """Substring test on the raw document, without decoding it."""
+        if self._buf is not None:
+            if isinstance(marker, str):
+                marker = marker.encode("utf-8")
+            return self._buf.find(marker, self.start, self.end) >= 0
+        raw = self._raw
+        if isinstance(raw, str):
+            return (marker if isinstance(marker, str) else marker.decode("utf-8")) in raw
+        if isinstance(marker, str):
+            marker = marker.encode("utf-8")
+        return marker in raw
+
+
+def iter_documents(
+    source: Source, class_ids: Optional[Collection[int]] = None
+) -> Iterator[UnityDocument]:
+    """Yield the documents of a Unity YAML file path, buffer or open file handle.
+
+    Paths are opened in binary mode and streamed line by line, so peak memory is the
+    largest single document rather than the whole file. `class_ids` limits the output
+    to those document kinds; a `MappedYamlFile` then skips the others without ever
+    slicing or decoding them.
+    """
+    if isinstance(source, MappedYamlFile):
+        yield from source.documents(class_ids)
+        return
+    if isinstance(source, str):
+        with open(source, "rb") as fh:
+            docs = _iter_stream(fh)
+            yield from docs if class_ids is None else (d for d in docs if d.class_id in class_ids)
+        return
+    if isinstance(source, (bytes, bytearray)) or hasattr(source, "find"):
+        # bytes, or an mmap.mmap with its byte-level find()
+        docs = _iter_buffer(source)
+    else:
+        docs = _iter_stream(source)
+    yield from docs if class_ids is None else (d for d in docs if d.class_id in class_ids)
+
+
+def _iter_stream(fh: IO) -> Iterator[UnityDocument]:
+    chunk: List = []
+    class_id: Optional[int] = None
+    file_id = 0
+    start = 0
+    pos = 0
+    prefix = None
+    for line in fh:
+        if prefix is None:
+            prefix = HEADER_PREFIX_BYTES if isinstance(line, bytes) else HEADER_PREFIX
+        if line.startswith(prefix):
+            if chunk:
+                yield UnityDocument(class_id, file_id, start, pos, chunk[0][:0].join(chunk))
+            chunk = []
+            class_id, file_id = parse_document_header(line)
+            start = pos
+        chunk.append(line)
+        pos += len(line)
+    if chunk:
+        yield UnityDocument(class_id, file_id, start, pos, chunk[0][:0].join(chunk))
+
+
+def _iter_buffer(buf) -> Iterator[UnityDocument]:
+    size = len(buf)
+    needle = b"\n" + HEADER_PREFIX_BYTES
+    if buf[: len(HEADER_PREFIX_BYTES)] == HEADER_PREFIX_BYTES:
+        header_at = 0
+    else:
+        found = buf.find(needle)
+        header_at = found + 1 if found >= 0 else size
+        if header_at > 0:
+            yield UnityDocument(None, 0, 0, header_at, None, buf)
+    while header_at < size:
+        header_end = buf.find(b"\n", header_at)
+        header_end = size if header_end < 0 else header_end
+        class_id, file_id = parse_document_header(bytes(buf[header_at:header_end]))
+        found = buf.find(needle, header_end)
+        end = found + 1 if found >= 0 else size
+        yield UnityDocument(class_id, file_id, header_at, end, None, buf)
+        header_at = end
+
+
+class MappedYamlFile:
+    """Memory-mapped Unity YAML file with an offset index of its document headers.
+
+    One byte-level scan records (class id, fileID, start, end) for every document in
+    compact arrays; document text is only sliced and decoded for the kinds a caller
+    asks for. Use as a context manager, and finish with the yielded documents before
+    the file is closed.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._fh = open(path, "rb")
+        try:
+            self.buf = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            self.buf = b""
+        self.class_ids = array("i")
+        self.file_ids = array("q")
+        self.starts = array("q")
+        self.ends = array("q")
+        self._build_index()
+
+    def _build_index(self) -> None:
+        buf = self.buf
+        size = len(buf)
+        needle = b"\n" + HEADER_PREFIX_BYTES
+        if buf[: len(HEADER_PREFIX_BYTES)] == HEADER_PREFIX_BYTES:
+            header_at = 0
+        else:
+            found = buf.find(needle)
+            header_at = found + 1 if found >= 0 else size
+        while header_at < size:
+            header_end = buf.find(b"\n", header_at)
+            header_end = size if header_end < 0 else header_end
+            class_id, file_id = parse_document_header(buf[header_at:header_end])
+            found = buf.find(needle, header_end)
+            end = found + 1 if found >= 0 else size
+            self.class_ids.append(class_id)
+            self.file_ids.append(file_id)
+            self.starts.append(header_at)
+            self.ends.append(end)
+            header_at = end
+
+    def __len__(self) -> int:
+        return len(self.class_ids)
+
+    def documents(self, class_ids: Optional[Collection[int]] = None) -> Iterator[UnityDocument]:
+        buf = self.buf
+        for i, class_id in enumerate(self.class_ids):
+            if class_ids is not None and class_id not in class_ids:
+                continue
+            yield UnityDocument(class_id, self.file_ids[i], self.starts[i], self.ends[i], None, buf)
+
+    def close(self) -> None:
+        if isinstance(self.buf, mmap.mmap):
+            self.buf.close()
+        self._fh.close()
+
+    def __enter__(self) -> "MappedYamlFile":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()